@@ -0,0 +1,78 @@
+'''
+#   @file      ATEngineMemory.py
+#   @license   MIT
+#   @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#   @date      2026-10-18
+#   @note
+#   Example is suitable for A7670X/A7608X/SIM7670G/SIM7000G/SIM7080G/SIM7600 series
+#   Measures the heap allocated per cycle of a telemetry loop (signal quality + cell info)
+#   with gc.mem_alloc(), once with the string based command() interface and once with the
+#   allocation free run() + field_int() interface of libraries/atmodem.py.
+'''
+import gc
+import time
+import board
+from atmodem import ATModem, AT_OK
+
+CYCLES = 50
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
+# Initialize the serial interface for the modem
+uart = hw.uart()
+modem = ATModem(uart)
+
+# Commands and prefixes as bytes constants, so the loop does not build any objects
+CMD_CSQ = b"AT+CSQ"
+CMD_CREG = b"AT+CREG?"
+PREFIX_CSQ = b"+CSQ:"
+PREFIX_CREG = b"+CREG:"
+
+def check_modem():
+    print("Start modem...")
+    while modem.run(b"AT") != AT_OK:
+        print(".", end="")
+    print()  # Print a newline for clarity
+
+def cycle_command():
+    # String interface: every response is decoded, split and searched
+    response = modem.command("AT+CSQ")[1]
+    rssi = int(response.split("+CSQ: ")[1].split(",")[0])
+    response = modem.command("AT+CREG?")[1]
+    stat = int(response.split("+CREG: ")[1].split(",")[1])
+    return rssi, stat
+
+def cycle_run():
+    # Allocation free interface: only the two integers are decoded
+    rssi = -1
+    stat = -1
+    if modem.run(CMD_CSQ, capture=PREFIX_CSQ) == AT_OK:
+        rssi = modem.field_int(0)
+    if modem.run(CMD_CREG, capture=PREFIX_CREG) == AT_OK:
+        stat = modem.field_int(1)
+    return rssi, stat
+
+def measure(name, cycle):
+    cycle()  # Warm up, e.g. interned names and the first buffer fills
+    gc.collect()
+    gc.disable()
+    start_alloc = gc.mem_alloc()
+    start = time.ticks_ms()
+    for _ in range(CYCLES):
+        cycle()
+    elapsed = time.ticks_diff(time.ticks_ms(), start)
+    allocated = gc.mem_alloc() - start_alloc
+    gc.enable()
+    print(f"{name:10s} {allocated / CYCLES:8.1f} bytes/cycle {elapsed / CYCLES:8.1f} ms/cycle")
+
+def main():
+    print("Start Sketch")
+    hw.power_on()
+    check_modem()
+    print(f"Heap allocated per telemetry cycle, {CYCLES} cycles:")
+    measure("command()", cycle_command)
+    measure("run()", cycle_run)
+
+if __name__ == "__main__":
+    main()
@@ -5,52 +5,29 @@
 #   @date      2025-07-28
 AT+SIMCOMATI
 '''
-from machine import UART, Pin
 import time
 import sys
 import select
 import utilities
-import machine
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize UART
-uart = UART(1, baudrate=115200, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN, timeout=100)
+uart = hw.uart(timeout=100)
 
 def modem_init():
-    # Power control
-    try:
-        poweron = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-        poweron.value(1)
-    except:
-        pass
+    # Power control, DTR low keeps the modem awake
+    hw.supply(True)
     
     # Reset the modem
-    try:
-        print("Set Reset Pin.")
-        reset = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-        reset.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
+    print("Set Reset Pin.")
+    hw.reset()
     
     # Power key control
-    try:
-        print("Power on the modem PWRKEY.")
-        pwrkey = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-        pwrkey.value(0)
-        time.sleep(0.1)
-        pwrkey.value(1)
-        time.sleep(0.1)
-        pwrkey.value(0)
-    except:
-        pass
+    print("Power on the modem PWRKEY.")
+    hw.power_key()
     
     # Wait for the modem to start up
     time.sleep(3)
@@ -0,0 +1,138 @@
+'''
+#   @file      AsyncTracker.py
+#   @license   MIT
+#   @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#   @date      2026-10-18
+#   @note
+#   Example is suitable for A7670X/A7608X/SIM7670G series
+#   GNSS polling, MQTT publishing and battery sampling run as uasyncio tasks
+#   sharing one modem, instead of one blocking loop per job.
+#   Copy libraries/atmodem.py, libraries/amodem.py and libraries/board.py to the board together with utilities.py
+'''
+import board
+import uasyncio as asyncio
+from amodem import AsyncModem, AT_OK, AT_MATCH
+from atparse import parse_cgnssinfo
+
+# It depends on the operator whether to set up an APN. If some operators do not set up an APN,
+# they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
+# APNs from other operators are welcome to submit PRs for filling.
+APN = ""  # Replace with your APN (CHN-CT: China Telecom)
+mqtt_broker = "broker.emqx.io"  # MQTT Broker address
+mqtt_port = 1883  # MQTT port
+mqtt_client_id = "A76XX"  # Unique client ID for MQTT
+mqtt_publish_topic = "GsmMqttTest/publish"  # Topic for publishing messages
+mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Topic for subscribing to messages
+
+GNSS_INTERVAL_MS = 5000
+PUBLISH_INTERVAL_MS = 10000
+BATTERY_INTERVAL_MS = 1000
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
+# Initialize the serial interface for the modem
+uart = hw.uart()
+modem = AsyncModem(uart)
+adc = hw.adc()
+
+# Latest values shared between the tasks
+state = {"location": "", "battery_mv": 0}
+
+async def check_modem():
+    print("Start modem...")
+    while True:
+        status, response = await modem.command("AT")
+        if status == AT_OK:
+            print()  # Print a newline for clarity
+            break
+        print(".", end="")
+    while True:
+        status, response = await modem.command("AT+CPIN?", timeout=3000)
+        if "READY" in response:
+            print("SIM card online")
+            break
+        print("The SIM card is locked. Please unlock the SIM card first.")
+        await asyncio.sleep(3)
+
+async def connect_network(apn):
+    await modem.command(f"AT+CGDCONT=1,\"IP\",\"{apn}\"")
+    await modem.command("AT+CGATT=1")  # Attach to the GPRS
+    while True:
+        status, response = await modem.command("AT+NETOPEN", timeout=30000, terminator="+NETOPEN:")
+        if "+NETOPEN: 0" in response or "opened" in response:
+            print("Online registration successful")
+            break
+        print("Network registration was rejected, please check if the APN is correct")
+        await asyncio.sleep(3)
+
+async def mqtt_connect():
+    await modem.command("AT+CMQTTSTART", timeout=5000, terminator="+CMQTTSTART:")
+    await modem.command(f"AT+CMQTTACCQ=0,\"{mqtt_client_id}\",0")
+    status, response = await modem.command(f"AT+CMQTTCONNECT=0,\"tcp://{mqtt_broker}:{mqtt_port}\",60,1",
+                                           timeout=30000, terminator="+CMQTTCONNECT:")
+    print(response)
+    if "+CMQTTCONNECT: 0,0" not in response:
+        return False
+    status, response = await modem.command(f"AT+CMQTTSUB=0,{len(mqtt_subscribe_topic)},0", timeout=30000,
+                                           terminator="+CMQTTSUB:", data=mqtt_subscribe_topic)
+    print(response)
+    return True
+
+async def mqtt_publish(topic, message):
+    # The payload is written by the driver as soon as the ">" prompt arrives
+    status, response = await modem.command(f"AT+CMQTTTOPIC=0,{len(topic)}", timeout=3000, data=topic)
+    if status != AT_OK:
+        return False
+    status, response = await modem.command(f"AT+CMQTTPAYLOAD=0,{len(message)}", timeout=3000, data=message)
+    if status != AT_OK:
+        return False
+    status, response = await modem.command("AT+CMQTTPUB=0,0,60", timeout=60000, terminator="+CMQTTPUB:")
+    return status == AT_MATCH and "+CMQTTPUB: 0,0" in response
+
+async def gnss_task():
+    await modem.command("AT+CGNSSPWR=1", timeout=10000, terminator="+CGNSSPWR: READY!")
+    while True:
+        status, response = await modem.command("AT+CGNSSINFO", timeout=3000)
+        fix = parse_cgnssinfo(response) if status == AT_OK else None
+        if fix is not None and fix.fix:
+            state["location"] = f"{fix.lat:.6f},{fix.lon:.6f}"
+        await asyncio.sleep_ms(GNSS_INTERVAL_MS)
+
+async def mqtt_task():
+    while not await mqtt_connect():
+        print("MQTT connect failed, retrying...")
+        await asyncio.sleep(5)
+    while True:
+        payload = f"bat:{state['battery_mv']:.0f} gnss:{state['location']}"
+        print("Publish", payload, await mqtt_publish(mqtt_publish_topic, payload))
+        await asyncio.sleep_ms(PUBLISH_INTERVAL_MS)
+
+async def mqtt_receive_task():
+    # +CMQTTRXPAYLOAD: <client_index>,<len> is followed by <len> bytes of payload
+    queue = modem.urc_queue("+CMQTTRXPAYLOAD", payload=lambda line: int(line.split(",")[1]) + 2)
+    while True:
+        line, data = await queue.get()
+        print("Received:", data.strip())
+
+async def battery_task():
+    while True:
+        readings = []
+        for _ in range(10):
+            readings.append(adc.read() / 4095 * 3300)  # convert ADC value to mV
+            await asyncio.sleep_ms(3)
+        readings.sort()
+        readings = readings[1:-1]  # remove the min and max values
+        state["battery_mv"] = sum(readings) / len(readings) * 2
+        await asyncio.sleep_ms(BATTERY_INTERVAL_MS)
+
+async def main():
+    print("Start Sketch")
+    hw.power_on()
+    modem.start()
+    await check_modem()
+    await connect_network(APN)
+    await asyncio.gather(gnss_task(), mqtt_task(), mqtt_receive_task(), battery_task())
+
+if __name__ == "__main__":
+    asyncio.run(main())
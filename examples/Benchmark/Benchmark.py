@@ -0,0 +1,400 @@
+'''
+#   @file      Benchmark.py
+#   @license   MIT
+#   @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#   @date      2026-10-18
+#   @note
+#   Runs on the host (CPython 3.6+), not on the board.
+#   Replays the AT traffic of the examples against libraries/modemsim.py with its latency
+#   profile and reports, per workload, the wall time, the number of AT command lines,
+#   the bytes over the UART and the peak heap as JSON, so changes to these flows can be
+#   compared across releases:
+#
+#       python3 examples/Benchmark/Benchmark.py --platform LILYGO_T_A7670 > a76xx.json
+#       python3 examples/Benchmark/Benchmark.py --platform LILYGO_T_SIM7000G --speed 0.2
+#
+#   Workloads: boot (modemboot.boot() + network attach), https_get, https_post, https_put,
+#   mqtt (connect, subscribe, publish and receive), gnss (poll until fix),
+#   sms (send, receive, read and delete), tcp (three sockets at once), sockets (modemsock
+#   TCP and TLS sockets opened and closed, every following command must read its own
+#   answer: catches URCs and final result codes the engine attributes to the wrong command).
+#   Every workload but boot starts from an attached modem, the attach is not measured.
+#   --speed scales all modem latencies (1.0 = real modem, 0 = no latency), the peak
+#   heap is the tracemalloc peak of the whole process, emulator included.
+#   --ipr 921600 switches the UART with modemuart.negotiate() after the attach.
+'''
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "libraries"))
+
+import utilities
+import modemsim
+import modemboot
+import modemuart
+import modemsock
+import rtcmem
+from atmodem import ATModem, AT_OK, AT_MATCH
+from atparse import parse_cgnssinfo, parse_cgnsinf, parse_cmgl
+from atstats import CommandStats
+
+HTTP_URL = "https://httpbin.org"
+HTTP_BODY = b'{"temperature":23.5}'
+MQTT_TOPIC = b"GsmMqttTest/benchmark"
+MQTT_MESSAGES = 10
+TCP_HOSTS = ("vsh.pp.ua", "httpbin.org", "example.com")
+TCP_REQUEST = b"GET / HTTP/1.1\r\nHost: %s\r\nConnection: close\r\n\r\n"
+
+
+def ok(status):
+    return status == AT_OK or status == AT_MATCH
+
+
+def sim70xx(emu):
+    return emu.dialect == modemsim.SIM70XX
+
+
+# ----------------------------------------------------------------------
+# Workloads, each returns True when the flow completed
+# ----------------------------------------------------------------------
+def attach(modem, emu):
+    # Network attach of the examples' connect_network()
+    if sim70xx(emu):
+        modem.command("AT+CNMP=2")
+        modem.command("AT+CEREG?")
+        modem.command("AT+CPSI?")
+        status, _ = modem.command("AT+CNACT=0,1", 10000, "+APP PDP: 0,ACTIVE")
+        return ok(status) and ok(modem.command("AT+CNACT?")[0])
+    modem.command('AT+CGDCONT=1,"IP",""')
+    modem.command("AT+CGATT=1", 10000)
+    status, response = modem.command("AT+NETOPEN", 30000, "+NETOPEN:")
+    return "+NETOPEN: 0" in response and ok(modem.command("AT+IPADDR")[0])
+
+
+def workload_boot(modem, emu):
+    boot = modemboot.boot(modem)
+    if not boot.ready:
+        return False
+    modem.command("ATE0")
+    command, prefix = (b"AT+CEREG?", b"+CEREG:") if sim70xx(emu) else (b"AT+CREG?", b"+CREG:")
+    while modem.run(command, 1000, None, prefix) != AT_OK or modem.field_int(1) not in (1, 5):
+        time.sleep(0.1)
+    return attach(modem, emu)
+
+
+def http_request(modem, emu, method, body=None):
+    if sim70xx(emu):
+        setup = [
+            "AT+SHDISC",
+            "AT+SHCHEAD",
+            'AT+SHCONF="BODYLEN",1024',
+            'AT+SHCONF="HEADERLEN",350',
+            'AT+SHCONF="URL","%s"' % HTTP_URL,
+            "AT+SHCONN",
+        ]
+        results = modem.batch(setup, timeout=30000)
+        if len(results) < len(setup) or not ok(results[-1][0]):
+            return False
+        if body is not None:
+            modem.command('AT+SHAHEAD="Content-Type","application/json"')
+            if not ok(modem.send_data("AT+SHBOD=%d,10000" % len(body), body, 10000)[0]):
+                return False
+        method = {0: 1, 1: 3, 4: 2}[method]
+        status, response = modem.command('AT+SHREQ="/anything",%d' % method, 60000, "+SHREQ:")
+        if status != AT_MATCH:
+            return False
+        length = int(response.split(",")[-1])
+        if modem.command("AT+SHREAD=0,%d" % length, 10000, "+SHREAD:")[0] != AT_MATCH:
+            return False
+        data = modem.read_data(length, 10000)
+        modem.command("AT+SHDISC")
+        return len(data) == length
+    modem.command("AT+HTTPTERM")
+    if not ok(modem.command("AT+HTTPINIT")[0]):
+        return False
+    modem.command('AT+CSSLCFG="enableSNI",0,1')
+    modem.command('AT+HTTPPARA="URL","%s/anything"' % HTTP_URL)
+    if body is not None:
+        modem.command('AT+HTTPPARA="CONTENT","application/json"')
+        if not ok(modem.send_data("AT+HTTPDATA=%d,10" % len(body), body, 10000, prompt="DOWNLOAD")[0]):
+            return False
+    status, response = modem.command("AT+HTTPACTION=%d" % method, 60000, "+HTTPACTION:")
+    if status != AT_MATCH or ",200," not in response:
+        return False
+    modem.command("AT+HTTPHEAD")
+    status, _ = modem.command("AT+HTTPREAD=0,1024", 10000, "+HTTPREAD: 0")
+    modem.command("AT+HTTPTERM")
+    return status == AT_MATCH
+
+
+def workload_https_get(modem, emu):
+    return http_request(modem, emu, 0)
+
+
+def workload_https_post(modem, emu):
+    return http_request(modem, emu, 1, HTTP_BODY)
+
+
+def workload_https_put(modem, emu):
+    return http_request(modem, emu, 4, HTTP_BODY)
+
+
+def workload_mqtt(modem, emu):
+    received = []
+    if sim70xx(emu):
+        modem.on_urc("+SMSUB:", received.append)
+        setup = [
+            'AT+SMCONF="URL","broker.emqx.io",1883',
+            'AT+SMCONF="KEEPALIVE",60',
+            'AT+SMCONF="CLEANSS",1',
+            'AT+SMCONF="CLIENTID","benchmark"',
+        ]
+        modem.batch(setup)
+        if not ok(modem.command("AT+SMCONN", 30000)[0]):
+            return False
+        if not ok(modem.command('AT+SMSUB="%s",1' % MQTT_TOPIC.decode())[0]):
+            return False
+        for i in range(MQTT_MESSAGES):
+            message = b"benchmark %d" % i
+            modem.send_data('AT+SMPUB="%s",%d,1,0' % (MQTT_TOPIC.decode(), len(message)), message, 10000)
+    else:
+        modem.on_urc("+CMQTTRXPAYLOAD:", lambda line: received.append(modem.read_data(int(line.split(",")[1]))))
+        setup = [
+            ("AT+CMQTTSTART", "+CMQTTSTART:"),
+            'AT+CMQTTACCQ=0,"benchmark",0',
+            ('AT+CMQTTCONNECT=0,"tcp://broker.emqx.io:1883",60,1', "+CMQTTCONNECT:"),
+        ]
+        results = modem.batch(setup, timeout=30000)
+        if len(results) < len(setup) or not ok(results[-1][0]):
+            return False
+        if not ok(modem.send_data("AT+CMQTTSUB=0,%d,1" % len(MQTT_TOPIC), MQTT_TOPIC, 10000, "+CMQTTSUB:")[0]):
+            return False
+        for i in range(MQTT_MESSAGES):
+            message = b"benchmark %d" % i
+            modem.send_data("AT+CMQTTTOPIC=0,%d" % len(MQTT_TOPIC), MQTT_TOPIC, 10000)
+            modem.send_data("AT+CMQTTPAYLOAD=0,%d" % len(message), message, 10000)
+            modem.command("AT+CMQTTPUB=0,1,60", 10000, "+CMQTTPUB:")
+    # The broker echoes every publish back to the subscription
+    deadline = time.monotonic() + 10
+    while len(received) < MQTT_MESSAGES and time.monotonic() < deadline:
+        modem.poll(10)
+    if sim70xx(emu):
+        modem.command("AT+SMDISC")
+    else:
+        modem.command("AT+CMQTTDISC=0,120", 10000, "+CMQTTDISC:")
+        modem.command("AT+CMQTTREL=0")
+        modem.command("AT+CMQTTSTOP", 10000, "+CMQTTSTOP:")
+    return len(received) == MQTT_MESSAGES
+
+
+def workload_gnss(modem, emu):
+    if sim70xx(emu):
+        modem.command("AT+CGNSPWR=1")
+        command, parse = "AT+CGNSINF", parse_cgnsinf
+    else:
+        modem.command("AT+CGNSSPWR=1", 10000, "+CGNSSPWR: READY!")
+        command, parse = "AT+CGNSSINFO", parse_cgnssinfo
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        fix = parse(modem.command(command)[1])
+        if fix is not None and fix.fix:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def workload_sms(modem, emu):
+    received = []
+    modem.on_urc("+CMTI:", received.append)
+    modem.command("AT+CMGF=1")
+    status, _ = modem.send_data('AT+CMGS="+8613800000000"', "LilyGo benchmark message", 60000,
+                                "+CMGS:", suffix=b"\x1a")
+    if status != AT_MATCH:
+        return False
+    emu.receive_sms("+8613800000000", "Benchmark reply", 500 * emu.speed)
+    deadline = time.monotonic() + 10
+    while not received and time.monotonic() < deadline:
+        modem.poll(10)
+    messages = parse_cmgl(modem.command('AT+CMGL="REC UNREAD"', 5000)[1])
+    for message in messages:
+        modem.command("AT+CMGD=%d" % message.index)
+    return len(messages) == 1
+
+
+def workload_tcp(modem, emu):
+    links = range(len(TCP_HOSTS))
+    if sim70xx(emu):
+        for i in links:
+            # +CAOPEN: <link>,<result> comes before the final OK
+            modem.run(b'AT+CAOPEN=%d,0,"TCP","%s",80' % (i, TCP_HOSTS[i].encode()), 10000, None, b"+CAOPEN:")
+            if modem.field_int(1) != 0:
+                return False
+        for i in links:
+            request = TCP_REQUEST % TCP_HOSTS[i].encode()
+            if not ok(modem.send_data("AT+CASEND=%d,%d" % (i, len(request)), request, 10000)[0]):
+                return False
+        pending = set(links)
+        deadline = time.monotonic() + 10
+        while pending and time.monotonic() < deadline:
+            for i in sorted(pending):
+                if modem.run(b"AT+CARECV=%d,1460" % i, 5000, None, b"+CARECV:") == AT_OK and modem.field_int(0, 0):
+                    pending.discard(i)
+            modem.poll(10)
+        for i in links:
+            modem.command("AT+CACLOSE=%d" % i)
+        return not pending
+    modem.command("AT+CIPRXGET=1")
+    for i in links:
+        status, response = modem.command('AT+CIPOPEN=%d,"TCP","%s",80' % (i, TCP_HOSTS[i]), 10000, "+CIPOPEN:")
+        if not response.endswith("%d,0" % i):
+            return False
+    for i in links:
+        request = TCP_REQUEST % TCP_HOSTS[i].encode()
+        if not ok(modem.send_data("AT+CIPSEND=%d,%d" % (i, len(request)), request, 10000, "+CIPSEND:")[0]):
+            return False
+    pending = set(links)
+    deadline = time.monotonic() + 10
+    while pending and time.monotonic() < deadline:
+        for i in sorted(pending):
+            modem.run(b"AT+CIPRXGET=4,%d" % i, 5000, None, b"+CIPRXGET: 4")
+            length = modem.field_int(2, 0)
+            if length:
+                modem.command("AT+CIPRXGET=2,%d,%d" % (i, length), 5000, "+CIPRXGET: 2")
+                if len(modem.read_data(length, 5000)) == length:
+                    pending.discard(i)
+                modem.wait_response(1000)  # OK follows the data
+        modem.poll(10)
+    for i in links:
+        modem.command("AT+CIPCLOSE=%d" % i, 5000, "+CIPCLOSE:")
+    return not pending
+
+
+def workload_sockets(modem, emu):
+    emu.remote = lambda host, port, data: data
+    for ssl in (False, True, False, True):
+        sock = modemsock.ModemSocket(modem, ssl=ssl)
+        sock.settimeout(10)
+        sock.connect(("example.com", 443 if ssl else 80))
+        sock.sendall(b"ping")
+        if sock.recv(16) != b"ping":
+            return False
+        sock.close()
+        # Right after the close: the answer must be this command's, not the close's OK
+        if modem.run(b"AT+CSQ", 1000, None, b"+CSQ:") != AT_OK or modem.field_int(0) is None:
+            return False
+    return True
+
+
+WORKLOADS = {
+    "boot": workload_boot,
+    "https_get": workload_https_get,
+    "https_post": workload_https_post,
+    "https_put": workload_https_put,
+    "mqtt": workload_mqtt,
+    "gnss": workload_gnss,
+    "sms": workload_sms,
+    "tcp": workload_tcp,
+    "sockets": workload_sockets,
+}
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+def run_workload(name, args):
+    # The boot workload starts with the modem switched off
+    emu = modemsim.open_uart(speed=args.speed, baudrate=args.baudrate, booted=name != "boot")
+    modem = ATModem(emu, timeout=2000)
+    rtcmem.clear("uart")  # Every run starts with a fresh modem at --baudrate
+    if name != "boot":
+        modem.command("ATE0")
+        if not attach(modem, emu):
+            return {"ok": False, "error": "attach failed"}
+        if args.ipr and modemuart.negotiate(modem, args.ipr, args.baudrate) != args.ipr:
+            return {"ok": False, "error": "AT+IPR=%d failed" % args.ipr}
+    stats = CommandStats()
+    modem.stats = stats
+    commands = emu.commands
+    bytes_out = modem.bytes_out
+    bytes_in = modem.bytes_in
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.clear_traces()  # Python < 3.9
+    heap = tracemalloc.get_traced_memory()[0]
+    start = time.monotonic()
+    try:
+        passed = WORKLOADS[name](modem, emu)
+        error = None
+    except Exception as e:
+        passed = False
+        error = repr(e)
+    wall = time.monotonic() - start
+    result = {
+        "ok": bool(passed),
+        "wall_ms": int(wall * 1000),
+        "at_commands": emu.commands - commands,
+        "uart_bytes_out": modem.bytes_out - bytes_out,
+        "uart_bytes_in": modem.bytes_in - bytes_in,
+        "peak_heap": max(tracemalloc.get_traced_memory()[1] - heap, 0),
+    }
+    if error:
+        result["error"] = error
+    if args.commands:
+        result["commands"] = stats.as_dict()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the example workloads against the modem emulator")
+    parser.add_argument("--platform", default="LILYGO_T_A7670", help="utilities.set_platform() name, selects the dialect")
+    parser.add_argument("--speed", type=float, default=1.0, help="Latency factor, 1.0 = real modem, 0 = none")
+    parser.add_argument("--baudrate", type=int, default=115200, help="Simulated UART speed")
+    parser.add_argument("--ipr", type=int, help="UART rate negotiated with AT+IPR before each workload")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per workload, the median wall time is reported")
+    parser.add_argument("--commands", action="store_true", help="Include the per command statistics")
+    parser.add_argument("--tag", default="", help="Free text stored with the results, e.g. the release")
+    parser.add_argument("--output", help="Write the JSON to this file instead of stdout")
+    parser.add_argument("workloads", nargs="*", help="Workloads to run, all by default: " + ", ".join(WORKLOADS))
+    args = parser.parse_args()
+    for name in args.workloads:
+        if name not in WORKLOADS:
+            parser.error("unknown workload " + name)
+
+    utilities.set_platform(args.platform, emulator=True)
+    tracemalloc.start()
+    results = {}
+    for name in args.workloads or list(WORKLOADS):
+        runs = [run_workload(name, args) for _ in range(args.repeat)]
+        runs.sort(key=lambda run: run.get("wall_ms", 0))
+        result = runs[len(runs) // 2]
+        result["ok"] = all(run["ok"] for run in runs)
+        result["runs"] = [run.get("wall_ms") for run in runs]
+        results[name] = result
+        print("%-10s %s %6d ms" % (name, "ok  " if result["ok"] else "FAIL", result.get("wall_ms", 0)), file=sys.stderr)
+    report = {
+        "tag": args.tag,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": "%s %s" % (sys.implementation.name, sys.version.split()[0]),
+        "platform": args.platform,
+        "dialect": modemsim.SIM70XX if args.platform in utilities.SIM70XX_PLATFORMS else modemsim.A76XX,
+        "speed": args.speed,
+        "baudrate": args.baudrate,
+        "ipr": args.ipr,
+        "workloads": results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0 if all(result["ok"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,14 +18,17 @@ import os
 import machine
 import uos
 import utilities
-from machine import SoftI2C, ADC, Pin
+import board
+from machine import SoftI2C, ADC
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 i2c = SoftI2C(sda=machine.Pin(utilities.BOARD_SDA_PIN), scl=machine.Pin(utilities.BOARD_SCL_PIN))
 I2C_ADDRESS = 0x28
 
-# Initialize ADC
-battery_adc = ADC(Pin(utilities.BOARD_BAT_ADC_PIN))  # Replace with the actual ADC pin
-battery_adc.atten(ADC.ATTN_11DB)  # Set attenuation
+# Initialize ADC, the board sets 11dB attenuation
+battery_adc = hw.adc()
 battery_adc.width(ADC.WIDTH_12BIT)  # Set resolution to 12 bits
 
 def set_camera_power(enable):
@@ -62,12 +65,7 @@ def set_device_to_sleep():
 
 def setup_sd():
     try:
-        sd = machine.SDCard(slot=2, width=1,
-                            sck=machine.Pin(utilities.BOARD_SCK_PIN),
-                            miso=machine.Pin(utilities.BOARD_MISO_PIN),
-                            mosi=machine.Pin(utilities.BOARD_MOSI_PIN),
-                            cs=machine.Pin(utilities.BOARD_SD_CS_PIN),
-                            freq=20000000)
+        sd = hw.sdcard()
         vfs = uos.VfsFat(sd)
         uos.mount(vfs, '/')
         card_info = uos.statvfs('/')
@@ -107,19 +105,10 @@ if not set_camera_power(True):
         print("The camera PMIC failed to start.")
         time.sleep(1)
 # Disable power conservation and use maximum power      
-BOARD_POWER_SAVE_MODE_PIN = Pin(utilities.BOARD_POWER_SAVE_MODE_PIN, Pin.OUT)
-BOARD_POWER_SAVE_MODE_PIN.value(1)
-# Pull down DTR to ensure the modem is not in sleep state
-MODEM_DTR_PIN = Pin(utilities.MODEM_DTR_PIN, Pin.OUT)
-MODEM_DTR_PIN.value(0)
+hw.pin("BOARD_POWER_SAVE_MODE_PIN").value(1)
+# Pull down DTR to ensure the modem is not in sleep state and turn on the modem
 print("Power on the modem PWRKEY.")
-# Turn on the modem
-MODEM_DTR_PIN = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-MODEM_DTR_PIN.value(0)
-time.sleep(0.1)
-MODEM_DTR_PIN.value(1)
-time.sleep(0.1)
-MODEM_DTR_PIN.value(0)
+hw.power_on()
 
 boot_count = 1
 print("Boot number:", boot_count)
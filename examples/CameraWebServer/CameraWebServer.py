@@ -17,6 +17,10 @@ import time
 import camera
 import network
 import utilities
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 SSID = "your wifi name"
 PASSWORD = "your wifi password"
@@ -60,19 +64,10 @@ def setup():
             print("The camera PMIC failed to start.")
             time.sleep(1)
     # Disable power conservation and use maximum power      
-    BOARD_POWER_SAVE_MODE_PIN = Pin(utilities.BOARD_POWER_SAVE_MODE_PIN, Pin.OUT)
-    BOARD_POWER_SAVE_MODE_PIN.value(1)
-    # Pull down DTR to ensure the modem is not in sleep state
-    MODEM_DTR_PIN = Pin(utilities.MODEM_DTR_PIN, Pin.OUT)
-    MODEM_DTR_PIN.value(0)
+    hw.pin("BOARD_POWER_SAVE_MODE_PIN").value(1)
+    # Pull down DTR to ensure the modem is not in sleep state and turn on the modem
     print("Power on the modem PWRKEY.")
-    # Turn on the modem
-    MODEM_DTR_PIN = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-    MODEM_DTR_PIN.value(0)
-    time.sleep(0.1)
-    MODEM_DTR_PIN.value(1)
-    time.sleep(0.1)
-    MODEM_DTR_PIN.value(0)
+    hw.power_on()
     connect()
     app = Microdot()
     # wait for camera ready
@@ -22,16 +22,19 @@
 '''
 
 import time
-from machine import Pin, UART
 import machine
 import utilities
+import board
 
 # Constants
 uS_TO_S_FACTOR = 1000000  # Conversion factor for microseconds to seconds
 TIME_TO_SLEEP = 30        # Time ESP32 will go to sleep (in seconds)
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # Initialize UART for modem communication
-uart = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 
 def modem_test_at():
     uart.write('AT\r\n')
@@ -63,41 +66,16 @@ def setup():
             i -= 1
         print("TurnON Modem!")
     
-    try:
-        # Turn on DC boost to power on the modem
-        poweron_pin = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-        poweron_pin.value(1)
-        time.sleep(2)
-    except:
-        pass
+    # Turn on DC boost to power on the modem, DTR low keeps it awake
+    hw.supply(True)
+    time.sleep(2)
     
-    try:
-        # Handle modem reset
-        reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-        print("Set Reset Pin.")
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset_pin.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
+    # Handle modem reset
+    print("Set Reset Pin.")
+    hw.reset()
     
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        print("Power on the modem PWRKEY.")
-        pwrkey_pin = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-        pwrkey_pin.value(0)
-        time.sleep(0.1)
-        pwrkey_pin.value(1)
-        time.sleep(0.3)
-        pwrkey_pin.value(0)
-    except:
-        pass
+    print("Power on the modem PWRKEY.")
+    hw.power_key()
     
     try:
         # Pull up DTR to put the modem into sleep
@@ -139,15 +117,12 @@ def setup():
     
     time.sleep(5)
     
-    try:
-        # Turn off DC boost to power off the modem
-        poweron_pin.value(0)
-    except:
-        pass
+    # Turn off DC boost to power off the modem
+    hw.supply(False)
     
     try:
         # Prepare for deep sleep
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
+        hw.pin("MODEM_RESET_PIN").value(not utilities.MODEM_RESET_LEVEL)
         # Note: MicroPython doesn't have direct gpio_hold_en equivalent
         # You might need to handle this differently based on your ESP32 port
     except:
@@ -6,24 +6,23 @@
  * @note
  *            GPS acceleration only supports A7670X/A7608X (excluding A7670G and other versions that do not support positioning).
 '''
-import machine
 import time
-from machine import UART, Pin
-import utilities
+import board
+from atparse import parse_cgnssinfo
+
+# Convert UTC time to local time by adding time zone offset
+timezone_offset = 8  # CST is UTC+8
 
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
 APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 
-# Initialize UART for modem communication
-SerialAT = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-# Initialize pins
-pwrkey = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-poweron = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-gps_enable = Pin(utilities.MODEM_GPS_ENABLE_GPIO, Pin.OUT)
+# Initialize UART for modem communication
+SerialAT = hw.uart()
 
 def send_at_command(command, wait=1):
     SerialAT.write(command + "\r\n")
@@ -76,22 +75,10 @@ def connect_network(apn):
         print("Failed to retrieve IP address.")
         
 def modem_setup():
-    # Turn on DC boost to power on the modem
-    poweron.value(1)
-    
-    # Set modem reset pin ,reset modem
-    reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    reset_pin.value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    
-    # Turn on modem
-    pwrkey.value(0)
-    time.sleep(0.1)
-    pwrkey.value(1)
-    time.sleep(1)
-    pwrkey.value(0)
+    # Turn on DC boost, reset the modem and turn it on
+    hw.supply(True)
+    hw.reset()
+    hw.power_key()
     
     print("Start modem...")
     check_modem()
@@ -108,11 +95,7 @@ def modem_setup():
         print(".")
         retry += 1
         if retry > 10:
-            pwrkey.value(0)
-            time.sleep(0.1)
-            pwrkey.value(1)
-            time.sleep(1)
-            pwrkey.value(0)
+            hw.power_key()
             retry = 0
     print()
     time.sleep(0.2)
@@ -162,7 +145,7 @@ def modem_setup():
     response = send_at_command("AT+CGPSHOT")
     print(response)
     while True:
-        gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
+        hw.gps_enable()
         response = send_at_command("AT+CGNSSPWR=1")
         print(response)
         if response:
@@ -180,49 +163,18 @@ def get_gps_data():
         print("Requesting current GPS/GNSS/GLONASS location")
         response = send_at_command("AT+CGNSSINFO",wait=3)
         print(response)
-        if "+CGNSSINFO: ,,,,,,,," not in response and "ERROR" not in response:
-            data = response.split("+CGNSSINFO: ")[1].split("\n")[0] 
-            values = data.split(",")
-            if len(values) >= 1:  
-                fixMode = values[0]  # Fix mode
-                lat2 = float(values[5])  # Latitude
-                lon2 = float(values[7])  # Longitude
-                if values[12] is not "":
-                    speed2 = float(values[12])  # Speed
-                else:
-                    speed2 = 0.0
-                alt2 = float(values[11])  # Altitude
-                vsat2 = int(values[1])  # Visible satellites
-                usat2 = 0  # GPS_BuiltIn cannot get the number of used satellites
-                accuracy2 = float(values[16])  # Accuracy
-                
-                date_str = values[9]  # Date
-                time_str = values[10]  # Time
-                year2 = int(date_str[4:6])  # Year
-                month2 = int(date_str[2:4])  # Month
-                day2 = int(date_str[:2])  # Day
-                hour2 = int(time_str[:2])  # Hour
-                min2 = int(time_str[2:4])  # Minute
-                sec2 = float(time_str[4:])  # Second
-                
-                # Convert UTC time to local time by adding time zone offset
-                timezone_offset = 8  # CST is UTC+8
-
-                # Adjust hours based on timezone offset
-                hour2 += timezone_offset
-                if hour2 >= 24:
-                    hour2 -= 24
-                elif hour2 < 0:
-                    hour2 += 24
-
-                print("FixMode:", fixMode)
-                print("Latitude:", lat2, "\tLongitude:", lon2)
-                print("Speed:", speed2, "\tAltitude:", alt2)
-                print("Visible Satellites:", vsat2, "\tUsed Satellites:", usat2)
-                print("Accuracy:", accuracy2)
-                print("Year:", year2, "\tMonth:", month2, "\tDay:", day2)
-                print("Hour:", hour2, "\tMinute:", min2, "\tSecond:", int(sec2))
-                break
+        fix = parse_cgnssinfo(response)
+        if fix is not None and fix.fix:
+            usat2 = 0  # GPS_BuiltIn cannot get the number of used satellites
+            hour2 = ((fix.hour or 0) + timezone_offset) % 24  # Convert UTC time to local time
+            print("FixMode:", fix.mode)
+            print("Latitude:", fix.lat, "\tLongitude:", fix.lon)
+            print("Speed:", fix.speed or 0.0, "\tAltitude:", fix.alt)
+            print("Visible Satellites:", fix.sats_gps, "\tUsed Satellites:", usat2)
+            print("Accuracy:", fix.vdop)
+            print("Year:", fix.year, "\tMonth:", fix.month, "\tDay:", fix.day)
+            print("Hour:", hour2, "\tMinute:", fix.minute, "\tSecond:", fix.second)
+            break
         else:
             print("Couldn't get GPS/GNSS/GLONASS location, retrying in 15s.")
             time.sleep(15)
@@ -231,7 +183,7 @@ def get_gps_data():
     gps_raw = send_at_command("AT+CGNSSINFO")
     print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
     print("Disabling GPS")
-#     gps_enable.value(not utilities.MODEM_GPS_ENABLE_LEVEL)
+#     hw.gps_enable(False)
     response = send_at_command("AT+CGNSSPWR=0")
     print(response)
 
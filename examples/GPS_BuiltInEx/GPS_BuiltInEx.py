@@ -7,34 +7,18 @@
  * @note      GPS only supports A7670X/A7608X (excluding A7670G and other
  * versions that do not support positioning).
 '''
-import machine
 import time
-from machine import UART, Pin
 import utilities
+import board
+import modeminfo
+from atmodem import ATModem
+from atparse import parse_cgnssinfo, parse_cgnsinf
 
-# Initialize UART for modem communication
-SerialAT = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-
-# Initialize pins
-try:
-    pwrkey = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-except:
-    pass
-
-try:
-    poweron = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-except:
-    pass
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-try:
-    reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-except:
-    pass
-
-try:
-    gps_enable = Pin(utilities.MODEM_GPS_ENABLE_GPIO, Pin.OUT)
-except:
-    pass
+# Initialize UART for modem communication
+SerialAT = hw.uart()
 
 def send_at_command(command, wait=1):
     SerialAT.write(command + "\r\n")
@@ -48,35 +32,43 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
+# Convert UTC time to local time by adding time zone offset
+timezone_offset = 8  # CST is UTC+8
+
+def print_gnss(fix):
+    # Print a GNSS record of atparse, fields the modem does not report are None
+    print("FixMode:", fix.mode)
+    print("Latitude:", fix.lat)
+    print("tLongitude:", fix.lon)
+    print("Speed:", fix.speed or 0.0)
+    print("Altitude:", fix.alt)
+    if fix.sats_gps is not None:
+        print("Visible Satellites:")
+        print(" GPS Satellites:", fix.sats_gps or 0)
+        print(" BEIDOU Satellites:", fix.sats_beidou or 0)
+        print(" GLONASS Satellites:", fix.sats_glonass or 0)
+        print(" GALILEO Satellites:", fix.sats_galileo or 0)
+    else:
+        print("Satellites in view:", fix.sats_view or 0)
+        print("Satellites used:", fix.sats_used or 0)
+    print("Date Time:")
+    print("Year:", fix.year)
+    print("Month:", fix.month)
+    print("Day:", fix.day)
+    print("Hour:", ((fix.hour or 0) + timezone_offset) % 24)
+    print("Minute:", fix.minute)
+    print("Second:", fix.second)
+    print("Course:", fix.course)
+    print("PDOP:", fix.pdop or 0.0)
+    print("HDOP:", fix.hdop)
+    print("VDOP:", fix.vdop)
+
 def modem_setup():
-    global modemName
-    # Turn on DC boost to power on the modem
-    try:
-        poweron.value(1)
-    except:
-        pass
-    # Set modem reset pin ,reset modem
-    try:
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset_pin.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    # Turn on modem
-    try:
-        pwrkey.value(0)
-        time.sleep(0.1)
-        pwrkey.value(1)
-        time.sleep(1)
-        pwrkey.value(0)
-    except:
-        pass
+    global modemName, gnss_modes
+    # Turn on DC boost, reset the modem and turn it on
+    hw.supply(True)
+    hw.reset()
+    hw.power_key()
     print("Start modem...")
     time.sleep(3)
     retry = 0
@@ -87,47 +79,26 @@ def modem_setup():
         print(".")
         retry += 1
         if retry > 10:
-            try:
-                pwrkey.value(0)
-                time.sleep(0.1)
-                pwrkey.value(1)
-                time.sleep(1)
-                pwrkey.value(0)
-            except:
-                pass
+            hw.power_key()
             retry = 0
     print()
     time.sleep(0.2)
-    # Get modem info
-    modemName = "UNKNOWN"
-    while True:
-        response = send_at_command("AT+CGMM")
-        print(response)
-        if "OK" in response:
-            modemName = response.split("\r\n")[1]
-            if "A7670G" in modemName:
-                while True:
-                    print("A7670G does not support built-in GPS function, please run examples/GPSShield")
-                    time.sleep(1)
-            else:
-                print("Model Name:", modemName)
-                break
-        else:
-            print("Unable to obtain module information normally, try again")
+    # Model and GNSS modes, cached in RTC memory / flash after the first run
+    info = modeminfo.identify(ATModem(SerialAT), path="/modem.json")
+    modemName = info.model
+    gnss_modes = info.gnss_modes
+    if not info.gnss_modes:
+        while True:
+            print(modemName, "does not support built-in GPS function, please run examples/GPSShield")
             time.sleep(1)
-        time.sleep(5)
-    # Send SIMCOMATI command
-    response = send_at_command("AT+SIMCOMATI")
-    print(response)
+    print("Model Name:", modemName, "(cached)" if info.cached else "")
+    print("Revision:", info.revision, "IMEI:", info.imei)
     print("Enabling GPS/GNSS/GLONASS")
     if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G":
         response = send_at_command("AT+CGPIO=0,48,1,1")
         print(response)
         while True:
-            try:
-                gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
-            except:
-                pass
+            hw.gps_enable()
             response = send_at_command("AT+CGNSPWR=1")
             print(response)
             if 'OK' in response:
@@ -139,10 +110,7 @@ def modem_setup():
         response = send_at_command("AT+SGPIO=0,5,1,1")
         print(response)
         while True:
-            try:
-                gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
-            except:
-                pass
+            hw.gps_enable()
             response = send_at_command("AT+CGNSPWR=1")
             print(response)
             if 'OK' in response:
@@ -155,10 +123,7 @@ def modem_setup():
         response = send_at_command("AT+CGPSHOT")
         print(response)
         while True:
-            try:
-                gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
-            except:
-                pass
+            hw.gps_enable()
             response = send_at_command("AT+CGNSSPWR=1")
             print(response)
             if response:
@@ -195,83 +160,12 @@ def loopGPS(gnss_mode):
         while True:
             response = send_at_command("AT+CGNSINF",wait=3)
             print(response)
-            if "+CGNSINF: ,,,,,,,," not in response and "ERROR" not in response and ",,,,,,," not in response:
-                data = response.split("+CGNSINF: ")[1].split("\n")[0] 
-                values = data.split(",")
-                try:
-                    if len(values) >= 1:  
-                        fixMode = values[10]  # Fix mode
-                        latitude = float(values[3])  # Latitude
-                        longitude = float(values[4])  # Longitude
-                        if values[6] is not "":
-                            speed = float(values[6])  # Speed
-                        else:
-                            speed = 0.0
-                        altitude = float(values[5])  # Altitude
-                        if values[14] == "":
-                            gps_satellite_num = 0
-                        else:
-                            gps_satellite_num = int(values[14])
-                        if values[15] == "":
-                            beidou_satellite_num = 0
-                        else:
-                            beidou_satellite_num = int(values[15])
-                        if values[16] == "":
-                            glonass_satellite_num = 0
-                        else:
-                            glonass_satellite_num = int(values[16])
-                        if values[17] == "":
-                            galileo_satellite_num = 0
-                        else:
-                            galileo_satellite_num = int(values[17])
-                        course = 1.0
-                        if values[11] == "":
-                            PDOP = 0.0
-                        else:
-                            PDOP = float(values[11])
-                        HDOP = float(values[10])
-                        VDOP = float(values[12])
-                        date_str = values[2]  # Date Time
-                        year2 = int(date_str[0:4])  # Year
-                        month2 = int(date_str[4:6])  # Month
-                        day2 = int(date_str[6:8])  # Day
-                        hour2 = int(date_str[8:10])  # Hour
-                        min2 = int(date_str[10:12])  # Minute
-                        sec2 = float(date_str[12:14])  # Second
-                        # Convert UTC time to local time by adding time zone offset
-                        timezone_offset = 8  # CST is UTC+8
-                        # Adjust hours based on timezone offset
-                        hour2 += timezone_offset
-                        if hour2 >= 24:
-                            hour2 -= 24
-                        elif hour2 < 0:
-                            hour2 += 24
-                        print("FixMode:", fixMode)
-                        print("Latitude:", latitude)
-                        print("tLongitude:", longitude)
-                        print("Speed:", speed)
-                        print("Altitude:", altitude)
-                        print("Visible Satellites:")
-                        print(" GPS Satellites:", gps_satellite_num)
-                        print(" BEIDOU Satellites:", beidou_satellite_num)
-                        print(" GLONASS Satellites:", glonass_satellite_num)
-                        print(" GALILEO Satellites:", galileo_satellite_num)
-                        print("Date Time:")
-                        print("Year:", year2,)
-                        print("Month:", month2)
-                        print("Day:", day2)
-                        print("Hour:", hour2)
-                        print("Minute:", min2)
-                        print("Second:", int(sec2))
-                        print("Course:", course)
-                        print("PDOP:", PDOP)
-                        print("HDOP:", HDOP)
-                        print("VDOP:", VDOP)
-                        gps_raw = send_at_command("AT+CGNSINF")
-                        print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
-                        break
-                except:
-                    pass
+            fix = parse_cgnsinf(response)
+            if fix is not None and fix.fix:
+                print_gnss(fix)
+                gps_raw = send_at_command("AT+CGNSINF")
+                print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
+                break
     elif utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
         or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
         print("=========================") 
@@ -290,74 +184,12 @@ def loopGPS(gnss_mode):
         while True:
             response = send_at_command("AT+CGNSINF",wait=3)
             print(response)
-            if "+CGNSINF: ,,,,,,,," not in response and "ERROR" not in response and ",,,,,,," not in response:
-                data = response.split("+CGNSINF: ")[1].split("\n")[0] 
-                values = data.split(",")
-                if len(values) >= 1:  
-                    fixMode = values[10]  # Fix mode
-                    latitude = float(values[3])  # Latitude
-                    longitude = float(values[4])  # Longitude
-                    if values[6] is not "":
-                        speed = float(values[6])  # Speed
-                    else:
-                        speed = 0.0
-                    altitude = float(values[5])  # Altitude
-                    if values[14] == "":
-                        gps_satellite_num = 0
-                    else:
-                        gps_satellite_num = int(values[14])
-                    if values[15] == "":
-                        beidou_satellite_num = 0
-                    else:
-                        beidou_satellite_num = int(values[15])
-                    glonass_satellite_num = 0
-                    galileo_satellite_num = 0
-                    course = 1.0
-                    if values[11] == "":
-                        PDOP = 0.0
-                    else:
-                        PDOP = float(values[11])
-                    HDOP = float(values[10])
-                    VDOP = float(values[12])
-                    date_str = values[2]  # Date Time
-                    year2 = int(date_str[0:4])  # Year
-                    month2 = int(date_str[4:6])  # Month
-                    day2 = int(date_str[6:8])  # Day
-                    hour2 = int(date_str[8:10])  # Hour
-                    min2 = int(date_str[10:12])  # Minute
-                    sec2 = float(date_str[12:14])  # Second
-                    # Convert UTC time to local time by adding time zone offset
-                    timezone_offset = 8  # CST is UTC+8
-                    # Adjust hours based on timezone offset
-                    hour2 += timezone_offset
-                    if hour2 >= 24:
-                        hour2 -= 24
-                    elif hour2 < 0:
-                        hour2 += 24
-                    print("FixMode:", fixMode)
-                    print("Latitude:", latitude)
-                    print("tLongitude:", longitude)
-                    print("Speed:", speed)
-                    print("Altitude:", altitude)
-                    print("Visible Satellites:")
-                    print(" GPS Satellites:", gps_satellite_num)
-                    print(" BEIDOU Satellites:", beidou_satellite_num)
-                    print(" GLONASS Satellites:", glonass_satellite_num)
-                    print(" GALILEO Satellites:", galileo_satellite_num)
-                    print("Date Time:")
-                    print("Year:", year2,)
-                    print("Month:", month2)
-                    print("Day:", day2)
-                    print("Hour:", hour2)
-                    print("Minute:", min2)
-                    print("Second:", int(sec2))
-                    print("Course:", course)
-                    print("PDOP:", PDOP)
-                    print("HDOP:", HDOP)
-                    print("VDOP:", VDOP)
-                    gps_raw = send_at_command("AT+CGNSINF")
-                    print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
-                    break
+            fix = parse_cgnsinf(response)
+            if fix is not None and fix.fix:
+                print_gnss(fix)
+                gps_raw = send_at_command("AT+CGNSINF")
+                print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
+                break
     else:
         print("=========================") 
         print(f"Set GPS Mode : {gnss_mode}")
@@ -367,97 +199,18 @@ def loopGPS(gnss_mode):
         while True:
             response = send_at_command("AT+CGNSSINFO",wait=3)
             print(response)
-            if "+CGNSSINFO: ,,,,,,,," not in response and "ERROR" not in response:
-                data = response.split("+CGNSSINFO: ")[1].split("\n")[0] 
-                values = data.split(",")
-                if len(values) >= 1:  
-                    fixMode = values[0]  # Fix mode
-                    latitude = float(values[5])  # Latitude
-                    longitude = float(values[7])  # Longitude
-                    if values[12] is not "":
-                        speed = float(values[12])  # Speed
-                    else:
-                        speed = 0.0
-                    altitude = float(values[11])  # Altitude
-                    if values[1] == "":
-                        gps_satellite_num = 0
-                    else:
-                        gps_satellite_num = int(values[1])
-                    if values[2] == "":
-                        beidou_satellite_num = 0
-                    else:
-                        beidou_satellite_num = int(values[2])
-                    if values[3] == "":
-                        glonass_satellite_num = 0
-                    else:
-                        glonass_satellite_num = int(values[3])
-                    if values[4] == "":
-                        galileo_satellite_num = 0
-                    else:
-                        galileo_satellite_num = int(values[4])
-                    course = 1.0
-                    PDOP = float(values[14])
-                    HDOP = float(values[15])
-                    VDOP = float(values[16])
-                    date_str = values[9]  # Date
-                    time_str = values[10]  # Time
-                    year2 = int(date_str[4:6]) + 2000  # Year
-                    month2 = int(date_str[2:4])  # Month
-                    day2 = int(date_str[:2])  # Day
-                    hour2 = int(time_str[:2])  # Hour
-                    min2 = int(time_str[2:4])  # Minute
-                    sec2 = float(time_str[4:])  # Second
-                    # Convert UTC time to local time by adding time zone offset
-                    timezone_offset = 8  # CST is UTC+8
-                    # Adjust hours based on timezone offset
-                    hour2 += timezone_offset
-                    if hour2 >= 24:
-                        hour2 -= 24
-                    elif hour2 < 0:
-                        hour2 += 24
-                    print("FixMode:", fixMode)
-                    print("Latitude:", latitude)
-                    print("tLongitude:", longitude)
-                    print("Speed:", speed)
-                    print("Altitude:", altitude)
-                    print("Visible Satellites:")
-                    print(" GPS Satellites:", gps_satellite_num)
-                    print(" BEIDOU Satellites:", beidou_satellite_num)
-                    print(" GLONASS Satellites:", glonass_satellite_num)
-                    print(" GALILEO Satellites:", galileo_satellite_num)
-                    print("Date Time:")
-                    print("Year:", year2,)
-                    print("Month:", month2)
-                    print("Day:", day2)
-                    print("Hour:", hour2)
-                    print("Minute:", min2)
-                    print("Second:", int(sec2))
-                    print("Course:", course)
-                    print("PDOP:", PDOP)
-                    print("HDOP:", HDOP)
-                    print("VDOP:", VDOP)
-                    gps_raw = send_at_command("AT+CGNSSINFO")
-                    print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
-                    break
+            fix = parse_cgnssinfo(response)
+            if fix is not None and fix.fix:
+                print_gnss(fix)
+                gps_raw = send_at_command("AT+CGNSSINFO")
+                print("GPS/GNSS Based Location String:", gps_raw.split("\r\n")[1])
+                break
 
 def main():
-    global modemName
     modem_setup()
-    gnss_length = 0
-    a76xx_gnss_mode = [1, 2, 3, 4]
-    sim767x_gnss_mode = [1, 3, 5, 9, 13, 15]
-    sim70xx_gnss_mode = [0, 1, 2]
-    gnss_mode = None
-#     print(modemName)
-    if modemName.startswith("A767"):  # Correct method name: startswith
-        gnss_mode = a76xx_gnss_mode
-        gnss_length = len(a76xx_gnss_mode)
-    elif modemName.startswith("SIMCOM_SIM7080") or modemName.startswith("SIM7000") or modemName.startswith("SIM7070"):
-        gnss_mode = sim70xx_gnss_mode
-        gnss_length = len(sim70xx_gnss_mode)
-    else:
-        gnss_mode = sim767x_gnss_mode
-        gnss_length = len(sim767x_gnss_mode)
+    # A76XX, SIM767X and SIM70XX modes, see modeminfo.GNSS_MODES
+    gnss_mode = gnss_modes
+    gnss_length = len(gnss_mode)
     # Print the result to verify
     print("GNSS Modes:", gnss_mode)
     print("GNSS Length:", gnss_length)
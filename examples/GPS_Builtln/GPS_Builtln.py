@@ -5,34 +5,18 @@
  * @date      2025-08-13
  * @note      GPS only supports A7670X/A7608X/SIM7000G/SIM7600 series (excluding A7670G and other versions that do not support positioning).
 '''
-import machine
 import time
-from machine import UART, Pin
-import utilities
+import board
+from atparse import parse_cgnssinfo, parse_cgnsinf
 
-# Initialize UART for modem communication
-SerialAT = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-
-# Initialize pins
-try:
-    pwrkey = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-except:
-    pass
-
-try:
-    poweron = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-except:
-    pass
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-try:
-    reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-except:
-    pass
+# Initialize UART for modem communication
+SerialAT = hw.uart()
 
-try:
-    gps_enable = Pin(utilities.MODEM_GPS_ENABLE_GPIO, Pin.OUT)
-except:
-    pass
+# Convert UTC time to local time by adding time zone offset
+timezone_offset = 8  # CST is UTC+8
 
 def send_at_command(command, wait=1):
     SerialAT.write(command + "\r\n")
@@ -48,37 +32,10 @@ def send_at_command(command, wait=1):
     return ""
 
 def modem_setup():
-    # Turn on DC boost to power on the modem
-    try:
-        poweron.value(1)
-    except:
-        pass
-    
-    # Set modem reset pin ,reset modem
-    try:
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset_pin.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    # Turn on modem
-    try:
-        pwrkey.value(0)
-        time.sleep(0.1)
-        pwrkey.value(1)
-        time.sleep(1)
-        pwrkey.value(0)
-    except:
-        pass
-    
+    # Turn on DC boost, reset the modem and turn it on
+    hw.supply(True)
+    hw.reset()
+    hw.power_key()
     print("Start modem...")
     time.sleep(3)
     retry = 0
@@ -89,14 +46,7 @@ def modem_setup():
         print(".")
         retry += 1
         if retry > 10:
-            try:
-                pwrkey.value(0)
-                time.sleep(0.1)
-                pwrkey.value(1)
-                time.sleep(1)
-                pwrkey.value(0)
-            except:
-                pass
+            hw.power_key()
             retry = 0
     print()
     time.sleep(0.2)
@@ -137,16 +87,11 @@ def modem_setup():
 #     +CGNSSINFO: 2,04,00,21.xxxxx,N,114.xxxxxxxx,E,020924,094145.00,-34.0,1.403,,6.9,6.8,1.0,03
     
     print("Enabling GPS/GNSS/GLONASS")
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CGPIO=0,48,1,1")
         print(response)
         while True:
-            try:
-                gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
-            except:
-                pass
+            hw.gps_enable()
             response = send_at_command("AT+CGNSPWR=1")
             print(response)
             if 'OK' in response:
@@ -159,7 +104,7 @@ def modem_setup():
         response = send_at_command("AT+CGPSHOT")
         print(response)
         while True:
-            gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
+            hw.gps_enable()
             response = send_at_command("AT+CGNSSPWR=1")
             print(response)
             if response:
@@ -171,52 +116,23 @@ def modem_setup():
         print(response)
 
 def get_gps_data():
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         while True:
             print("Requesting current GPS/GNSS/GLONASS location")
             response = send_at_command("AT+CGNSINF",wait=3)
             print(response)
-            if "+CGNSINF: ,,,,,,,," not in response and "ERROR" not in response and ",,,,,,," not in response:
-                data = response.split("+CGNSINF: ")[1].split("\n")[0] 
-                values = data.split(",")
-                if len(values) >= 1:  
-                    fixMode = values[8]  # Fix mode
-                    lat2 = float(values[3])  # Latitude
-                    lon2 = float(values[4])  # Longitude
-                    if values[6] is not "":
-                        speed2 = float(values[6])  # Speed
-                    else:
-                        speed2 = 0.0
-                    alt2 = float(values[5])  # Altitude
-                    vsat2 = int(values[14])  # Visible satellites
-                    usat2 = 0  # GPS_BuiltIn cannot get the number of used satellites
-                    accuracy2 = float(values[11])  # Accuracy
-                    
-                    date_str = values[2]  # Date Time
-                    year2 = int(date_str[:4]) # Year
-                    month2 = int(date_str[4:6])  # Month
-                    day2 = int(date_str[6:8])  # Day
-                    hour2 = int(date_str[8:10])  # Hour
-                    min2 = int(date_str[10:12])  # Minute
-                    sec2 = float(date_str[12:14])  # Second
-                    # Convert UTC time to local time by adding time zone offset
-                    timezone_offset = 8  # CST is UTC+8
-                    # Adjust hours based on timezone offset
-                    hour2 += timezone_offset
-                    if hour2 >= 24:
-                        hour2 -= 24
-                    elif hour2 < 0:
-                        hour2 += 24
-                    print("FixMode:", fixMode)
-                    print("Latitude:", lat2, "\tLongitude:", lon2)
-                    print("Speed:", speed2, "\tAltitude:", alt2)
-                    print("Visible Satellites:", vsat2, "\tUsed Satellites:", usat2)
-                    print("Accuracy:", accuracy2)
-                    print("Year:", year2, "\tMonth:", month2, "\tDay:", day2)
-                    print("Hour:", hour2, "\tMinute:", min2, "\tSecond:", int(sec2))
-                    break
+            fix = parse_cgnsinf(response)
+            if fix is not None and fix.fix:
+                usat2 = 0  # GPS_BuiltIn cannot get the number of used satellites
+                hour2 = ((fix.hour or 0) + timezone_offset) % 24  # Convert UTC time to local time
+                print("FixMode:", fix.mode)
+                print("Latitude:", fix.lat, "\tLongitude:", fix.lon)
+                print("Speed:", fix.speed or 0.0, "\tAltitude:", fix.alt)
+                print("Visible Satellites:", fix.sats_view, "\tUsed Satellites:", usat2)
+                print("Accuracy:", fix.pdop)
+                print("Year:", fix.year, "\tMonth:", fix.month, "\tDay:", fix.day)
+                print("Hour:", hour2, "\tMinute:", fix.minute, "\tSecond:", fix.second)
+                break
             else:
                 print("Couldn't get GPS/GNSS/GLONASS location, retrying in 15s.")
                 time.sleep(15)
@@ -231,45 +147,18 @@ def get_gps_data():
             print("Requesting current GPS/GNSS/GLONASS location")
             response = send_at_command("AT+CGNSSINFO",wait=3)
             print(response)
-            if "+CGNSSINFO: ,,,,,,,," not in response and "ERROR" not in response:
-                data = response.split("+CGNSSINFO: ")[1].split("\n")[0] 
-                values = data.split(",")
-                if len(values) >= 1:  
-                    fixMode = values[0]  # Fix mode
-                    lat2 = float(values[5])  # Latitude
-                    lon2 = float(values[7])  # Longitude
-                    if values[12] is not "":
-                        speed2 = float(values[12])  # Speed
-                    else:
-                        speed2 = 0.0
-                    alt2 = float(values[11])  # Altitude
-                    vsat2 = int(values[1])  # Visible satellites
-                    usat2 = 0  # GPS_BuiltIn cannot get the number of used satellites
-                    accuracy2 = float(values[16])  # Accuracy
-                    date_str = values[9]  # Date
-                    time_str = values[10]  # Time
-                    year2 = int(date_str[4:6])  # Year
-                    month2 = int(date_str[2:4])  # Month
-                    day2 = int(date_str[:2])  # Day
-                    hour2 = int(time_str[:2])  # Hour
-                    min2 = int(time_str[2:4])  # Minute
-                    sec2 = float(time_str[4:])  # Second
-                    # Convert UTC time to local time by adding time zone offset
-                    timezone_offset = 8  # CST is UTC+8
-                    # Adjust hours based on timezone offset
-                    hour2 += timezone_offset
-                    if hour2 >= 24:
-                        hour2 -= 24
-                    elif hour2 < 0:
-                        hour2 += 24
-                    print("FixMode:", fixMode)
-                    print("Latitude:", lat2, "\tLongitude:", lon2)
-                    print("Speed:", speed2, "\tAltitude:", alt2)
-                    print("Visible Satellites:", vsat2, "\tUsed Satellites:", usat2)
-                    print("Accuracy:", accuracy2)
-                    print("Year:", year2, "\tMonth:", month2, "\tDay:", day2)
-                    print("Hour:", hour2, "\tMinute:", min2, "\tSecond:", int(sec2))
-                    break
+            fix = parse_cgnssinfo(response)
+            if fix is not None and fix.fix:
+                usat2 = 0  # GPS_BuiltIn cannot get the number of used satellites
+                hour2 = ((fix.hour or 0) + timezone_offset) % 24  # Convert UTC time to local time
+                print("FixMode:", fix.mode)
+                print("Latitude:", fix.lat, "\tLongitude:", fix.lon)
+                print("Speed:", fix.speed or 0.0, "\tAltitude:", fix.alt)
+                print("Visible Satellites:", fix.sats_gps, "\tUsed Satellites:", usat2)
+                print("Accuracy:", fix.vdop)
+                print("Year:", fix.year, "\tMonth:", fix.month, "\tDay:", fix.day)
+                print("Hour:", hour2, "\tMinute:", fix.minute, "\tSecond:", fix.second)
+                break
             else:
                 print("Couldn't get GPS/GNSS/GLONASS location, retrying in 15s.")
                 time.sleep(15)
@@ -5,31 +5,17 @@
  * @date      2025-08-06
  * @note      GPS only supports A7670X/A7608X/SIM7000G/SIM7600 series (excluding A7670G and other versions that do not support positioning).
 '''
-import machine
 import time
-from machine import UART, Pin
 import utilities
+import board
+import cmux
+from atmodem import ATModem, AT_OK
 
-# Initialize UART for modem communication
-SerialAT = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-
-# Initialize pins
-try:
-    pwrkey = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-except:
-    pass
-
-try:
-    poweron = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-except:
-    pass
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-try:
-    reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-except:
-    pass
-
-gps_enable = Pin(utilities.MODEM_GPS_ENABLE_GPIO, Pin.OUT)
+# Initialize UART for modem communication
+SerialAT = hw.uart()
 
 def send_at_command(command, wait=1):
     SerialAT.write(command + "\r\n")
@@ -45,36 +31,10 @@ def send_at_command(command, wait=1):
 
 def modem_setup():
     global modemName
-    # Turn on DC boost to power on the modem
-    try:
-        poweron.value(1)
-    except:
-        pass
-    
-    # Set modem reset pin ,reset modem
-    try:
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset_pin.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    # Turn on modem
-    try:
-        pwrkey.value(0)
-        time.sleep(0.1)
-        pwrkey.value(1)
-        time.sleep(1)
-        pwrkey.value(0)
-    except:
-        pass
+    # Turn on DC boost, reset the modem and turn it on
+    hw.supply(True)
+    hw.reset()
+    hw.power_key()
     print("Start modem...")
     time.sleep(3)
     retry = 0
@@ -85,14 +45,7 @@ def modem_setup():
         print(".")
         retry += 1
         if retry > 10:
-            try:
-                pwrkey.value(0)
-                time.sleep(0.1)
-                pwrkey.value(1)
-                time.sleep(1)
-                pwrkey.value(0)
-            except:
-                pass
+            hw.power_key()
             retry = 0
     print()
     time.sleep(0.2)
@@ -120,7 +73,7 @@ def modem_setup():
         response = send_at_command("AT+CGPIO=0,48,1,1")
         print(response)
         while True:
-            gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
+            hw.gps_enable()
             response = send_at_command("AT+CGNSPWR=1")
             print(response)
             if 'OK' in response:
@@ -136,18 +89,15 @@ def modem_setup():
         print(response)
         response = send_at_command("AT+CGNSCFG=2")
         print(response)
-        response = send_at_command("AT+CGNSTST=1")
-        print(response)
         response = send_at_command("AT+CGNSPWR=1")
-        print(response)   
-        print("Next you should see NMEA sentences in the serial monitor");
+        print(response)
     else:
         response = send_at_command("AT+CVAUXS=1")
         print(response)
         response = send_at_command("AT+CGPSHOT")
         print(response)
         while True:
-            gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
+            hw.gps_enable()
             response = send_at_command("AT+CGNSSPWR=1")
             print(response)
             if response:
@@ -163,27 +113,48 @@ def modem_setup():
         print(response)
         response = send_at_command("AT+CGNSSPWR?",wait=2)
         print(response)
-        response = send_at_command("AT+CGNSSTST=1",wait=2)
-        print(response)
         response = send_at_command("AT+CGNSSPORTSWITCH=0,1",wait=2)
-        print(response) 
-        print("Next you should see NMEA sentences in the serial monitor")
-    
+        print(response)
+
+
+def start_mux():
+    # CMUX: DLC 1 stays free for AT commands, NMEA is sent on DLC 3
+    mux = cmux.CMux(SerialAT, channels=(1, 3))
+    # AT+CMUX=0 once: after its OK the modem only takes frames, retries just open the DLCs
+    modem = ATModem(SerialAT)
+    while modem.run(b"AT+CMUX=0") != AT_OK:
+        print("Failed to enter CMUX mode, try again")
+        time.sleep(1)
+    while not mux.start():
+        print("Failed to open the CMUX channels, try again")
+        time.sleep(1)
+    control = ATModem(mux.channel(1))
+    nmea = mux.channel(3)
+    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G":
+        print(ATModem(nmea).command("AT+CGNSTST=1"))
+    else:
+        print(ATModem(nmea).command("AT+CGNSSTST=1"))
+    print("Next you should see NMEA sentences in the serial monitor")
+    return mux, control, nmea
 
-def output_loop():
-    response = send_at_command("AT+CGNSPWR?")
-    print(response)
-    time.sleep(1)
+def output_loop(mux, control, nmea):
+    last = time.ticks_ms()
+    while True:
+        line = nmea.readline()
+        if line:
+            print(line.decode(), end="")
+        else:
+            time.sleep(0.001)
+        # Commands keep working while NMEA is streaming
+        if time.ticks_diff(time.ticks_ms(), last) > 10000:
+            last = time.ticks_ms()
+            print(control.command("AT+CSQ")[1])
 
 def main():
     global modemName
     modem_setup()
-    output_loop()
-    # Just echo serial data
-    while True:
-        if SerialAT.any():
-            print(SerialAT.read().decode(), end="")
-        time.sleep(0.001)
+    mux, control, nmea = start_mux()
+    output_loop(mux, control, nmea)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,32 +5,18 @@
  * @date      2025-08-09
  * @note      GPS only supports A7670X/A7608X/SIM7000G/SIM7600 series (excluding A7670G and other versions that do not support positioning).
 '''
-import machine
 import time
-from machine import UART, Pin
 from math import radians, sin, cos, sqrt, atan2, degrees
 import utilities
+import board
+import modeminfo
+from atmodem import ATModem
 
-# Initialize UART for modem communication
-SerialAT = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-
-# Initialize pins
-try:
-    pwrkey = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-except:
-    pass
-
-try:
-    poweron = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-except:
-    pass
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-try:
-    reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-except:
-    pass
-
-gps_enable = Pin(utilities.MODEM_GPS_ENABLE_GPIO, Pin.OUT)
+# Initialize UART for modem communication
+SerialAT = hw.uart()
 
 sentences_with_fix = 0
 failed_checksum = 0
@@ -52,33 +38,12 @@ def send_at_command(command, wait=1):
 
 def modem_setup():
     global modemName
-    # Turn on DC boost to power on the modem
-    try:
-        poweron.value(1)
-    except:
-        pass
+    # Turn on DC boost to power on the modem, DTR low keeps it awake
+    hw.supply(True)
     # Set modem reset pin ,reset modem
-    try:
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset_pin.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
+    hw.reset()
     # Turn on modem
-    try:
-        pwrkey.value(0)
-        time.sleep(0.1)
-        pwrkey.value(1)
-        time.sleep(1)
-        pwrkey.value(0)
-    except:
-        pass
+    hw.power_key()
     print("Start modem...")
     time.sleep(3)
     retry = 0
@@ -89,40 +54,27 @@ def modem_setup():
         print(".")
         retry += 1
         if retry > 10:
-            pwrkey.value(0)
-            time.sleep(0.1)
-            pwrkey.value(1)
-            time.sleep(1)
-            pwrkey.value(0)
+            hw.power_key()
             retry = 0
     print()
     time.sleep(0.2)
     
-    # Get modem info
-    modemName = "UNKNOWN"
-    while True:
-        response = send_at_command("AT+CGMM")
-        print(response)
-        if "OK" in response:
-            modemName = response.split("\r\n")[1]
-            if "A7670G" in modemName:
-                while True:
-                    print("A7670G does not support built-in GPS function, please run examples/GPSShield")
-                    time.sleep(1)
-            else:
-                print("Model Name:", modemName)
-                break
-        else:
-            print("Unable to obtain module information normally, try again")
+    # Model and GNSS modes, cached in RTC memory / flash after the first run
+    info = modeminfo.identify(ATModem(SerialAT), path="/modem.json")
+    modemName = info.model
+    if not info.gnss_modes:
+        while True:
+            print(modemName, "does not support built-in GPS function, please run examples/GPSShield")
             time.sleep(1)
-        time.sleep(5)
+    print("Model Name:", modemName, "(cached)" if info.cached else "")
+    print("Revision:", info.revision, "IMEI:", info.imei)
     
     print("Enabling GPS/GNSS/GLONASS")
     if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G":
         response = send_at_command("AT+CGPIO=0,48,1,1")
         print(response)
         while True:
-            gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
+            hw.gps_enable()
             response = send_at_command("AT+CGNSPWR=1")
             print(response)
             if 'OK' in response:
@@ -139,7 +91,7 @@ def modem_setup():
         response = send_at_command("AT+CGPSHOT")
         print(response)
         while True:
-            gps_enable.value(utilities.MODEM_GPS_ENABLE_LEVEL)
+            hw.gps_enable()
             response = send_at_command("AT+CGNSSPWR=1")
             print(response)
             if response:
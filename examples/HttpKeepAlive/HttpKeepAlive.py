@@ -0,0 +1,61 @@
+'''
+#   @file      HttpKeepAlive.py
+#   @license   MIT
+#   @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#   @date      2026-10-18
+#   @note
+#   Example is suitable for A7670X/A7608X/SIM7670G/SIM7000G/SIM7080G series
+#   Posts a reading to https://httpbin.org every minute over one kept-alive TLS connection:
+#   the TCP and TLS handshake is paid for the first request only (libraries/modemhttp.py).
+#   New connections use the address cached by libraries/modemdns.py instead of a lookup.
+#   Copy libraries/atmodem.py, board.py, modemboot.py, modemnet.py, modemsock.py, rtcmem.py,
+#   modemdns.py and modemhttp.py to the board together with utilities.py
+'''
+import time
+import board
+from atmodem import ATModem
+import modemboot
+import modemnet
+import modemhttp
+import modemdns
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
+# It depends on the operator whether to set up an APN. If some operators do not set up an APN,
+# they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
+# APNs from other operators are welcome to submit PRs for filling.
+APN = ""  # Replace with your APN (CHN-CT: China Telecom)
+
+post_url = "https://httpbin.org/post"
+interval = 60  # Seconds between the reports
+
+uart = hw.uart()
+modem = ATModem(uart)
+
+def main():
+    print("Start modem...")
+    modemboot.boot(modem)
+    net = modemnet.Registration(modem, apn=APN)
+    net.start()
+    while not net.wait(60000):
+        print("Not attached yet:", net.metrics())
+    print("Network attached")
+
+    # httpbin.org keeps idle connections for a few minutes, reuse them for a bit longer than the interval
+    dns = modemdns.Resolver(modem, ttl=3600)
+    pool = modemhttp.Pool(modem, max_connections=1, idle_ms=(interval + 30) * 1000, resolver=dns)
+    count = 0
+    while True:
+        start = time.ticks_ms()
+        try:
+            response = pool.post(post_url, json={"count": count, "uptime": time.ticks_ms()})
+            print(response.status, response.json()["json"])
+        except OSError as e:
+            print("Request failed:", e)
+        print("Request took %d ms," % time.ticks_diff(time.ticks_ms(), start), pool.metrics(), dns.metrics())
+        count += 1
+        modem.poll(interval * 1000)
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,14 @@
 #   Connect https://httpbin.org test get request
 '''
 import time
-import machine
-import utilities
+import board
 import re
+from atmodem import ATModem, AT_OK
+import modemboot
+import modemnet
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
@@ -27,53 +32,22 @@ request_urls = [
 ]
 
 # Initialize the UART interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-time.sleep(1)
+uart = hw.uart()
+modem = ATModem(uart)
 lens = 0
 
-# Modem power on and reset sequence
-def modem_power_on():
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-def modem_reset():
-    try:
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
-def send_at_command(command,wait=1):
-    uart.write(command + "\r\n")
-    time.sleep(wait)
-    response = uart.read()
-    if response:
-        return response.decode("utf-8", "ignore").strip()
-    return ""
+# Returns as soon as the modem answers, wait is only the upper bound in seconds
+def send_at_command(command, wait=1, terminator=None):
+    return modem.send_at_command(command, wait, terminator)
 
-def check_modem():
+def start_modem():
+    # Power on (if needed) and return once the modem answers and the SIM is ready
     print("Start modem...")
-    while True:
-        response = send_at_command("AT")
-        if "OK" in response:
-            print()  # Print a newline for clarity
-            break
-        else:
-            print(".", end="")
+    boot = modemboot.boot(modem)
+    if boot.ready:
+        print("Modem ready in %d ms" % boot.ms)
+    else:
+        print("Modem not ready after %d ms:" % boot.ms, boot.events)
 
 def check_sim():
     while True:
@@ -86,53 +60,25 @@ def check_sim():
             time.sleep(3)
 
 def connect_network(apn):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
-        response = send_at_command("AT+CNMP=2")
-        print(response)
-        response = send_at_command("AT+CNMP=?")
-        print(response)
-        print("Wait for the modem to register with the network.")
-        response = send_at_command("AT+CEREG?")
-        print(response)
-        if "OK" in response:
-            print("Online registration successful")
-        response = send_at_command("AT+CPSI?")
-        print(response)
-        response = send_at_command("AT+CNACT?",wait=3)
-        print(response)
-        response = send_at_command("AT+CNACT=0,1")
-        print(response)
-        response = send_at_command("AT+CNACT?",wait=3)
-        print(response)
-        match = re.search(r'"(\d+\.\d+\.\d+\.\d+)"', response)
-        if match:
-            ip_address = match.group(1)
-            print("Network IP:", ip_address)
+    # Registration URCs drive the PDP attach, failures back off instead of looping
+    print("Wait for the modem to register with the network.")
+    net = modemnet.Registration(modem, apn=apn)
+    net.start()
+    while not net.wait(60000):
+        print("Not attached yet:", net.metrics())
+    metrics = net.metrics()
+    print("Online registration successful, attached in %d ms" % metrics["attach_ms"])
+    response = send_at_command("AT+CNACT?" if net.dialect == modemnet.SIM70XX else "AT+IPADDR")
+    match = re.search(r'(\d+\.\d+\.\d+\.\d+)', response)
+    if match:
+        print("Network IP:", match.group(1))
     else:
-        send_at_command(f"AT+CGDCONT=1,\"IP\",\"{apn}\"")
-        send_at_command("AT+CGATT=1")  # Attach to the GPRS
-        while True:
-            response = send_at_command("AT+NETOPEN",wait=3)
-            if "OK" in response or "+NETOPEN: 0" in response:
-                print("Online registration successful")
-                break
-            else:
-                print("Network registration was rejected, please check if the APN is correct")
-
-        # Get the IP address
-        ip_response = send_at_command("AT+IPADDR")
-        if ip_response:
-            print("Network IP:", ip_response)
-        else:
-            print("Failed to retrieve IP address.")
+        print("Failed to retrieve IP address.")
+    net.stop()
 
 def perform_https_requests():
     global lens
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         for url in request_urls:
             first_slash_index = url.find('/', 8) 
             if first_slash_index != -1:
@@ -147,41 +93,36 @@ def perform_https_requests():
                 print(response)
                 response = send_at_command('AT+CSSLCFG="sni",0,1')
                 print(response)
-                response = send_at_command("AT+SHCHEAD")
-                print(response)
-                response = send_at_command('AT+SHCONF="BODYLEN",1024')
-                print(response)
-                response = send_at_command('AT+SHCONF="HEADERLEN",350')
-                print(response)
-                response = send_at_command('AT+SHCONF="IPVER",0')
-                print(response)
-                response = send_at_command('AT+SHCONF="TIMEOUT",60')
-                print(response)
                 print("Request URL :", url)
-                response = send_at_command('AT+CSSLCFG=\"sslversion\",1,3')
-                print(response)
-                response = send_at_command('AT+SHSSL=1,\"\"')
-                print(response)
-                response = send_at_command(f'AT+SHCONF="URL",\"{url1}\"')
-                print(response)
-                response = send_at_command("AT+SHCONN",wait=3)
-                print(response)
-                while True:
-                    response = send_at_command("AT+SHCONN",wait=3)
-                    if 'OK' in response or 'ERROR' in response:
-                        print(response)
-                        break
-                response = send_at_command(f'AT+SHREQ=\"{url2}\",1',wait=3)
+                # Session configuration runs back to back and stops at the first error
+                setup = [
+                    "AT+SHCHEAD",
+                    'AT+SHCONF="BODYLEN",1024',
+                    'AT+SHCONF="HEADERLEN",350',
+                    'AT+SHCONF="IPVER",0',
+                    'AT+SHCONF="TIMEOUT",60',
+                    'AT+CSSLCFG="sslversion",1,3',
+                    'AT+SHSSL=1,""',
+                    f'AT+SHCONF="URL","{url1}"',
+                    "AT+SHCONN",
+                ]
+                results = modem.batch(setup, timeout=30000)
+                for status, response in results:
+                    print(response)
+                if len(results) < len(setup) or results[-1][0] != AT_OK:
+                    print("Failed to configure the HTTP(S) session")
+                    retry -= 1
+                    continue
+                response = send_at_command(f'AT+SHREQ=\"{url2}\",1', wait=60, terminator="+SHREQ:")
                 print(response)
-                time.sleep(3)
                 match = re.search(r'(\d+)$', response)
                 if match:
                     lens = int(match.group(1))
                     print(lens)
-                    time.sleep(3)
                 print("HTTP Header : SIM70XX MODEM does not support getting request header")
-                response = send_at_command(f'AT+SHREAD=0,{lens}')
+                response = send_at_command(f'AT+SHREAD=0,{lens}', wait=10, terminator="+SHREAD:")
                 print(response)
+                print(modem.read_data(lens, timeout=10000).decode("utf-8", "ignore"))
                 break
             print("-------------------------------------")
             
@@ -212,7 +153,7 @@ def perform_https_requests():
                     continue  # Retry setting the URL
 
                 # Send GET request (AT+HTTPACTION=0 means GET request)
-                http_code = send_at_command("AT+HTTPACTION=0")
+                http_code = send_at_command("AT+HTTPACTION=0", wait=60, terminator="+HTTPACTION:")
                 if "ERROR" in http_code or "HTTPACTION" not in http_code:
                     print("HTTP get failed ! error code =", http_code)
                     retry -= 1
@@ -225,9 +166,6 @@ def perform_https_requests():
                 else:
                     print(f"Unexpected HTTP status: {http_code}")
 
-                # Wait for the response to be fully received
-                time.sleep(3)
-
                 # Get HTTP header
                 header = send_at_command("AT+HTTPHEAD")
                 if "OK" not in header:
@@ -236,23 +174,20 @@ def perform_https_requests():
                     print("HTTP Header :", header)
 
                 # Get HTTP response body with a specified buffer length
-                body = send_at_command("AT+HTTPREAD=0,1024")  # Reading the body with a buffer size of 1024 bytes
-                if "OK" not in body:
+                body = send_at_command("AT+HTTPREAD=0,1024", wait=10, terminator="+HTTPREAD: 0")  # Reading the body with a buffer size of 1024 bytes
+                if "+HTTPREAD: 0" not in body:
                     print("Failed to get HTTP body:", body)
                 else:
                     print("HTTP body :", body)
 
                 # End of request
-                time.sleep(3)
                 break  # Exit while loop if request is successful
 
             print("-------------------------------------")
 
 def main():
     print("Start Sketch")
-    modem_power_on()
-    modem_reset()
-    check_modem()
+    start_modem()
     check_sim()
     connect_network(APN)
     perform_https_requests()
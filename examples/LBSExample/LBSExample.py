@@ -7,11 +7,14 @@
 '''
 import time
 import machine
-import utilities
+import board
 import re
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 
 def send_at_command(command,wait=1):
     uart.write(command + "\r\n")
@@ -21,20 +24,6 @@ def send_at_command(command,wait=1):
         return response.decode("utf-8", "ignore").strip()
     return ""
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(1)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(0)
-
 def check_modem():
     print("Starting modem...")
     while True:
@@ -47,13 +36,13 @@ def check_modem():
     
 def main():
     # Turn on DC boost to power on the modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
+    hw.supply(True)
     # Set modem reset pin ,reset modem
-    modem_reset()
+    hw.reset()
     # Turn on modem
-    modem_power_on()
+    hw.power_key()
     # Set ring pin input
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
     check_modem()
     time.sleep(10)
     while True:
@@ -5,13 +5,14 @@
 #   @note      Known issues, ESP32 (V1.2) version of T-A7670, T-A7608,
 #              when using battery power supply mode, BOARD_POWERON_PIN (IO12) must be set to high level after esp32 starts, otherwise a reset will occur.
 
-import machine
 import time
-from machine import Pin, UART
-import utilities
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize UART for modem communication
-uart = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 
 def modem_test_at():
     uart.write('AT\r\n')
@@ -22,9 +23,7 @@ def modem_test_at():
     return False
 
 def modem_poweroff():
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         uart.write('AT+CPOWD=1\r\n')
         time.sleep(3)
         if uart.any():
@@ -44,40 +43,13 @@ def modem_poweroff():
 def setup():
     print("Start Sketch")
     
-    try:
-        # Set Power control pin output (important for battery power)
-        poweron_pin = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-        poweron_pin.value(1)
-        print("Set BOARD_POWERON_PIN high to prevent reset")
-    except:
-        pass
-    
-    try:
-        # Set modem reset pin, reset modem
-        reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        reset_pin.value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        # PowerKey Control modem power on
-        pwrkey_pin = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-        pwrkey_pin.value(0)
-        time.sleep(0.1)
-        pwrkey_pin.value(1)
-        time.sleep(0.1)
-        pwrkey_pin.value(0)
-    except:
-        pass
+    # Set Power control pin output (important for battery power), DTR low
+    hw.supply(True)
+    print("Set BOARD_POWERON_PIN high to prevent reset")
+
+    # Reset the modem where the board has a reset pin, then PowerKey power on
+    hw.reset()
+    hw.power_key()
     
     # Test modem connected
     print("Waiting for modem to respond...")
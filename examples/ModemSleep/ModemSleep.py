@@ -7,23 +7,20 @@
 #              When using USB power supply, the modem cannot be set to sleep mode. Please see README for details.  
 import machine
 import time
-from machine import Pin, UART
-import utilities
+import board
+from atmodem import ATModem
+import modemboot
 
 # Constants
 uS_TO_S_FACTOR = 1000000  # Conversion factor for microseconds to seconds
 TIME_TO_SLEEP = 30        # Time ESP32 will go to sleep (in seconds)
 
-# Initialize UART for modem communication
-uart = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-def modem_test_at():
-    uart.write('AT\r\n')
-    time.sleep(0.1)
-    if uart.any():
-        response = uart.read().decode().strip()
-        return "OK" in response
-    return False
+# Initialize UART for modem communication
+uart = hw.uart()
+modem = ATModem(uart)
 
 def modem_sleep_enable(enable):
     cmd = 'AT+CSCLK={}\r\n'.format(1 if enable else 0)
@@ -37,67 +34,26 @@ def modem_sleep_enable(enable):
 def setup():
     print("Initializing...")
     
-    try:
-        # Turn on DC boost to power on the modem
-        poweron_pin = Pin(utilities.BOARD_POWERON_PIN, Pin.OUT)
-        poweron_pin.value(1)
-    except:
-        pass
-    
+    # Turn on DC boost to power on the modem
+    hw.supply(True)
     
-    wake_reason = machine.reset_cause()
-    if wake_reason != machine.DEEPSLEEP_RESET:
-        try:
-            reset_pin = Pin(utilities.MODEM_RESET_PIN, Pin.OUT)
-            print("Set Reset Pin.")
-            reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-            time.sleep(0.1)
-            reset_pin.value(utilities.MODEM_RESET_LEVEL)
-            time.sleep(2.6)
-            reset_pin.value(not utilities.MODEM_RESET_LEVEL)
-        except:
-            pass
-        
-        try:
-            machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-        except:
-            pass
     
-        try:
-            print("Power on modem PWRKEY")
-            pwrkey_pin = Pin(utilities.BOARD_PWRKEY_PIN, Pin.OUT)
-            pwrkey_pin.value(0)
-            time.sleep(0.1)
-            pwrkey_pin.value(1)
-            time.sleep(0.1)
-            pwrkey_pin.value(0)
-        except:
-            pass
-    else:
+    # Powers the modem on after a cold start. After deep sleep the modem is still running:
+    # boot() pulls DTR low, which wakes it from AT+CSCLK=1 sleep, and returns on the first AT.
+    if machine.reset_cause() == machine.DEEPSLEEP_RESET:
         print("Wakeup modem!")
-        try:
-            dtr_pin = Pin(utilities.MODEM_DTR_PIN, Pin.OUT)
-            dtr_pin.value(0)
-            time.sleep(2)
-            modem_sleep_enable(False)
-            time.sleep(10)
-        except:
-            pass
-    
     print("Check modem online.")
-    while not modem_test_at():
-        print(".", end='')
-        time.sleep(0.5)
-    print("\nModem is online!")
+    boot = modemboot.boot(modem, wait=())
+    if machine.reset_cause() == machine.DEEPSLEEP_RESET:
+        modem_sleep_enable(False)
+    print("Modem is online after %d ms!" % boot.ms)
     time.sleep(5)
     print("Enter modem sleep mode!")
     
-    try:
-        dtr_pin = Pin(utilities.MODEM_DTR_PIN, Pin.OUT)
+    dtr_pin = hw.pin("MODEM_DTR_PIN")
+    if dtr_pin is not None:
         dtr_pin.value(1)
         time.sleep(1)
-    except:
-        pass
     
     if not modem_sleep_enable(True):
         print("modem sleep failed!")
@@ -12,8 +12,7 @@
 #   Youtube : https://youtu.be/am-rTDzm4lQ
 '''
 import time
-import machine
-import utilities
+import board
 import ubinascii
 from umqtt.robust import MQTTClient
 from certs import AmazonRootCA, AWSClientCertificate, AWSClientPrivateKey
@@ -29,8 +28,11 @@ mqtt_client_id = "A76XX"  # Unique client ID for MQTT
 mqtt_publish_topic = "GsmMqttTest/publish"  # Topic for publishing messages
 mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Topic for subscribing to messages
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 time.sleep(1)
 __ssl = 0  # SSL flag
 
@@ -47,22 +49,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-# Function to power on the modem
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)  # Activate power key
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)  # Deactivate power key
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)  # Set power key low again
-
-# Function to reset the modem
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
 # Function to check if the modem is ready
 def check_modem():
     print("Starting modem...")
@@ -283,8 +269,8 @@ def mqtt_publish(client_index, topic, message):
 # Main function that orchestrates the modem operation and MQTT connection
 def main():
     print("Starting sketch...")
-    modem_power_on()  # Power on the modem
-    modem_reset()  # Reset the modem
+    hw.power_on()  # Power on the modem
+    hw.reset()  # Reset the modem
     check_modem()  # Verify the modem is operational
     check_sim()  # Check SIM card status
     print("Wait for the modem to register with the network.")
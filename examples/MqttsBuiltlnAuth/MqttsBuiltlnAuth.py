@@ -8,12 +8,14 @@
 #   Connect MQTT Broker as https://test.mosquitto.org/
 '''
 import time
-import machine
-import utilities
+import board
 import ubinascii
 from umqtt.robust import MQTTClient
 import re
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
@@ -28,7 +30,7 @@ mqtt_publish_topic = "GsmMqttTest/publish"  # Publish topic
 mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Subscribe topic
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 time.sleep(1)
 
 def send_at_command(command, wait=1):
@@ -43,31 +45,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-def modem_power_on():
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-def modem_reset():
-    try:
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
 def check_modem():
     print("Starting modem...")
     while True:
@@ -91,9 +68,7 @@ def check_sim():
             time.sleep(3)
 
 def connect_network(apn):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CNMP=2")
         print(response)
         response = send_at_command("AT+CNMP=?")
@@ -134,9 +109,7 @@ def connect_network(apn):
 
 # MQTT connection function
 def mqtt_connect(client_index, server, port, client_id, username=None, password=None, keepalive_time=60):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+SMSSL=0",wait=5) 
         print(response)
         response = send_at_command('AT+SMCONF="KEEPTIME",60',wait=5)
@@ -184,9 +157,7 @@ def mqtt_connect(client_index, server, port, client_id, username=None, password=
         return True
 
 def mqtt_connected():
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response_con = send_at_command("AT+SMSTATE?")  # Check MQTT connection status
         print(response_con)
         if "OK" in response_con:
@@ -197,9 +168,7 @@ def mqtt_connected():
             return True
 
 def mqtt_connecting(client_index, server, port, client_id, username=None, password=None, keepalive_time=60):
-   if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+   if hw.sim70xx:
         response = send_at_command("AT+SMDISC",wait=3)
         print(response)
         print(f"Connecting to: {mqtt_broker}")
@@ -241,9 +210,7 @@ def mqtt_connecting(client_index, server, port, client_id, username=None, passwo
         return True
 
 def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMSUB=\"{mqtt_subscribe_topic}\",0',wait=5)  # Authentication mode
         print(response)
         if "OK" not in response:
@@ -265,9 +232,7 @@ def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
 
 # MQTT Publish function
 def mqtt_publish(client_index, topic, message):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMPUB=\"{mqtt_publish_topic}\",10,0,1',wait=3)  # Wait for response to the topic
         print(response)
         uart.write(message.encode())  # Send topic as bytes
@@ -314,13 +279,8 @@ def mqtt_publish(client_index, topic, message):
     
 def main():
     print("Starting sketch...")
-    try:
-        poweron = machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT)
-        poweron.value(1)
-    except:
-        pass
-    modem_power_on()
-    modem_reset()
+    hw.power_on()
+    hw.reset()
     check_modem()
     check_sim()
     print("Wait for the modem to register with the network.")
@@ -10,10 +10,18 @@
 import time
 import machine
 import utilities
+import board
 import ubinascii
 from umqtt.robust import MQTTClient
 from emqxCa import EmqxRootCa
 import re
+from atmodem import ATModem, AT_OK, AT_MATCH
+from atstats import CommandStats
+import modemuart
+import modemwatch
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
@@ -25,51 +33,34 @@ mqtt_port = 8883  # Secure MQTT port (SSL)
 mqtt_client_id = "A76XX"  # Unique client ID for MQTT
 mqtt_publish_topic = "GsmMqttTest/publish"  # Topic for publishing messages
 mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Topic for subscribing to messages
+mqtt_stats_topic = "GsmMqttTest/stats"  # Topic for the modem command statistics, "" to only print them
+STATS_INTERVAL = 6  # Print / publish the statistics every 6 publish cycles
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
+modem = ATModem(uart)
+modem.stats = CommandStats()  # Record latency and UART bytes per AT command
+# Escalating recovery (escape, AT+CFUN cycle, power cycle) when the modem stops answering
+watch = modemwatch.Watchdog(modem)
 time.sleep(1)
 __ssl = 0  # SSL flag
 
 # Function to send AT commands to the modem
-def send_at_command(command, wait=1):
-    uart.write(command + "\r\n")
-    time.sleep(wait)
-    response = uart.read()
-    if response:
-        if isinstance(response, bytes) and len(response) > 0:
-            try:
-                return response.decode("utf-8", "ignore").strip()
-            except: 
-                return ""
-    return ""
+# Returns as soon as the modem answers, wait is only the upper bound in seconds
+def send_at_command(command, wait=1, terminator=None):
+    return modem.send_at_command(command, wait, terminator)
+
+# Run a configuration sequence back to back, True if every command succeeded
+def send_at_batch(commands, wait=5):
+    results = modem.batch(commands, timeout=int(wait * 1000))
+    for status, response in results:
+        print(response)
+    return len(results) == len(commands) and results[-1][0] in (AT_OK, AT_MATCH)
+
+# Send a command whose payload follows the ">" (or "DOWNLOAD") prompt, streamed in chunks
+def send_at_data(command, data, wait=5, terminator=None, prompt=">"):
+    return modem.send_data(command, data, timeout=int(wait * 1000), terminator=terminator, prompt=prompt)[1]
 
-# Function to power on the modem
-def modem_power_on():
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-def modem_reset():
-    try:
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
 # Function to check if the modem is ready
 def check_modem():
     print("Starting modem...")
@@ -96,9 +87,7 @@ def check_sim():
 
 # Function to connect to the network using specified APN
 def connect_network(apn):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CNMP=2")
         print(response)
         response = send_at_command("AT+CNMP=?")
@@ -112,7 +101,7 @@ def connect_network(apn):
         print(response)
         response = send_at_command("AT+CNACT?",wait=3)
         print(response)
-        response = send_at_command("AT+CNACT=0,1",wait=3)
+        response = send_at_command("AT+CNACT=0,1", wait=30, terminator="+APP PDP: 0,ACTIVE")
         print(response)
         response = send_at_command("AT+CNACT?",wait=3)
         print(response)
@@ -124,8 +113,8 @@ def connect_network(apn):
         send_at_command(f"AT+CGDCONT=1,\"IP\",\"{apn}\"")
         send_at_command("AT+CGATT=1")  # Attach to the GPRS
         while True:
-            response = send_at_command("AT+NETOPEN",wait=3)
-            if "OK" in response or "+NETOPEN: 0" in response:
+            response = send_at_command("AT+NETOPEN", wait=30, terminator="+NETOPEN:")
+            if "+NETOPEN: 0" in response or "opened" in response:
                 print("Online registration successful")
                 break
             else:
@@ -141,45 +130,31 @@ def connect_network(apn):
 # MQTT connection function
 def mqtt_connect(client_index, server, port, client_id, keepalive_time=60):
     global __ssl
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CFSTERM") 
         print(response)
-        response = send_at_command("AT+CSSLCFG=convert,2,rootCA.pem")
-        print(response)
-        response = send_at_command('AT+CSSLCFG="sslversion",0,3')
-        print(response)
-        response = send_at_command(f'AT+CSSLCFG="sni",0,"{mqtt_broker}"') 
-        print(response)
-        response = send_at_command('AT+SMSSL=1,"rootCA.pem",""') 
-        print(response)
-        response = send_at_command('AT+SMCONF="KEEPTIME",60') 
-        print(response)
-        response = send_at_command('AT+SMCONF="CLEANSS",1') 
-        print(response)
-        response = send_at_command('AT+SMCONF="QOS",0') 
-        print(response)
-        response = send_at_command('AT+SMCONF="RETAIN",1') 
-        print(response)
-        response = send_at_command(f'AT+SMCONF="CLIENTID",{mqtt_client_id}') 
-        print(response)
-        response = send_at_command(f'AT+SMCONF=URL,"{mqtt_broker}",{mqtt_port}',wait=5) 
-        print(response)
-
-        if 'OK' in response:
-            return True
-        else:
-            return False
+        # SSL and MQTT session configuration, stops at the first error
+        return send_at_batch([
+            "AT+CSSLCFG=convert,2,rootCA.pem",
+            'AT+CSSLCFG="sslversion",0,3',
+            f'AT+CSSLCFG="sni",0,"{mqtt_broker}"',
+            'AT+SMSSL=1,"rootCA.pem",""',
+            'AT+SMCONF="KEEPTIME",60',
+            'AT+SMCONF="CLEANSS",1',
+            'AT+SMCONF="QOS",0',
+            'AT+SMCONF="RETAIN",1',
+            f'AT+SMCONF="CLIENTID",{mqtt_client_id}',
+            f'AT+SMCONF=URL,"{mqtt_broker}",{mqtt_port}',
+        ])
     else:
-        # Set the MQTT client ID
-        response_id = send_at_command(f"AT+CMQTTACCQ={client_index},\"{client_id}\",{__ssl}")
-        print(response_id)
-        # Set the MQTT version (3.1.1 by default, indicated by '4')
-        response_ver = send_at_command(f"AT+CMQTTCFG=\"version\",{client_index},4")
-        print(response_ver)
+        # Set the MQTT client ID and the MQTT version (3.1.1 by default, indicated by '4')
+        if not send_at_batch([
+            f"AT+CMQTTACCQ={client_index},\"{client_id}\",{__ssl}",
+            f"AT+CMQTTCFG=\"version\",{client_index},4",
+        ]):
+            return False
         # Build the connection command
-        response_broker = send_at_command(f"AT+CMQTTCONNECT={client_index},\"tcp://{server}:{port}\",{keepalive_time},1", wait=5)
+        response_broker = send_at_command(f"AT+CMQTTCONNECT={client_index},\"tcp://{server}:{port}\",{keepalive_time},1", wait=30, terminator="+CMQTTCONNECT:")
         print(response_broker)
         # Check if the connection was successful
         if "+CMQTTCONNECT: 0,0" in response_broker:
@@ -189,9 +164,7 @@ def mqtt_connect(client_index, server, port, client_id, keepalive_time=60):
 
 # Function to check if already connected to MQTT
 def mqtt_connected():
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response_con = send_at_command("AT+SMSTATE?")  # Check MQTT connection status
         print(response_con)
         if "OK" in response_con:
@@ -211,9 +184,7 @@ def mqtt_set_certificate(ca_file, client_cert_file=None, client_cert_key=None):
 # Full MQTT connection process with SSL
 def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=60):
     global __ssl, cert_pem
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         __ssl = ssl
         auth_method = 0  # No authentication (0 = no authentication, 1 = server authentication, 2 = server + client authentication)
         # Start the MQTT service
@@ -228,22 +199,13 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
             if (cert_pem):
                 response = send_at_command("AT+CFSINIT")
                 print(response)
-                response = send_at_command('AT+CFSWFILE=3,\"rootCA.pem\",0,1339,10000',wait=5)  # Configure CA for SSL
-                print(response)
-                uart.write(cert_pem)  # Send CA certificate to modem
-                time.sleep(10)
-                uart.write(b"\r\n")  # End the certificate with a newline
-                response = send_at_command("",wait=3)  # Wait for the response
+                # Configure CA for SSL, the file is sent after "DOWNLOAD" and written when OK arrives
+                response = send_at_data(f'AT+CFSWFILE=3,\"rootCA.pem\",0,{len(cert_pem)},10000', cert_pem, wait=10, prompt="DOWNLOAD")
                 print(response)
 
         ret = mqtt_connect(client_index, mqtt_broker, mqtt_port, mqtt_client_id)  # Connect to MQTT
-        response = send_at_command('AT+SMCONN',wait=3)
-        time.sleep(3)
+        response = send_at_command('AT+SMCONN', wait=60)
         print(response)
-        while True:
-            response = send_at_command('AT+SMCONN')
-            if 'OK' in response:
-                break
         if ret:
             print("Successfully connected.")
         else:
@@ -271,13 +233,7 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
 
         if (cert_pem or client_cert_pem or client_key_pem):
             if (cert_pem):
-                response = send_at_command(f"AT+CCERTDOWN=\"ca_cert.pem\",{len(cert_pem)}")  # Download CA certificate
-                print(response)
-                if ">" not in response:
-                    return False  # Error if not waiting for prompt
-                uart.write(cert_pem)  # Send CA certificate to modem
-                uart.write(b"\r\n")  # End the certificate with a newline
-                response = send_at_command("")  # Wait for the response
+                response = send_at_data(f"AT+CCERTDOWN=\"ca_cert.pem\",{len(cert_pem)}", cert_pem)  # Download CA certificate
                 print(response)
                 if "OK" not in response:
                     return False  # Error if CA certificate was not accepted
@@ -285,13 +241,7 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
                 print(response)
             
             if (client_cert_pem):
-                response = send_at_command(f"AT+CCERTDOWN=\"cert.pem\",{len(client_cert_pem)}")  # Download CA certificate
-                print(response)
-                if ">" not in response:
-                    return False  # Error if not waiting for prompt
-                uart.write(client_cert_pem)  # Send CA certificate to modem
-                uart.write(b"\r\n")  # End the certificate with a newline
-                response = send_at_command("")  # Wait for the response
+                response = send_at_data(f"AT+CCERTDOWN=\"cert.pem\",{len(client_cert_pem)}", client_cert_pem)  # Download CA certificate
                 print(response)
                 if "OK" not in response:
                     return False  # Error if CA certificate was not accepted
@@ -299,13 +249,7 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
                 print(response)
             
             if (client_key_pem):
-                response = send_at_command(f"AT+CCERTDOWN=\"key_cert.pem\",{len(client_key_pem)}")  # Download CA certificate
-                print(response)
-                if ">" not in response:
-                    return False  # Error if not waiting for prompt
-                uart.write(client_key_pem)  # Send CA certificate to modem
-                uart.write(b"\r\n")  # End the certificate with a newline
-                response = send_at_command("")  # Wait for the response
+                response = send_at_data(f"AT+CCERTDOWN=\"key_cert.pem\",{len(client_key_pem)}", client_key_pem)  # Download CA certificate
                 print(response)
                 if "OK" not in response:
                     return False  # Error if CA certificate was not accepted
@@ -321,16 +265,15 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
                 authMethod = 1  # Server authentication only
             else:
                 authMethod = 0  # No authentication
-            
-            response = send_at_command("AT+CSSLCFG=\"sslversion\",0,4")  # Set SSL version to TLS 1.2
-            print(response)
-            response = send_at_command(f"AT+CMQTTSSLCFG={client_index},0")  # Enable SSL for MQTT
-            print(response)
+
+            # Set SSL version to TLS 1.2, enable SSL for MQTT and set the authentication mode
+            if not send_at_batch([
+                "AT+CSSLCFG=\"sslversion\",0,4",
+                f"AT+CMQTTSSLCFG={client_index},0",
+                f"AT+CSSLCFG=\"authmode\",0,{authMethod}",
+            ]):
+                return False
             __ssl = 1  # Set SSL flag
-            
-        # Set the authentication mode
-        response_auth = send_at_command(f"AT+CSSLCFG=\"authmode\",0,{authMethod}")  # Authentication mode
-        print(response_auth)
         
         print(send_at_command("AT+CMQTTREL=0"))  # Release any previous connection
         ret = mqtt_connect(client_index, mqtt_broker, mqtt_port, mqtt_client_id)  # Connect to MQTT
@@ -351,9 +294,7 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
 
 # Function to subscribe to an MQTT topic
 def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMSUB=\"{mqtt_subscribe_topic}\",0',wait=5)  # Authentication mode
         print(response)
         if "OK" not in response:
@@ -361,13 +302,7 @@ def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
         
     else:
         command_sub = "AT+CMQTTSUB={},{},{},{}".format(client_index, len(mqtt_publish_topic), qos, dup)
-        response_sub = send_at_command(command_sub)  # Send subscribe command
-        print(response_sub)
-        if ">" not in response_sub:  # Wait for response prompt
-            return False
-        uart.write(mqtt_publish_topic.encode())  # Send the topic as bytes
-        uart.write(b"\r\n")  # Send the topic with a newline
-        response = send_at_command("")  # Wait for response to the topic
+        response = send_at_data(command_sub, mqtt_publish_topic)  # Send subscribe command and the topic
         print(response)
         if "OK" not in response:
             return False  # If not acknowledged
@@ -375,41 +310,23 @@ def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
 # Function to publish a message to an MQTT topic
 def mqtt_publish(client_index, topic, message):
     
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
-        response = send_at_command(f'AT+SMPUB=\"{mqtt_publish_topic}\",10,0,1',wait=3)  # Wait for response to the topic
-        print(response)
-        uart.write(message.encode())  # Send topic as bytes
-        time.sleep(3)
-        uart.write(b"\r\n")  # Send the topic with a newline
-        response = send_at_command("")  # Wait for response to the topic
+    if hw.sim70xx:
+        # The message is sent after the ">" prompt, the modem answers OK once it has all bytes
+        response = send_at_data(f'AT+SMPUB=\"{topic}\",{len(message)},0,1', message)
         print(response)
         if 'OK' in response:
             return True
     else:
         # Step 1: Send the topic
         command = f"AT+CMQTTTOPIC={client_index},{len(topic)}"
-        response = send_at_command(command)  # Send topic command
-        print(response)
-        if ">" not in response:  # Wait for ">" prompt
-            return False
-        uart.write(topic.encode())  # Send topic as bytes
-        uart.write(b"\r\n")  # Send the topic with a newline
-        response = send_at_command("")  # Wait for response to the topic
+        response = send_at_data(command, topic)  # Send topic command and the topic
         print(response)
         if "OK" not in response:
             return False
 
         # Send the message (message body)
         command = f"AT+CMQTTPAYLOAD={client_index},{len(message)}"
-        response = send_at_command(command)  # Send message payload command
-        print(response)
-        if ">" not in response:  # Wait for ">" prompt
-            return False
-        uart.write(message.encode())  # Send message as bytes
-        uart.write(b"\r\n")  # Send the message with a newline
-        response = send_at_command("")  # Wait for response to the message
+        response = send_at_data(command, message)  # Send message payload command and the message
         print(response)
         if "OK" not in response:
             return False
@@ -427,9 +344,11 @@ def mqtt_publish(client_index, topic, message):
 # Main function that orchestrates the modem operation and MQTT connection
 def main():
     print("Starting sketch...")
-    modem_power_on()  # Power on the modem
-    modem_reset()  # Reset the modem
+    hw.power_on()  # Power on the modem
+    hw.reset()  # Reset the modem
     check_modem()  # Verify the modem is operational
+    # RTS / CTS where the board wires them, otherwise the certificates are written in paced bursts
+    print("Flow control:", "RTS/CTS" if modemuart.flow_control(modem) else "paced writes")
     check_sim()  # Check SIM card status
     print("Wait for the modem to register with the network.")
     send_at_command("AT+CREG?")  # Query network registration status
@@ -445,7 +364,17 @@ def main():
         # Publish messages periodically
         try:
             check_connect_millis = 0
+            cycles = 0
             while True:
+                recovered = sum(watch.recovered)
+                if not watch.update():
+                    print("Modem did not recover, sleep %d ms" % watch.delay, watch.metrics())
+                    machine.deepsleep(watch.delay)
+                if sum(watch.recovered) != recovered and watch.level >= modemwatch.RADIO:
+                    # Network and MQTT session were lost with the radio / power cycle
+                    print("Modem recovered:", watch.metrics())
+                    connect_network(APN)
+                    mqtt_connecting(client_index, mqtt_broker, mqtt_port, mqtt_client_id, ssl)
                 current_millis = time.ticks_ms()  # Get current time in milliseconds
                 if current_millis > check_connect_millis:
                     check_connect_millis = current_millis + 10000  # Check every 10 seconds
@@ -454,6 +383,12 @@ def main():
                         response = send_at_command("AT+SMSTATE?")  # Wait for response to the topic
                         print(response)
                     mqtt_publish(client_index, mqtt_publish_topic, payload)  # Publish the payload
+                    cycles += 1
+                    if cycles % STATS_INTERVAL == 0:
+                        print(modem.stats.dump())  # Which modem operations dominate the duty cycle
+                        print(watch.metrics())
+                        if mqtt_stats_topic:
+                            modem.stats.publish(lambda topic, message: mqtt_publish(client_index, topic, message), mqtt_stats_topic)
                 time.sleep(0.005)  # Small delay to avoid busy loop
         except KeyboardInterrupt:
             print("Exiting MQTT loop...")  # Handle exit gracefully
@@ -7,13 +7,15 @@
 #   Connect MQTT Broker as https://www.hivemq.com/
 '''
 import time
-import machine
-import utilities
+import board
 import ubinascii
 from umqtt.robust import MQTTClient
 from HivemqRootCA import HivemqRootCA
 import re
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
@@ -32,7 +34,7 @@ mqtt_publish_topic = "GsmMqttTest/publish"  # Topic for publishing messages
 mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Topic for subscribing to messages
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 time.sleep(1)
 __ssl = 0  # SSL flag
 __sni = 0
@@ -50,33 +52,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-# Function to power on the modem
-def modem_power_on():
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-# Function to reset the modem
-def modem_reset():
-    try:
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
 # Function to check if the modem is ready
 def check_modem():
     print("Starting modem...")
@@ -103,9 +78,7 @@ def check_sim():
 
 # Function to connect to the network using specified APN
 def connect_network(apn):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CNMP=2")
         print(response)
         response = send_at_command("AT+CNMP=?")
@@ -148,9 +121,7 @@ def connect_network(apn):
 # MQTT connection function
 def mqtt_connect(client_index, server, port, client_id, username=None, password=None,keepalive_time=60):
     global __ssl, __sni
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CFSTERM",wait=5) 
         print(response)
         response = send_at_command('AT+CSSLCFG=convert,2,rootCA.pem',wait=5)
@@ -205,9 +176,7 @@ def mqtt_connect(client_index, server, port, client_id, username=None, password=
 
 # Function to check if already connected to MQTT
 def mqtt_connected():
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command('AT+SMCONN')
         print(response)
         while True:
@@ -235,9 +204,7 @@ def mqtt_set_certificate(ca_file, client_cert_file=None, client_cert_key=None):
 # Full MQTT connection process with SSL
 def mqtt_connecting(client_index, server, port, client_id, ssl, sni, keepalive_time=60):
     global __ssl, __sni, cert_pem, client_cert_pem, client_key_pem
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+SMDISC",wait=5)
         print(response)
         print(f"Connecting to: {mqtt_broker}")
@@ -349,9 +316,7 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, sni, keepalive_t
 
 # Function to subscribe to an MQTT topic
 def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMSUB="{mqtt_subscribe_topic}",0') 
         print(response)
     else:
@@ -369,9 +334,7 @@ def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
 
 # Function to publish a message to an MQTT topic
 def mqtt_publish(client_index, topic, message):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMPUB="{mqtt_publish_topic}",10,0,1')
         print(response)
         uart.write(message.encode())
@@ -421,8 +384,8 @@ def mqtt_publish(client_index, topic, message):
 # Main function that orchestrates the modem operation and MQTT connection
 def main():
     print("Starting sketch...")
-    modem_power_on()  # Power on the modem
-    modem_reset()  # Reset the modem
+    hw.power_on()  # Power on the modem
+    hw.reset()  # Reset the modem
     check_modem()  # Verify the modem is operational
     check_sim()  # Check SIM card status
     print("Wait for the modem to register with the network.")
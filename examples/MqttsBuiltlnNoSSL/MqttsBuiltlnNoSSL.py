@@ -9,12 +9,14 @@
 #    Connect MQTT Broker as https://test.mosquitto.org/  MQTT, encrypted, unauthenticated
 '''
 import time
-import machine
-import utilities
+import board
 import ubinascii
 from umqtt.robust import MQTTClient
 import re
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
@@ -27,7 +29,7 @@ mqtt_publish_topic = "GsmMqttTest/publish"  # Publish topic
 mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Subscribe topic
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 time.sleep(1)
 __ssl = 0
 
@@ -43,31 +45,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-def modem_power_on():
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-def modem_reset():
-    try:
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-
 def check_modem():
     print("Starting modem...")
     while True:
@@ -91,9 +68,7 @@ def check_sim():
             time.sleep(3)
 
 def connect_network(apn):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CNMP=2")
         print(response)
         response = send_at_command("AT+CNMP=?")
@@ -136,9 +111,7 @@ def connect_network(apn):
 # MQTT connection function
 def mqtt_connect(client_index, server, port, client_id, keepalive_time=60):
     global __ssl
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command('AT+SMCONN')
         print(response)
         while True:
@@ -167,9 +140,7 @@ def mqtt_connect(client_index, server, port, client_id, keepalive_time=60):
         return True
 
 def mqtt_connected():
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command('AT+SMSTATE?')
         print(response)
         if "OK" in response_con:
@@ -181,9 +152,7 @@ def mqtt_connected():
 
 def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=60):
     global __ssl
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+SMDISC")
         print(response)
         print(f"Connecting to: {mqtt_broker}")
@@ -237,9 +206,7 @@ def mqtt_connecting(client_index, server, port, client_id, ssl, keepalive_time=6
         return True
 
 def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMSUB="{mqtt_subscribe_topic}",0',wait=3)
         print(response)
     else:
@@ -257,9 +224,7 @@ def mqtt_subscribe(client_index, mqtt_publish_topic, qos=0, dup=0):
 
 # MQTT Publish function
 def mqtt_publish(client_index, topic, message):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" \
-       or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" \
-        or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command(f'AT+SMPUB="{mqtt_publish_topic}",10,0,1',wait=3)
         print(response)
         uart.write(message.encode())
@@ -306,8 +271,8 @@ def mqtt_publish(client_index, topic, message):
     
 def main():
     print("Starting sketch...")
-    modem_power_on()
-    modem_reset()
+    hw.power_on()
+    hw.reset()
     check_modem()
     check_sim()
     print("Wait for the modem to register with the network.")
@@ -8,8 +8,7 @@
 #   Connect MQTT Broker as https://test.mosquitto.org/  MQTT, encrypted, unauthenticated
 '''
 import time
-import machine
-import utilities
+import board
 import ubinascii
 from umqtt.robust import MQTTClient
 
@@ -24,8 +23,11 @@ mqtt_client_id = "A76XX"
 mqtt_publish_topic = "GsmMqttTest/publish"  # Publish topic
 mqtt_subscribe_topic = "GsmMqttTest/subscribe"  # Subscribe topic
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 time.sleep(1)
 __ssl = 0
 
@@ -41,20 +43,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    
 def check_modem():
     print("Starting modem...")
     while True:
@@ -195,8 +183,8 @@ def mqtt_publish(client_index, topic, message):
     
 def main():
     print("Starting sketch...")
-    modem_power_on()
-    modem_reset()
+    hw.power_on()
+    hw.reset()
     check_modem()
     check_sim()
     print("Wait for the modem to register with the network.")
@@ -6,10 +6,12 @@
 #   Example is suitable for A7670X/A7608X/SIM7670G/SIM7000G/SIM7600 series
 '''
 import time
-import machine
-import utilities
+import board
 import re
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
@@ -19,34 +21,9 @@ APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 server_url = "https://httpbin.org/put"
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 time.sleep(1)
 
-def modem_power_on():
-    try:
-        machine.Pin(utilities.MODEM_DTR_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-    try:
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-        time.sleep(0.1)
-        machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    except:
-        pass
-    
-def modem_reset():
-    try:
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-        time.sleep(0.1)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-        time.sleep(2.6)
-        machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    except:
-        pass
-    
 def send_at_command(command, wait=1):
     uart.write(command + "\r\n")
     time.sleep(wait)
@@ -82,7 +59,7 @@ def check_sim():
             time.sleep(3)
 
 def connect_network(apn):
-    if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+    if hw.sim70xx:
         response = send_at_command("AT+CNMP=2")
         print(response)
         response = send_at_command("AT+CNMP=?")
@@ -124,8 +101,8 @@ def connect_network(apn):
 
 def main():
     print("Starting sketch...")
-    modem_power_on()
-    modem_reset()
+    hw.power_on()
+    hw.reset()
     check_modem()
     check_sim()
     send_at_command("AT+SIMCOMATI")
@@ -138,7 +115,7 @@ def main():
     wait_time = 10000
     url= "www.baidu.com"
     for i in range(20):
-        if utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G" or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7000G_S3_STAN" or utilities.CURRENT_PLATFORM == "LILYGO_T_SIM7080G_S3_STAN":
+        if hw.sim70xx:
             command = f'AT+SNPING4="{url}",{dest_addr_type},{data_packet_size},{interval_time}'
             response = send_at_command(command,wait=3)
             print(response)
@@ -0,0 +1,91 @@
+'''
+#   @file      PPPClient.py
+#   @license   MIT
+#   @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#   @date      2026-10-18
+#   @note
+#   Example is suitable for A7670X/A7608X/SIM7670G/SIM7000G/SIM7080G series
+#   The modem dials the PDP context (ATD*99#) and MicroPython's network.PPP runs on the
+#   UART, so the standard socket, ssl, urequests and umqtt modules work over cellular.
+#   Between the requests the link is paused for AT commands (signal quality) and resumed.
+#   Needs a firmware with network.PPP, copy libraries/atmodem.py, modemboot.py, modemppp.py
+#   and board.py to the board together with utilities.py
+'''
+import time
+import board
+import urequests
+from umqtt.simple import MQTTClient
+from atmodem import ATModem
+import modemboot
+import modemppp
+
+# It depends on the operator whether to set up an APN. If some operators do not set up an APN,
+# they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
+# APNs from other operators are welcome to submit PRs for filling.
+APN = ""  # Replace with your APN (CHN-CT: China Telecom)
+
+request_url = "http://httpbin.org/get"
+mqtt_broker = "broker.emqx.io"  # MQTT Broker address
+mqtt_port = 1883  # MQTT port
+mqtt_client_id = "LilyGo-PPP"  # Unique client ID for MQTT
+mqtt_publish_topic = "GsmMqttTest/publish"  # Topic for publishing messages
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
+# Initialize the UART interface for the modem
+uart = hw.uart()
+modem = ATModem(uart)
+link = modemppp.PPP(modem, apn=APN)
+
+def wait_registration():
+    # PPP only needs the registration, the modem's own IP stack (NETOPEN / CNACT) stays closed
+    while True:
+        status, response = modem.command("AT+CEREG?;+CGREG?")
+        if ",1" in response or ",5" in response:
+            print("Network registered")
+            return
+        print(".", end="")
+        time.sleep(1)
+
+def signal_quality():
+    # AT commands only work while the link is paused
+    if link.pause():
+        print(modem.command("AT+CSQ")[1])
+    else:
+        print("The modem did not leave data mode")
+    if not link.resume():
+        print("PPP did not come back, dial again")
+        link.disconnect()
+        link.connect()
+
+def main():
+    print("Start modem...")
+    modemboot.boot(modem)
+    wait_registration()
+    while not link.connect():
+        print("PPP connection failed, try again")
+        if not link.disconnect():
+            print("The modem did not leave data mode")
+        time.sleep(3)
+    print("PPP up:", link.ifconfig())
+
+    response = urequests.get(request_url)
+    print(response.status_code, response.text)
+    response.close()
+
+    client = MQTTClient(mqtt_client_id, mqtt_broker, port=mqtt_port, keepalive=60)
+    client.connect()
+    count = 0
+    while True:
+        client.publish(mqtt_publish_topic, "PPP message %d" % count)
+        print("Published", count)
+        count += 1
+        time.sleep(10)
+        if count % 6 == 0:
+            client.disconnect()
+            signal_quality()
+            client.connect()
+
+if __name__ == "__main__":
+    main()
@@ -13,16 +13,19 @@
 '''
 import time
 import machine
-import utilities
-from machine import ADC, sleep, deepsleep
+import board
+from machine import sleep, deepsleep
 
 LOW_VOLTAGE_LEVEL = 3600  
 WARN_VOLTAGE_LEVEL = 3700  
 SLEEP_MINUTE = 60
 
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-adc = ADC(machine.Pin(utilities.BOARD_BAT_ADC_PIN))
+uart = hw.uart()
+adc = hw.adc()
 APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 
 def get_battery_voltage():
@@ -49,20 +52,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
 def check_modem():
     print("Starting modem...")
     while True:
@@ -97,14 +86,14 @@ def connect_network(apn):
             print("Network registration was rejected, please check if the APN is correct")
 
 def main():
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
+    hw.supply(True)
     battery_voltage_mv = get_battery_voltage()
     if battery_voltage_mv < LOW_VOLTAGE_LEVEL:
         deepsleep(SLEEP_MINUTE * 60 * 1000)
     print(f"Battery voltage is {battery_voltage_mv:.0f} mv")
-    modem_reset()
-    modem_power_on()
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    hw.reset()
+    hw.power_key()
+    hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
     check_modem()
     check_sim()
     print("Wait for the modem to register with the network.")
@@ -16,12 +16,21 @@
 #                2. T-SIM7000G-S3-Standard
 #                3. T-SIM7080G-S3-Standard
 #                4. T-SIM7670G-S3-Standard
+#   @note      USE_MODEM = True sends the readings over cellular UDP instead of Wi-Fi (libraries/modemsock.py),
+#              BATCH readings at a time in one sendmany() round.
 '''
 import network
 import socket
 import time
-from machine import ADC, Pin
-import utilities
+from machine import ADC
+import board
+from atmodem import ATModem
+import modemboot
+import modemnet
+import modemsock
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Wi-Fi network information
 network_name = "your-ssid"
@@ -31,9 +40,13 @@ network_password = "your-password"
 udp_address = "192.168.36.188"  # Replace with your receiver's IP
 udp_port = 3336
 
+# Cellular UDP instead of Wi-Fi, udp_address must then be a public IP
+USE_MODEM = False
+APN = ""  # Replace with your APN (CHN-CT: China Telecom)
+BATCH = 10  # Readings sent together
+
 # Initialize ADC
-battery_adc = ADC(Pin(utilities.BOARD_BAT_ADC_PIN))  # Replace with the actual ADC pin
-battery_adc.atten(ADC.ATTN_11DB)  # Set attenuation
+battery_adc = hw.adc("BOARD_BAT_ADC_PIN")  # 11 dB attenuation, full range
 battery_adc.width(ADC.WIDTH_12BIT)  # Set resolution to 12 bits
 
 # Connect to Wi-Fi
@@ -56,8 +69,38 @@ def init_udp():
     udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)  # Allow broadcast
     return udp_socket, addr
 
+# Open a UDP link on the modem
+def init_modem_udp():
+    modem = ATModem(hw.uart())
+    modemboot.boot(modem)
+    net = modemnet.Registration(modem, apn=APN)
+    net.start()
+    while not net.wait(60000):
+        print("Not attached yet:", net.metrics())
+    udp_socket = modemsock.ModemSocket(modem, "UDP")
+    udp_socket.connect((udp_address, udp_port))
+    return udp_socket
+
+def modem_main():
+    udp_socket = init_modem_udp()
+    readings = []
+    while True:
+        time.sleep(1)
+        battery_voltage = battery_adc.read() * 2
+        readings.append(f"Battery:{battery_voltage}mV".encode())
+        print(readings[-1])
+        if len(readings) >= BATCH:
+            try:
+                print("Sent", udp_socket.sendmany(readings), "datagrams")
+            except OSError as e:
+                print(f"Error sending data: {e}")
+            readings = []
+
 # Main loop
 def main():
+    if USE_MODEM:
+        modem_main()
+        return
     connect_to_wifi(network_name, network_password)
     udp_socket, addr = init_udp()
 
@@ -9,62 +9,46 @@
 '''
 import time
 import machine
-import utilities
+import board
+from atmodem import ATModem
+import modemboot
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
+modem = ATModem(uart)
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
 APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 
+# Indexes of messages announced by +CMTI, read from the main loop
+new_sms = []
+
+# Returns as soon as the modem answers, wait is only the upper bound in seconds
 def send_at_command(command, wait=1):
-    uart.write(command + "\r\n")
-    time.sleep(wait)
-    response = uart.read()
-    if response:
-        if isinstance(response, bytes) and len(response) > 0:
-            try:
-                return response.decode("utf-8", "ignore").strip()
-            except: 
-                return ""
-    return ""
+    return modem.send_at_command(command, wait)
 
 def readSMS_send_at(command, timeout=10000):
-    uart.write((command + "\r\n").encode('utf-8'))
-    time.sleep(1)
-    data = ""
-    start_time = time.ticks_ms()
-    while time.ticks_ms() - start_time < timeout:
-        if uart.any():
-            data += uart.read().decode('utf-8')
-            if "OK" in data or "ERROR" in data:
-                break
-    return data
-
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
+    return modem.command(command, timeout)[1]
 
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
+@modem.on_urc("+CMTI")
+def on_new_sms(line):
+    # +CMTI: "SM",3
+    new_sms.append(int(line.split(",")[-1]))
 
-def check_modem():
+def start_modem():
+    # The SIM and the SMS storage are usable once the modem reported SMS DONE (SMS Ready on SIM70XX)
     print("Starting modem...")
-    while True:
-        response = send_at_command("AT")
-        if "OK" in response:
-            print()  # Print a newline for clarity
-            break
-        else:
-            print(".", end="")
+    sms_ready = "SMS Ready" if hw.sim70xx else "SMS DONE"
+    boot = modemboot.boot(modem, wait=("+CPIN: READY", sms_ready))
+    if boot.ready:
+        print("Modem ready in %d ms" % boot.ms)
+    else:
+        print("Modem not ready after %d ms:" % boot.ms, boot.events)
+    print("==================================")
 
 def check_sim():
     while True:
@@ -102,11 +86,9 @@ def readSMS():
     # Set SMS system into text mode
     response = send_at_command("AT+CMGF=1",wait=3)
     print(response)
-    time.sleep(10)
     # Listing all SMS messages
     response = readSMS_send_at("AT+CMGL=\"ALL\"")
     print(response)
-    time.sleep(3)
     if 'OK' in response:
         print("ALL MSG Data:")
         response = response.replace("\r\nOK\r\n", "").replace("\rOK\r", "").strip()
@@ -115,7 +97,6 @@ def readSMS():
     else:
         print("Read all messages failed")
     print("==================================")
-    time.sleep(3)
     # Reading the message again changes the status to "READ" from "UNREAD"
     response = readSMS_send_at("AT+CMGR=1",timeout=1000)
     print(response)
@@ -127,7 +108,6 @@ def readSMS():
     else:
         print("Read message failed")
     print("==================================")
-    time.sleep(3)
     # Read the second to last SMS message
     response = readSMS_send_at("AT+CMGR=2",timeout=1000)
     print(response)
@@ -141,15 +121,9 @@ def readSMS():
     print("==================================")
     
 def main():
-    # Turn on DC boost to power on the modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
-    # Set modem reset pin ,reset modem
-    modem_reset()
-    # Turn on modem
-    modem_power_on()
     # Set ring pin input
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
-    check_modem()
+    hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
+    start_modem()
     print("Wait for the modem to register with the network.")
     response = send_at_command("AT+SIMCOMATI")
     print(response)
@@ -159,8 +133,16 @@ def main():
     check_sim()
     connect_network(APN)
     readSMS()
+    # Report new messages as soon as the modem announces them
+    send_at_command("AT+CNMI=2,1")
+    print("Waiting for new messages...")
     while True:
-        time.sleep(0.01)
+        modem.poll(1000)
+        while new_sms:
+            response = readSMS_send_at(f"AT+CMGR={new_sms.pop(0)}", timeout=1000)
+            print("New message:")
+            print(response)
+            print("==================================")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
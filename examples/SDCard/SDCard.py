@@ -5,10 +5,12 @@
  * @date      2025-07-16
 '''
 import os
-import machine
 import uos
 import time
-import utilities
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 def listDir(fs, dirname, levels):
     print("Listing directory: %s" % dirname)
@@ -124,18 +126,9 @@ def testFileIO(fs, path):
 
 def setup():
     print("\nStarting SD Card Test\n")
-    if 'utilities.BOARD_POWERON_PIN' in globals():
-        power_pin = machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT)
-        power_pin.value(1)
+    hw.supply(True)  # BOARD_POWERON_PIN, where the board has one
     try:
-        sd = machine.SDCard(
-            slot=2,
-            width=1,
-            sck=machine.Pin(utilities.BOARD_SCK_PIN),
-            miso=machine.Pin(utilities.BOARD_MISO_PIN),
-            mosi=machine.Pin(utilities.BOARD_MOSI_PIN),
-            cs=machine.Pin(utilities.BOARD_SD_CS_PIN),
-            freq=20000000)
+        sd = hw.sdcard()
         vfs = uos.VfsFat(sd)
         uos.mount(vfs, '/')
         print("Card Mounted")
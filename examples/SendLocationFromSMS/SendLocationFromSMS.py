@@ -7,60 +7,28 @@
 '''
 import time
 import machine
-import utilities
+import board
+from atmodem import ATModem
+import modemnet
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
 APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 SMS_TARGET = "+380xxxxxxxxx"  #Change the SMS_TARGET you want to dial
 
-def send_at_command(command, wait=1):
-    uart.write(command + "\r\n")
-    time.sleep(wait)
-    response = uart.read()
-    if response:
-        if isinstance(response, bytes) and len(response) > 0:
-            try:
-                return response.decode("utf-8", "ignore").strip()
-            except: 
-                return ""
-    return ""
-
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
-def check_modem():
-    print("Starting modem...")
-    while True:
-        response = send_at_command("AT")
-        if "OK" in response:
-            print()  # Print a newline for clarity
-            break
-        else:
-            print(".", end="")
+modem = ATModem(uart)
+# Registration and PDP context, kept through deep sleep (see modemnet.Registration.sleep)
+net = modemnet.Registration(modem, apn=APN)
 
-def connect_network(apn):
-    send_at_command(f"AT+CGDCONT=1,\"IP\",\"{apn}\"")
-    response = send_at_command("AT+CEREG?",wait=3)  # Attach to the GPRS
-    print(response)
-    if "OK" in response:
-        print("Online registration successful")
-    else:
-        print("Network registration was rejected, please check if the APN is correct")
+# Returns as soon as the modem answers, wait is only the upper bound in seconds
+def send_at_command(command, wait=1):
+    return modem.send_at_command(command, wait)
 
 def loopGPS():
     global lon2,lat2,year2,month2,day2,hour2,min2,sec2
@@ -115,24 +83,21 @@ def lightsleep(ms):
 
 def main():
     global lon2,lat2,year2,month2,day2,hour2,min2,sec2
-    # Turn on DC boost to power on the modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
-    # Set modem reset pin ,reset modem
-    modem_reset()
-    # Turn on modem
-    modem_power_on()
     # Set ring pin input
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
-    check_modem()
+    hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
+    # Cold start: power on the modem, register and attach. After deep sleep the modem is
+    # still registered in AT+CSCLK=1 sleep and a single query confirms the PDP context.
+    print("Wait for the modem to register with the network.")
+    if net.wake() != modemnet.ATTACHED:
+        net.wait()
+    metrics = net.metrics()
+    print("Network ready in %d ms (%d resumed without re-attach)" % (metrics["attach_ms"], metrics["resumes"]))
     print("Enabling GPS/GNSS/GLONASS")
     response = send_at_command("AT+CGNSSPWR=1",wait=5)
     print(response)
     print("GPS Enabled")
     response = send_at_command("AT+CGNSSIPR=115200",wait=2)
     print(response)
-    print("Wait for the modem to register with the network.")
-    connect_network(APN)
-    time.sleep(1)
     while True:
         if loopGPS():
             print(f"The location was obtained successfully and sent to the {SMS_TARGET} number.")
@@ -145,19 +110,19 @@ def main():
             print(response)
             response = send_at_command("AT+CSCS=\"GSM\"")
             print(response)
-            response = send_at_command(f"AT+CMGS=\"{SMS_TARGET}\"")
-            print(response)
-            uart.write(msg_str.encode('utf-8'))
-            time.sleep(1)  
-            uart.write(bytearray([0x1A]))
-            time.sleep(1)
-            if '>' in response:
+            # The text is written after the ">" prompt and ended with Ctrl+Z
+            status, response = modem.send_data(f"AT+CMGS=\"{SMS_TARGET}\"", msg_str, timeout=60000,
+                                               terminator="+CMGS:", suffix=b"\x1a")
+            if '+CMGS:' in response:
                 print("Send sms message OK")
             else:
                 print("Send sms message fail")
             time.sleep(3)
-            # Deep sleep, wake up every 60 seconds for positioning
+            # Deep sleep, wake up every 60 seconds for positioning. The modem sleeps
+            # registered instead of paying a full registration on every wake.
+            net.sleep()
             deepsleep(60 * 1000) # 60 Second    
+        time.sleep(1)  # No fix yet
             
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,10 +7,13 @@
 '''
 import time
 import machine
-import utilities
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
@@ -29,20 +32,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
 def check_modem():
     print("Starting modem...")
     while True:
@@ -123,13 +112,13 @@ def lightsleep(ms):
 def main():
     global lon2,lat2,year2,month2,day2,hour2,min2,sec2,speed2
     # Turn on DC boost to power on the modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
+    hw.supply(True)
     # Set modem reset pin ,reset modem
-    modem_reset()
+    hw.reset()
     # Turn on modem
-    modem_power_on()
+    hw.power_key()
     # Set ring pin input
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
     check_modem()
     connect_network(APN)
     time.sleep(1)
@@ -9,10 +9,15 @@
 '''
 import time
 import machine
-import utilities
+import board
+from atmodem import ATModem
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
+modem = ATModem(uart)
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
 # APNs from other operators are welcome to submit PRs for filling.
@@ -20,16 +25,8 @@ APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 SMS_TARGET = "+380xxxxxxxxxxx"  #Change the SMS_TARGET you want to dial
 
 def send_at_command(command, wait=1):
-    uart.write(command + "\r\n")
-    time.sleep(wait)
-    response = uart.read()
-    if response:
-        if isinstance(response, bytes) and len(response) > 0:
-            try:
-                return response.decode("utf-8", "ignore").strip()
-            except: 
-                return ""
-    return ""
+    # Returns as soon as the final result code arrives, wait is only the upper bound in seconds
+    return modem.send_at_command(command, wait)
 
 def connect_network(apn):
     send_at_command(f"AT+CGDCONT=1,\"IP\",\"{apn}\"")  # Set the PDP context
@@ -42,20 +39,6 @@ def connect_network(apn):
         else:
             print("Network registration was rejected, please check if the APN is correct")
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
 def check_modem():
     print("Starting modem...")
     while True:
@@ -73,26 +56,24 @@ def sendSMS(SMS_TARGET):
     print(response)
     response = send_at_command("AT+CSCS=\"GSM\"")
     print(response)
-    response = send_at_command(f"AT+CMGS=\"{SMS_TARGET}\"")
+    # The text is written after the ">" prompt and ended with Ctrl+Z, +CMGS: <mr> reports the delivery to the network
+    status, response = modem.send_data(f"AT+CMGS=\"{SMS_TARGET}\"", "hello a76xx!\r\n", timeout=60000,
+                                       terminator="+CMGS:", suffix=b"\x1a")
     print(response)
-    uart.write(("hello a76xx!" + "\r\n").encode('utf-8'))
-    time.sleep(1)  
-    uart.write(bytearray([0x1A]))
-    time.sleep(1)
-    if '>' in response:
+    if '+CMGS:' in response:
         print("Send sms message OK")
     else:
         print("Send sms message fail")
     
 def main():
     # Turn on DC boost to power on the modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
+    hw.supply(True)
     # Set modem reset pin ,reset modem
-    modem_reset()
+    hw.reset()
     # Turn on modem
-    modem_power_on()
+    hw.power_key()
     # Set ring pin input
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
     check_modem()
     time.sleep(1)
     connect_network(APN)
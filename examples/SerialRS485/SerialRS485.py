@@ -7,7 +7,10 @@
 '''
 import time
 from machine import UART, Pin
-import utilities
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # You can freely choose unused GPIO as RS485 TX, RX
 RS485_RX_PIN = 15
@@ -18,7 +21,7 @@ RS485_TX_PIN = 16
 
 def setup():
     global SerialAT, SerialRS485
-    SerialAT = UART(1, baudrate=115200, tx=Pin(utilities.MODEM_TX_PIN), rx=Pin(utilities.MODEM_RX_PIN))
+    SerialAT = hw.uart()
     SerialRS485 = UART(2, baudrate=9600, tx=Pin(RS485_TX_PIN), rx=Pin(RS485_RX_PIN))
     
 def loop():
@@ -1,14 +1,22 @@
-''' 
+'''
  * @file      TCPClientMultiple.py
  * @license   MIT
  * @copyright Copyright (c) 2025  ShenZhen XinYuan Electronic Technology Co., Ltd
  * @date      2025-07-08
  * @note      The example demonstrates multiple socket connections. The problem comes from https://github.com/Xinyuan-LilyGO/LilyGO-T-A76XX/issues/223#issuecomment-2639376887
+ *            All requests are in flight at the same time, one modem link each (libraries/modemsock.py),
+ *            and the responses are read as they arrive.
 '''
 import time
-import machine
-import utilities
-import urequests
+import errno
+import board
+from atmodem import ATModem
+import modemboot
+import modemnet
+import modemsock
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # It depends on the operator whether to set up an APN. If some operators do not set up an APN,
 # they will be rejected when registering for the network. You need to ask the local operator for the specific APN.
@@ -41,49 +49,20 @@ method = [
 ]
 
 # Initialize the UART interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
-time.sleep(1)
-
-# Modem power on and reset sequence
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
-def send_at_command(command, wait=1):
-    uart.write(command + "\r\n")
-    time.sleep(wait)
-    response = uart.read()
-    if response:
-        if isinstance(response, bytes) and len(response) > 0:
-            try:
-                return response.decode("utf-8", "ignore").strip()
-            except: 
-                return ""
-    return ""
+uart = hw.uart()
+modem = ATModem(uart)
 
 def check_modem():
     print("Start modem...")
-    while True:
-        response = send_at_command("AT")
-        if "OK" in response:
-            print()  # Print a newline for clarity
-            break
-        else:
-            print(".", end="")
+    boot = modemboot.boot(modem)
+    if boot.ready:
+        print("Modem ready in %d ms" % boot.ms)
+    else:
+        print("Modem not ready after %d ms:" % boot.ms, boot.events)
 
 def check_sim():
     while True:
-        sim_status = send_at_command("AT+CPIN?",wait=2)
+        sim_status = modem.send_at_command("AT+CPIN?", wait=2)
         if "READY" in sim_status:
             print("SIM card online")
             break
@@ -92,103 +71,75 @@ def check_sim():
             time.sleep(3)
 
 def connect_network(apn):
-    response = send_at_command("AT+CPSI?")
-    print(f"Inquiring UE system information:{response}")
-    send_at_command(f"AT+CGDCONT=1,\"IP\",\"{apn}\"")
-    send_at_command("AT+CGATT=1")  # Attach to the GPRS
-    while True:
-        response = send_at_command("AT+NETOPEN",wait=3)
-        if "OK" in response or "+NETOPEN: 0" in response:
-            print("Online registration successful")
-            break
-        else:
-            print("Network registration was rejected, please check if the APN is correct")
-
-    # Get the IP address
-    ip_response = send_at_command("AT+IPADDR")
-    if ip_response:
-        print("Network IP:", ip_response)
-    else:
-        print("Failed to retrieve IP address.")
+    print("Wait for the modem to register with the network.")
+    print("Inquiring UE system information:", modem.send_at_command("AT+CPSI?"))
+    net = modemnet.Registration(modem, apn=apn)
+    net.start()
+    while not net.wait(60000):
+        print("Not attached yet:", net.metrics())
+    print("Online registration successful")
+    print("Network IP:", modem.send_at_command("AT+CNACT?" if hw.sim70xx else "AT+IPADDR"))
 
 def perform_tcp_client():
+    start = time.ticks_ms()
+    # Start all connections, the modem opens them in parallel
+    pending = {}
     for i in range(len(urls)):
         print("Try connect to", urls[i])
-        send_at_command(f"AT+CIPCLOSE={i}")
-        send_at_command("AT+CIPRXGET=1")
-        response = send_at_command(f'AT+CIPOPEN={i},"TCP","{urls[i]}",80')
-        if 'OK' in response:
-            print(f"client {i} connect success")
-        else:
-            print(f"client {i} connect failed")  
-    for i in range(len(urls)):
-        response = send_at_command(f"AT+CIPRXGET=4,{i}")
-#         print(response)
-        if 'OK' not in response:
-            continue
-        response = send_at_command("AT+CIPCLOSE?")
-#         print(response)
-        print("")
-        print(f"Try get request {resource[i]}!")
-        print("============================")
-        req = method[i] + resource[i] + " HTTP/1.0\r\n"
-        response = send_at_command(f"AT+CIPSEND={i},{len(req)}")        
-#         print(response)
-        uart.write(req)
-        response = send_at_command("")  # Wait for the response
-#         print(response)
-        if 'OK' not in response:
+        client = modemsock.ModemSocket(modem)
+        client.settimeout(0)
+        error = client.connect_ex((urls[i], 80))
+        if error and error != errno.EINPROGRESS:
+            print(f"client {i} connect failed: {error}")
             continue
-        response = send_at_command(f"AT+CIPSEND={i},19")
-#         print(response)
-        uart.write("Host: " + urls[i] + "\r\n")
-        response = send_at_command("")  # Wait for the response
-#         print(response)
-        if 'OK' not in response:
-            continue     
-        response = send_at_command(f"AT+CIPSEND={i},21")
-#         print(response)
-        uart.write("Connection: close\r\n\r\n")
-        response = send_at_command("")  # Wait for the response
-#         print(response)
-        if 'OK' not in response:
-            continue        
-        response = send_at_command(f"AT+CIPRXGET=4,{i}")
-#         print(response)        
-        response = send_at_command("AT+CIPCLOSE?")
-#         print(response)
-        response = send_at_command(f"AT+CIPRXGET=4,{i}")
-#         print(response)
-        parts = response.split(",")
-        last_part = parts[-1].strip()  
-        received_data_length = int(last_part.split()[0])
-        response = send_at_command(f"AT+CIPRXGET=2,{i},{received_data_length}")
-        print(response)
-        response = send_at_command(f"AT+CIPRXGET=4,{i}")
-#         print(response)
-        response = send_at_command("AT+CIPCLOSE?")
-#         print(response)
-        print("Request done!")
-        print("============================")
-        
-    print("All test done ..")
-    for i in range(len(urls)):
-        print(f"stop client {i} connect")
-        response = send_at_command(f"AT+CIPRXGET=4,{i+1}")
-        if 'OK' not in response:
-            continue
-#         print(response)
-        response = send_at_command("AT+CIPCLOSE?")
-        
+        pending[client] = i
+
+    clients = {}
+    while pending:
+        _, opened = modemsock.select([], list(pending), timeout=30000)
+        if not opened:
+            print("Connect timed out")
+            break
+        for client in opened:
+            i = pending.pop(client)
+            if client.state == modemsock.CONNECTED:
+                print(f"client {i} connect success")
+                client.settimeout(10)
+                req = method[i] + resource[i] + " HTTP/1.0\r\nHost: " + urls[i] + "\r\nConnection: close\r\n\r\n"
+                client.sendall(req.encode())
+                clients[client] = i
+            else:
+                print(f"client {i} connect failed: {client.error}")
+                client.close()
+
+    # Responses are read in the order they arrive
+    buf = bytearray(1024)
+    while clients:
+        readable, _ = modemsock.select(list(clients), timeout=30000)
+        if not readable:
+            print("No response within 30 s")
+            break
+        for client in readable:
+            i = clients[client]
+            n = client.recv_into(buf)
+            if n:
+                print(f"[{i} {resource[i]}]", bytes(buf[:n]).decode("utf-8", "ignore"))
+                continue
+            print(f"Request {resource[i]} done!")
+            print("============================")
+            client.close()
+            del clients[client]
+
+    for client in list(clients) + list(pending):
+        client.close()
+    print("All test done in %d ms" % time.ticks_diff(time.ticks_ms(), start))
+
 def main():
     print("Start Sketch")
-    modem_power_on()
-    modem_reset()
     check_modem()
     check_sim()
-    print("Wait for the modem to register with the network.")
     connect_network(APN)
     perform_tcp_client()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -5,29 +5,16 @@
  * @date      2025-07-18
  * @note      Only support A7670X A7608X , Not support SIM7670G
 '''
-from machine import UART
-import machine
 import time
 import urandom
-import utilities
+import board
 
-# Initialize Serial
-uart = UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
+# Initialize Serial
+uart = hw.uart()
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    
 def send_at_command(command, wait=1):
     uart.write(command + "\r\n")
     time.sleep(wait)
@@ -53,16 +40,16 @@ def check_modem():
         else:
             print(".", end="")
         if retry > 10:
-            modem_power_on()
+            hw.power_key()
             retry = 0
         retry += 1
 
 def setup():
     print("Start Sketch")
     # Set modem reset pin ,reset modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
-    modem_reset()
-    modem_power_on()
+    hw.supply(True)
+    hw.reset()
+    hw.power_key()
     # Check if the modem is online
     check_modem()
     time.sleep(5)
@@ -4,14 +4,16 @@
  * @copyright Copyright (c) 2025  ShenZhen XinYuan Electronic Technology Co., Ltd
  * @date      2025-07-15
 '''
-from machine import ADC, Pin
+from machine import ADC
 import machine
 import time
-import utilities
+import board
 
-# Setup ADC
-adc = ADC(Pin(utilities.BOARD_BAT_ADC_PIN))
-adc.atten(ADC.ATTN_11DB)  # Configure attenuation to 11dB
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
+
+# Setup ADC, the board configures 11dB attenuation
+adc = hw.adc()
 adc.width(ADC.WIDTH_12BIT)  # Set ADC width to 12 bits
 # Constants
 RTC_SLOW_MEM = [0] * 11  # Simulated RTC memory
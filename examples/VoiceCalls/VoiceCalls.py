@@ -13,10 +13,13 @@
 '''
 import time
 import machine
-import utilities
+import board
+
+# Pins, UART and ADCs of the board, created once
+hw = board.get()
 
 # Initialize the serial interface for the modem
-uart = machine.UART(1, baudrate=utilities.MODEM_BAUDRATE, tx=utilities.MODEM_TX_PIN, rx=utilities.MODEM_RX_PIN)
+uart = hw.uart()
 APN = ""  # Replace with your APN (CHN-CT: China Telecom)
 number = "+86xxxxxxxxx"  #Change the number you want to dial
 
@@ -32,20 +35,6 @@ def send_at_command(command, wait=1):
                 return ""
     return ""
 
-def modem_power_on():
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-    time.sleep(0.1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(1)
-    time.sleep(1)
-    machine.Pin(utilities.BOARD_PWRKEY_PIN, machine.Pin.OUT).value(0)
-
-def modem_reset():
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-    time.sleep(0.1)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(utilities.MODEM_RESET_LEVEL)
-    time.sleep(2.6)
-    machine.Pin(utilities.MODEM_RESET_PIN, machine.Pin.OUT).value(not utilities.MODEM_RESET_LEVEL)
-
 def check_modem():
     print("Starting modem...")
     while True:
@@ -62,19 +51,19 @@ def callNumber(number):
     
 def main():
     # Turn on DC boost to power on the modem
-    machine.Pin(utilities.BOARD_POWERON_PIN, machine.Pin.OUT).value(1)
+    hw.supply(True)
     # Set modem reset pin ,reset modem
-    modem_reset()
+    hw.reset()
     # Turn on modem
-    modem_power_on()
+    hw.power_key()
     # Set ring pin input
-    machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP)
+    ring = hw.pin("MODEM_RING_PIN", machine.Pin.IN, machine.Pin.PULL_UP)
     check_modem()
     time.sleep(10)
     print(f"Init success, start to call {number}");
     callNumber(number)
     while True:
-        if machine.Pin(utilities.MODEM_RING_PIN, machine.Pin.IN, machine.Pin.PULL_UP).value() == 0:
+        if ring.value() == 0:
             print("Incoming call...")
         time.sleep(0.01)
 
@@ -0,0 +1,256 @@
+#  * @file      amodem.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      uasyncio version of the AT command engine in atmodem.py.
+#  *            A single reader task owns the UART: command responses go to the
+#  *            task awaiting modem.command(), unsolicited result codes go to the
+#  *            queues returned by modem.urc_queue(), so GNSS polling, MQTT and
+#  *            other tasks can share the modem on one core.
+#  *            modem.stats takes an atstats.CommandStats like ATModem.stats.
+try:
+    import uasyncio as asyncio
+except ImportError:
+    import asyncio
+
+from atmodem import AT_OK, AT_ERROR, AT_PROMPT, AT_MATCH, AT_TIMEOUT, final_result, response_prefix, command_key, join_commands, chunks, ticks_ms, ticks_diff
+
+
+class URCQueue:
+    def __init__(self, maxlen=8):
+        self.maxlen = maxlen  # The oldest entry is dropped when the queue is full
+        self._items = []
+        self._event = asyncio.Event()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        if len(self._items) >= self.maxlen:
+            self._items.pop(0)
+        self._items.append(item)
+        self._event.set()
+
+    def get_nowait(self):
+        # Return the oldest entry or None if the queue is empty
+        if self._items:
+            return self._items.pop(0)
+        return None
+
+    async def get(self):
+        while not self._items:
+            self._event.clear()
+            await self._event.wait()
+        return self._items.pop(0)
+
+
+class _Command:
+    def __init__(self, command, terminator, data, prompt):
+        self.owner = response_prefix(command)
+        self.terminator = terminator
+        self.data = data  # Payload to send after the prompt
+        self.prompt = prompt
+        self.prompted = False
+        self.lines = []
+        self.status = AT_TIMEOUT
+        self.done = asyncio.Event()
+
+    def finish(self, status):
+        self.status = status
+        self.done.set()
+
+
+class AsyncModem:
+    def __init__(self, uart, timeout=1000, debug=False):
+        self.timeout = timeout  # Default upper bound for a command, in milliseconds
+        self.debug = debug
+        self.lock = asyncio.Lock()  # Held for the whole duration of a command
+        self._stream = asyncio.StreamWriter(uart, {})
+        self._buf = b""
+        self._urc = []  # (prefix, queue, payload) triples, see urc_queue()
+        self._cmd = None  # Command in flight
+        self._raw = None  # (queue, line, length) while reading a URC payload
+        self._task = None
+        self.bytes_out = 0  # UART traffic since the modem object was created
+        self.bytes_in = 0
+        self.stats = None  # Optional atstats.CommandStats
+
+    def start(self):
+        # Start the reader task, must be called from within the running event loop
+        if self._task is None:
+            self._task = asyncio.create_task(self._reader())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def urc_queue(self, prefix, maxlen=8, payload=None):
+        """
+        Return the queue receiving unsolicited lines starting with prefix.
+
+        Args:
+            prefix (str): URC prefix, e.g. "+CMTI" or "+CMQTTRXPAYLOAD"
+            maxlen (int): Queue length, the oldest entry is dropped when full
+            payload (function): Optional payload(line) returning the number of raw
+                bytes following the line, e.g. for +CMQTTRXPAYLOAD: 0,<len>.
+                Entries are then (line, data) tuples instead of lines.
+        """
+        for urc in self._urc:
+            if urc[0] == prefix:
+                return urc[1]
+        queue = URCQueue(maxlen)
+        self._urc.append((prefix, queue, payload))
+        return queue
+
+    async def _reader(self):
+        while True:
+            data = await self._stream.read(256)
+            if not data:
+                await asyncio.sleep(0.001)
+                continue
+            self.bytes_in += len(data)
+            self._buf += data
+            self._process()
+
+    def _process(self):
+        while True:
+            if self._raw is not None:
+                queue, line, length = self._raw
+                if len(self._buf) < length:
+                    return
+                queue.put((line, self._buf[:length]))
+                self._buf = self._buf[length:]
+                self._raw = None
+            i = self._buf.find(b"\n")
+            if i < 0:
+                break
+            line = self._buf[:i].decode("utf-8", "ignore").strip()
+            self._buf = self._buf[i + 1:]
+            if line:
+                self._line(line)
+        # Data prompts are not followed by a line end
+        cmd = self._cmd
+        if cmd is not None and cmd.status == AT_TIMEOUT and self._buf.strip() == b">":
+            self._buf = b""
+            self._prompt(cmd)
+
+    def _prompt(self, cmd):
+        if cmd.data is None:
+            cmd.lines.append(">")
+            cmd.finish(AT_PROMPT)
+        else:
+            # Wake up command() to write the payload
+            cmd.prompted = True
+            cmd.done.set()
+
+    def _line(self, line):
+        cmd = self._cmd
+        if cmd is not None and cmd.status == AT_TIMEOUT:
+            if line == ">" and not cmd.prompted:
+                # A prompt directly followed by a URC arrives as a line of its own
+                self._prompt(cmd)
+                return
+            if cmd.data is not None and not cmd.prompted and cmd.prompt != ">" and cmd.prompt in line:
+                # Text prompts such as "DOWNLOAD" do end with a line end
+                cmd.prompted = True
+                cmd.done.set()
+                return
+            if cmd.terminator is not None and cmd.terminator in line:
+                cmd.lines.append(line)
+                cmd.finish(AT_MATCH)
+                return
+            owned = cmd.owner is not None and line.startswith(cmd.owner)
+        else:
+            cmd = None
+            owned = False
+        if not owned:
+            for prefix, queue, payload in self._urc:
+                if line.startswith(prefix):
+                    if payload is None:
+                        queue.put(line)
+                    else:
+                        self._raw = (queue, line, payload(line))
+                    return
+        if cmd is None:
+            if self.debug:
+                print("<< (unhandled)", line)
+            return
+        cmd.lines.append(line)
+        result = final_result(line)
+        if result == AT_ERROR or (result == AT_OK and cmd.terminator is None):
+            cmd.finish(result)
+
+    async def command(self, command, timeout=None, terminator=None, data=None, prompt=">", chunk=256):
+        """
+        Send an AT command and wait for its response without blocking other tasks.
+
+        Args:
+            command (str): Command without the trailing CR/LF, e.g. "AT+CSQ"
+            timeout (int): Upper bound in milliseconds, defaults to self.timeout
+            terminator (str): Optional text that ends the response, see ATModem.command()
+            data: Optional payload written when the modem shows the prompt, e.g. the topic
+                for AT+CMQTTTOPIC. Bytes, str, a file or a generator, streamed in chunk sized
+                pieces, see atmodem.chunks(). The command then ends on its final result.
+            prompt (str): ">" or the text the modem prints instead, e.g. "DOWNLOAD"
+
+        Returns:
+            tuple: (status, response), same as ATModem.command()
+        """
+        if timeout is None:
+            timeout = self.timeout
+        self.start()
+        async with self.lock:
+            cmd = _Command(command, terminator, data, prompt)
+            self._cmd = cmd
+            if self.debug:
+                print(">>", command)
+            start = ticks_ms()
+            out = self.bytes_out
+            bytes_in = self.bytes_in
+            try:
+                self._write(command.encode() + b"\r\n")
+                await self._stream.drain()
+                while True:
+                    remaining = timeout - ticks_diff(ticks_ms(), start)
+                    await asyncio.wait_for(cmd.done.wait(), max(remaining, 0) / 1000)
+                    if not cmd.prompted or cmd.data is None:
+                        break
+                    cmd.done.clear()
+                    data = cmd.data
+                    cmd.data = None
+                    for piece in chunks(data, chunk):
+                        # drain() waits until the UART took the piece, so only one chunk is buffered
+                        self._write(piece)
+                        await self._stream.drain()
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                self._cmd = None
+            response = "\r\n".join(cmd.lines)
+            if self.debug:
+                print("<<", response)
+            if self.stats is not None:
+                self.stats.record(command_key(command), ticks_diff(ticks_ms(), start),
+                                  cmd.status, self.bytes_out - out, self.bytes_in - bytes_in)
+            return cmd.status, response
+
+    def _write(self, data):
+        self.bytes_out += len(data)
+        self._stream.write(data)
+
+    async def batch(self, commands, timeout=None, join=False, max_length=256):
+        """Run a configuration sequence back to back, see ATModem.batch()."""
+        results = []
+        groups = join_commands(commands, max_length) if join else [(item, 1) for item in commands]
+        for item, count in groups:
+            if isinstance(item, tuple):
+                status, response = await self.command(item[0], timeout, item[1])
+            else:
+                status, response = await self.command(item, timeout)
+            for _ in range(count):
+                results.append((status, response))
+            if status != AT_OK and status != AT_MATCH:
+                break
+        return results
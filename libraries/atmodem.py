@@ -0,0 +1,801 @@
+#  * @file      atmodem.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Shared AT command engine for the examples.
+#  *            A command returns as soon as the modem reports a final result code
+#  *            (OK / ERROR / +CME ERROR ...), a ">" prompt or a caller supplied
+#  *            terminator. The timeout is only an upper bound, nothing sleeps for it.
+#  *            Unsolicited result codes (+CMTI, RING, +CMQTTRXSTART ...) are separated
+#  *            from command responses and routed to callbacks registered with on_urc().
+#  *
+#  *            The receive path does not allocate: the UART is drained with readinto()
+#  *            into a fixed buffer, lines are assembled and compared byte by byte in a
+#  *            second fixed buffer, and only the fields a caller asks for are decoded.
+#  *            run() + field_int() give an allocation free command cycle when commands,
+#  *            terminators and capture prefixes are passed as bytes constants.
+#  *            command() keeps the convenient (status, str) interface on top of it.
+#  *
+#  *            Assign an atstats.CommandStats to modem.stats to record the latency and
+#  *            UART bytes of every command; bytes_out / bytes_in count the whole traffic.
+import time
+
+try:
+    from time import ticks_ms, ticks_diff, sleep_ms
+except ImportError:
+    # CPython, used when running the library on a host
+    def ticks_ms():
+        return int(time.monotonic() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+# Command status
+AT_OK = const(0)
+AT_ERROR = const(1)
+AT_PROMPT = const(2)
+AT_MATCH = const(3)
+AT_TIMEOUT = const(4)
+
+# Final result codes that end a command unsuccessfully
+AT_ERRORS = ("ERROR", "+CME ERROR", "+CMS ERROR", "NO CARRIER", "BUSY", "NO ANSWER", "NO DIALTONE")
+_ERRORS = tuple(code.encode() for code in AT_ERRORS)
+
+_CR = const(13)
+_LF = const(10)
+_SPACE = const(32)
+_QUOTE = const(34)
+_COMMA = const(44)
+_COLON = const(58)
+_PROMPT = const(62)
+
+LINE_MS = 50  # Wait for the end of a line already partly received, a full line at 115200 Bd
+
+
+def final_result(line):
+    # Return AT_OK / AT_ERROR if line is a final result code, otherwise None
+    if line == "OK":
+        return AT_OK
+    for code in AT_ERRORS:
+        if line.startswith(code):
+            return AT_ERROR
+    return None
+
+
+def response_prefix(command):
+    # "AT+CREG?" -> "+CREG", "AT+CIPOPEN=0,..." -> "+CIPOPEN", "ATD..." -> None
+    if not command.startswith("AT+"):
+        return None
+    end = len(command)
+    for c in "=?;":
+        i = command.find(c)
+        if 0 <= i < end:
+            end = i
+    return command[2:end]
+
+
+def command_key(command):
+    # Key a command is recorded under in modem.stats: "AT+CREG?" -> "AT+CREG", "AT" -> "AT"
+    prefix = response_prefix(command)
+    return command if prefix is None else "AT" + prefix
+
+
+def join_commands(commands, max_length=256):
+    """
+    Group consecutive extended commands into command lines joined with ";",
+    e.g. ["AT+A=1", "AT+B=2"] -> [("AT+A=1;+B=2", 2)].
+    Items that are (command, terminator) tuples are never joined.
+    Returns a list of (command_line, command_count) pairs.
+    """
+    groups = []
+    line = None
+    count = 0
+    for item in commands:
+        if isinstance(item, tuple) or not item.startswith("AT+"):
+            if line is not None:
+                groups.append((line, count))
+                line = None
+            groups.append((item, 1))
+        elif line is not None and len(line) + len(item) - 1 <= max_length:
+            line += ";" + item[2:]
+            count += 1
+        else:
+            if line is not None:
+                groups.append((line, count))
+            line = item
+            count = 1
+    if line is not None:
+        groups.append((line, count))
+    return groups
+
+
+def chunks(source, size=256, length=None):
+    """
+    Yield the payload of source in pieces of at most size bytes, without loading it whole.
+
+    Args:
+        source: bytes / bytearray / str, a file opened in binary mode (anything with
+            readinto(), e.g. a JPEG on the SD card) or an iterable of bytes such as a generator
+        size (int): Largest piece for buffers and files
+        length (int): Optional number of bytes to take from source
+    """
+    if isinstance(source, str):
+        source = source.encode()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        mv = memoryview(source)
+        end = len(mv) if length is None else min(length, len(mv))
+        for i in range(0, end, size):
+            yield mv[i:min(i + size, end)]
+    elif hasattr(source, "readinto"):
+        mv = memoryview(bytearray(size))
+        remaining = length
+        while remaining is None or remaining > 0:
+            n = size if remaining is None else min(size, remaining)
+            n = source.readinto(mv[:n])
+            if not n:
+                break
+            yield mv[:n]
+            if remaining is not None:
+                remaining -= n
+    else:
+        for item in source:
+            yield item.encode() if isinstance(item, str) else item
+
+
+def _startswith(buf, n, prefix):
+    # buf[:n].startswith(prefix) without slicing
+    m = len(prefix)
+    if m > n:
+        return False
+    for i in range(m):
+        if buf[i] != prefix[i]:
+            return False
+    return True
+
+
+def _contains(buf, n, sub):
+    # sub in buf[:n] without slicing
+    m = len(sub)
+    for i in range(n - m + 1):
+        for j in range(m):
+            if buf[i + j] != sub[j]:
+                break
+        else:
+            return True
+    return False
+
+
+def _encode(data):
+    if isinstance(data, str):
+        return data.encode()
+    return data
+
+
+class ATModem:
+    def __init__(self, uart, timeout=1000, debug=False, rxbuf=256, linebuf=512):
+        self.uart = uart
+        self.timeout = timeout  # Default upper bound for a command, in milliseconds
+        self.debug = debug
+        self.overflows = 0  # Bytes dropped because a line did not fit into the line buffer
+        self.bytes_out = 0  # UART traffic since the modem object was created
+        self.bytes_in = 0
+        self.stats = None  # Optional atstats.CommandStats, see _record()
+        self.flow = False  # RTS / CTS flow control active, see modemuart.flow_control()
+        self.pace = None  # (bytes, ms): write_data() pauses ms after every bytes, see modemuart
+        self.observer = None  # Optional callable(status) after every command, see modemwatch
+        self._rx = bytearray(rxbuf)  # Filled by uart.readinto(), consumed from _rpos to _rlen
+        self._rpos = 0
+        self._rlen = 0
+        self._line = bytearray(linebuf)  # Line being assembled, _n bytes long
+        self._n = 0
+        self._resp = bytearray(linebuf)  # Line captured by run(), _resp_n bytes long
+        self._resp_n = 0
+        self._fs = 0  # Field span found by _field()
+        self._fe = 0
+        self._urc = []  # (prefix, callback) pairs, see on_urc()
+        self._cmd = None  # Command in flight, its response prefix is _cmd[2:_owner]
+        self._owner = 0
+        self._start = 0  # ticks_ms() and byte counters when the command was sent
+        self._out = 0
+        self._in = 0
+        self._lines = None  # Decoded response lines while command() is collecting them
+        self._inline = None  # (prefix, commas): run_into() ends that line early, see _read_line()
+        self._partial = ""  # Decoded head of a line longer than the line buffer
+
+    # ------------------------------------------------------------------
+    # Receive path
+    # ------------------------------------------------------------------
+    def _fill(self):
+        # Refill the receive buffer from the UART, False if nothing is available
+        n = self.uart.any()
+        if not n:
+            return False
+        if n > len(self._rx):
+            n = len(self._rx)
+        n = self.uart.readinto(self._rx, n)
+        if not n:
+            return False
+        self.bytes_in += n
+        self._rpos = 0
+        self._rlen = n
+        return True
+
+    def _read_line(self):
+        # Move received bytes into the line buffer, True once it holds a complete line
+        rx = self._rx
+        line = self._line
+        size = len(line)
+        n = self._n
+        pos = self._rpos
+        end = self._rlen
+        while True:
+            if pos >= end:
+                self._rpos = pos
+                self._n = n
+                if not self._fill():
+                    return False
+                pos = 0
+                end = self._rlen
+            c = rx[pos]
+            pos += 1
+            if c == _LF:
+                self._rpos = pos
+                self._n = n
+                return True
+            if c == _CR:
+                continue
+            if n >= size:
+                self._n = n
+                self._overflow()
+                n = 0
+            line[n] = c
+            n += 1
+            if c == _COMMA and self._inline is not None and self._inline_end(n):
+                self._rpos = pos
+                self._n = n
+                return True
+
+    def _inline_end(self, n):
+        # True when the line is the run_into() header up to the comma before its data
+        prefix, commas = self._inline
+        line = self._line
+        if not _startswith(line, n, prefix):
+            return False
+        count = 0
+        for i in range(n):
+            if line[i] == _COMMA:
+                count += 1
+        return count == commas
+
+    def _overflow(self):
+        if self._lines is not None:
+            self._partial += self._decode()
+        else:
+            self.overflows += self._n
+        self._n = 0
+
+    def _decode(self):
+        return bytes(self._line[:self._n]).decode("utf-8", "ignore")
+
+    def _owned(self):
+        # True if the line starts with the response prefix of the command in flight.
+        # A URC registered with a prefix reaching into the parameters (e.g.
+        # "+CIPRXGET: 1," while AT+CIPRXGET=2 runs) is still a URC.
+        cmd = self._cmd
+        if cmd is None:
+            return False
+        m = self._owner - 2
+        if m <= 0 or m > self._n:
+            return False
+        line = self._line
+        for i in range(m):
+            if line[i] != cmd[i + 2]:
+                return False
+        for prefix, _ in self._urc:
+            if len(prefix) > m + 2 and _startswith(line, self._n, prefix):
+                return False
+        return True
+
+    def _capture(self):
+        n = self._n
+        line = self._line
+        resp = self._resp
+        for i in range(n):
+            resp[i] = line[i]
+        self._resp_n = n
+
+    def _handle_line(self, terminator, capture):
+        # Classify the line in the line buffer, returns the status it ends the command with
+        n = self._n
+        line = self._line
+        if n == 0 or (n == 1 and line[0] == _SPACE):  # The space of a "> " prompt read in two parts
+            self._n = 0
+            return AT_TIMEOUT
+        if line[0] == _PROMPT and (n == 1 or (n == 2 and line[1] == _SPACE)) and self._cmd is not None:
+            # A prompt directly followed by a URC arrives as a line of its own
+            self._n = 0
+            if self._lines is not None:
+                self._lines.append(">")
+            return AT_PROMPT
+        matched = terminator is not None and _contains(line, n, terminator)
+        if not matched and not self._owned():
+            for prefix, callback in self._urc:
+                if _startswith(line, n, prefix):
+                    text = self._decode()
+                    self._n = 0
+                    callback(text)
+                    return AT_TIMEOUT
+        if self._cmd is None and self._lines is None and capture is None:
+            if self.debug:
+                print("<< (unhandled)", self._decode())
+            self._n = 0
+            return AT_TIMEOUT
+        if self._lines is not None:
+            self._lines.append(self._partial + self._decode())
+            self._partial = ""
+        if capture is not None and _startswith(line, n, capture):
+            self._capture()
+        status = AT_TIMEOUT
+        if matched:
+            if capture is None:
+                self._capture()
+            status = AT_MATCH
+        elif n == 2 and line[0] == 79 and line[1] == 75:  # OK
+            if terminator is None:
+                status = AT_OK
+        else:
+            for code in _ERRORS:
+                if _startswith(line, n, code):
+                    status = AT_ERROR
+                    break
+        self._n = 0
+        return status
+
+    def _wait(self, timeout, terminator, capture):
+        if timeout is None:
+            timeout = self.timeout
+        start = ticks_ms()
+        while True:
+            while self._read_line():
+                status = self._handle_line(terminator, capture)
+                if status != AT_TIMEOUT:
+                    return status
+            # Data prompts (">" for CIPSEND/CMQTTTOPIC/CMGS ...) are not followed by a line end
+            n = self._n
+            line = self._line
+            if n and line[0] == _PROMPT and (n == 1 or (n == 2 and line[1] == _SPACE)):
+                self._n = 0
+                if self._lines is not None:
+                    self._lines.append(">")
+                return AT_PROMPT
+            if ticks_diff(ticks_ms(), start) >= timeout:
+                return AT_TIMEOUT
+            sleep_ms(1)
+
+    # ------------------------------------------------------------------
+    # URC dispatch
+    # ------------------------------------------------------------------
+    def on_urc(self, prefix, callback=None):
+        """
+        Register callback(line) for unsolicited lines starting with prefix.
+        Can also be used as a decorator: @modem.on_urc("+CMTI").
+
+        Callbacks run while the modem is being read, so they must not send
+        commands. They may call read_data() to consume a payload that follows
+        the line, e.g. +CMQTTRXPAYLOAD.
+        """
+        if callback is None:
+            def decorator(callback):
+                self.on_urc(prefix, callback)
+                return callback
+            return decorator
+        prefix = _encode(prefix)
+        self.remove_urc(prefix)
+        self._urc.append((prefix, callback))
+        return callback
+
+    def remove_urc(self, prefix):
+        prefix = _encode(prefix)
+        self._urc = [urc for urc in self._urc if urc[0] != prefix]
+
+    def poll(self, timeout=0):
+        """
+        Dispatch unsolicited lines received while no command is running.
+        Waits up to timeout milliseconds and returns the number of lines received,
+        so a main loop can use it in place of time.sleep().
+        """
+        handled = 0
+        start = ticks_ms()
+        while True:
+            while self._read_line():
+                if self._n:
+                    handled += 1
+                self._handle_line(None, None)
+            if ticks_diff(ticks_ms(), start) >= timeout:
+                return handled
+            sleep_ms(1)
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+    def write(self, data):
+        """Write data completely, waiting while the UART TX buffer is full. Returns the count."""
+        if isinstance(data, str):
+            data = data.encode()
+        total = len(data)
+        sent = self.uart.write(data) or 0
+        if sent == total:
+            self.bytes_out += sent
+            return sent  # The usual case, no memoryview needed
+        mv = memoryview(data)
+        start = ticks_ms()
+        while sent < total:
+            n = self.uart.write(mv[sent:])
+            if n:
+                sent += n
+                start = ticks_ms()
+            elif ticks_diff(ticks_ms(), start) >= self.timeout:
+                break  # The UART did not take anything for a whole timeout
+            else:
+                sleep_ms(1)
+        self.bytes_out += sent
+        return sent
+
+    def write_data(self, source, length=None, chunk=256):
+        """Stream source (see chunks()) to the modem in pieces, returns the number of bytes written."""
+        pace = self.pace
+        if pace is not None and pace[0] < chunk:
+            chunk = pace[0]
+        sent = 0
+        for piece in chunks(source, chunk, length):
+            if sent and pace is not None:
+                sleep_ms(pace[1])  # No flow control: give the modem time to drain its buffer
+            sent += self.write(piece)
+        return sent
+
+    def flush_input(self):
+        # Dispatch URCs still pending and drop a stale prompt of a previous command.
+        # A line partly received (e.g. "OK\r" of a command that returned on its
+        # terminator) is finished and handled here, else the next command takes it.
+        self.poll()
+        start = ticks_ms()
+        while self._n and self._line[0] != _PROMPT:
+            if self._read_line():
+                self._handle_line(None, None)
+                self.poll()
+            elif ticks_diff(ticks_ms(), start) >= LINE_MS:
+                self._n = 0  # Never ended: stale
+            else:
+                sleep_ms(1)
+        if self._n:
+            self._n = 0
+
+    def _send(self, command):
+        self.flush_input()
+        self._start = ticks_ms()
+        self._out = self.bytes_out
+        self._in = self.bytes_in
+        if self.debug:
+            print(">>", command)
+        self.write(command)
+        self.write(b"\r\n")
+        # The response prefix ends at the first "=", "?" or ";"
+        end = len(command)
+        if _startswith(command, end, b"AT+"):
+            for i in range(3, end):
+                c = command[i]
+                if c == 61 or c == 63 or c == 59:
+                    end = i
+                    break
+        else:
+            end = 0
+        self._cmd = command
+        self._owner = end
+
+    def _record(self, command, status):
+        # Add the command started by the last _send() to self.stats, keyed by its prefix
+        key = command_key(bytes(command).decode("utf-8", "ignore"))
+        self.stats.record(key, ticks_diff(ticks_ms(), self._start), status,
+                          self.bytes_out - self._out, self.bytes_in - self._in)
+
+    def run(self, command, timeout=None, terminator=None, capture=None):
+        """
+        Allocation free variant of command(): returns only the status.
+
+        Args:
+            command (bytes): Command without the trailing CR/LF, e.g. b"AT+CSQ"
+            timeout (int): Upper bound in milliseconds, defaults to self.timeout
+            terminator (bytes): Optional text that ends the response, see command()
+            capture (bytes): Prefix of the response line to keep, e.g. b"+CSQ:".
+                The matched terminator line is kept when no capture prefix is given.
+                Read it back with field_int() / field() / response_line().
+        """
+        self._resp_n = 0
+        self._send(command)
+        try:
+            status = self._wait(timeout, terminator, capture)
+            if self.stats is not None:
+                self._record(command, status)
+            if self.observer is not None:
+                self.observer(status)
+            return status
+        finally:
+            self._cmd = None
+
+    def command(self, command, timeout=None, terminator=None):
+        """
+        Send an AT command and wait for its response.
+
+        Args:
+            command (str): Command without the trailing CR/LF, e.g. "AT+CSQ"
+            timeout (int): Upper bound in milliseconds, defaults to self.timeout
+            terminator (str): Optional text that ends the response, e.g. "+HTTPACTION:".
+                When given, OK does not end the response, only the terminator or an error.
+
+        Returns:
+            tuple: (status, response) where status is one of AT_OK, AT_ERROR, AT_PROMPT,
+            AT_MATCH, AT_TIMEOUT and response holds the non-empty response lines
+            joined with CR/LF.
+        """
+        self._resp_n = 0
+        command = _encode(command)
+        self._send(command)
+        try:
+            status, response = self.wait_response(timeout, terminator)
+            if self.stats is not None:
+                self._record(command, status)
+            if self.observer is not None:
+                self.observer(status)
+            return status, response
+        finally:
+            self._cmd = None
+
+    def run_into(self, command, prefix, buf, field=0, inline=False, timeout=None, end=None):
+        """
+        Run a command whose response carries raw data and read the data into buf.
+
+        Args:
+            command (bytes): Command, e.g. b"AT+CIPRXGET=2,0,1460"
+            prefix (bytes): Start of the response line holding the length, e.g. b"+CIPRXGET: 2,"
+            buf: bytearray or memoryview taking the data, at most len(buf) bytes are read
+            field (int): Index of the length in the response line
+            inline (bool): The data follows the comma after the length on the same line
+                (+CARECV: <length>,<data>), otherwise it starts on the next line
+            timeout (int): Upper bound in milliseconds, defaults to self.timeout
+            end (bytes): Line that ends the response after the data instead of OK,
+                e.g. b"+CCHRECV: 0," (A76XX sends OK before the data there). Without
+                data it comes alone, prefix must match it as well then.
+
+        Returns:
+            int: Number of bytes read, -1 if the command failed. The response line stays
+            captured for field_int() (the end line when end is given).
+        """
+        self._resp_n = 0
+        self._send(command)
+        try:
+            if inline:
+                self._inline = (prefix, field + 1)
+            status = self._wait(timeout, prefix, prefix)
+            self._inline = None
+            count = -1
+            if status == AT_MATCH and end is not None and _startswith(self._resp, self._resp_n, end):
+                count = 0  # The end line came instead of data
+            elif status == AT_MATCH:
+                length = self.field_int(field, 0)
+                if length > len(buf):
+                    length = len(buf)
+                count = self.read_into(buf, length, timeout)
+                status = self._wait(timeout, end, None)  # OK (or end) after the data
+            elif status == AT_OK:
+                count = 0  # Nothing to read
+            if self.stats is not None:
+                self._record(command, status)
+            if self.observer is not None:
+                self.observer(status)
+            return count
+        finally:
+            self._inline = None
+            self._cmd = None
+
+    def wait_response(self, timeout=None, terminator=None):
+        """Collect response lines without sending anything, see command()."""
+        self._lines = []
+        try:
+            status = self._wait(timeout, None if terminator is None else _encode(terminator), None)
+            response = "\r\n".join(self._lines)
+        finally:
+            self._lines = None
+            self._partial = ""
+        if self.debug:
+            print("<<", response)
+        return status, response
+
+    def batch(self, commands, timeout=None, join=False, max_length=256):
+        """
+        Run a configuration sequence back to back and stop at the first failure.
+
+        Args:
+            commands (list): Commands as str, or (command, terminator) tuples for
+                commands that end on a URC, e.g. ("AT+CMQTTSTART", "+CMQTTSTART:")
+            timeout (int): Upper bound per command line in milliseconds
+            join (bool): Concatenate consecutive extended commands with ";" into one
+                command line (one round trip), up to max_length characters.
+                Only use it where the modem accepts concatenated commands.
+
+        Returns:
+            list: (status, response) per command that was run. All commands succeeded
+            when the list is as long as commands and every status is AT_OK / AT_MATCH.
+            With join, the commands of one command line share its result.
+        """
+        results = []
+        groups = join_commands(commands, max_length) if join else [(item, 1) for item in commands]
+        for item, count in groups:
+            if isinstance(item, tuple):
+                status, response = self.command(item[0], timeout, item[1])
+            else:
+                status, response = self.command(item, timeout)
+            for _ in range(count):
+                results.append((status, response))
+            if status != AT_OK and status != AT_MATCH:
+                break
+        return results
+
+    def send_data(self, command, source, timeout=None, terminator=None, prompt=">", length=None,
+                  chunk=256, suffix=None):
+        """
+        Run a command that takes a payload after a prompt, e.g. AT+CIPSEND, AT+CMQTTPAYLOAD,
+        AT+CCERTDOWN, AT+CMGS (">") or AT+HTTPDATA, AT+CFSWFILE ("DOWNLOAD").
+
+        The payload is only sent once the prompt arrived, streamed from source in chunk
+        sized pieces (see chunks()), so files and generators never sit in RAM as a whole.
+
+        Args:
+            command (str): Command announcing the payload, including its length
+            source: Payload, see chunks()
+            timeout (int): Upper bound in milliseconds for the prompt and for the final result
+            terminator (str): Optional text that ends the response after the payload,
+                e.g. "+CMQTTPUB:" or "+CMGS:", otherwise the final result code does
+            prompt (str): ">" or the text the modem prints instead, e.g. "DOWNLOAD"
+            length (int): Optional number of bytes to take from source
+            suffix (bytes): Optional bytes written after the payload, e.g. b"\x1a" for AT+CMGS
+
+        Returns:
+            tuple: (status, response) of the prompt if it did not arrive, otherwise
+            of the final result after the payload.
+        """
+        # The prompt and the payload are recorded as one command
+        stats = self.stats
+        self.stats = None
+        try:
+            if prompt == ">":
+                status, response = self.command(command, timeout)
+                ready = status == AT_PROMPT
+            else:
+                status, response = self.command(command, timeout, prompt)
+                ready = status == AT_MATCH
+            if ready:
+                self.write_data(source, length, chunk)
+                if suffix:
+                    self.write(suffix)
+                status, response = self.wait_response(timeout, terminator)
+        finally:
+            self.stats = stats
+        if stats is not None:
+            self._record(_encode(command), status)
+        return status, response
+
+    def send_at_command(self, command, wait=1, terminator=None):
+        # Drop-in replacement for the examples' helper, wait is now an upper bound in seconds
+        return self.command(command, int(wait * 1000), terminator)[1]
+
+    # ------------------------------------------------------------------
+    # Raw data following a length header
+    # ------------------------------------------------------------------
+    def read_into(self, buf, length=None, timeout=None):
+        """Read up to length raw bytes into buf without allocating, returns the count."""
+        if length is None:
+            length = len(buf)
+        if timeout is None:
+            timeout = self.timeout
+        rx = self._rx
+        count = 0
+        start = ticks_ms()
+        while count < length:
+            if self._rpos >= self._rlen:
+                if not self._fill():
+                    if ticks_diff(ticks_ms(), start) >= timeout:
+                        break
+                    sleep_ms(1)
+                    continue
+            pos = self._rpos
+            n = self._rlen - pos
+            if n > length - count:
+                n = length - count
+            for i in range(n):
+                buf[count + i] = rx[pos + i]
+            self._rpos = pos + n
+            count += n
+        return count
+
+    def any(self):
+        """Raw bytes waiting to be read: those already buffered plus the UART's."""
+        return self._rlen - self._rpos + self.uart.any()
+
+    def read_data(self, length, timeout=None):
+        """Read exactly length raw bytes following a length header, e.g. +HTTPREAD."""
+        buf = bytearray(length)
+        n = self.read_into(buf, length, timeout)
+        return bytes(buf[:n])
+
+    # ------------------------------------------------------------------
+    # Fields of the line kept by run()
+    # ------------------------------------------------------------------
+    def _field(self, index):
+        # Locate field index of the captured line (after "<prefix>: "), quotes are honoured
+        buf = self._resp
+        n = self._resp_n
+        i = 0
+        while i < n and buf[i] != _COLON:
+            i += 1
+        if i == n:
+            i = 0  # No prefix, e.g. the IMEI returned by AT+CGSN
+        else:
+            i += 1
+        quoted = False
+        field = 0
+        start = i
+        while i <= n:
+            c = buf[i] if i < n else _COMMA
+            if c == _QUOTE:
+                quoted = not quoted
+            elif c == _COMMA and not quoted:
+                if field == index:
+                    while start < i and buf[start] == _SPACE:
+                        start += 1
+                    end = i
+                    if end - start >= 2 and buf[start] == _QUOTE and buf[end - 1] == _QUOTE:
+                        start += 1
+                        end -= 1
+                    self._fs = start
+                    self._fe = end
+                    return True
+                field += 1
+                start = i + 1
+            i += 1
+        return False
+
+    def field_int(self, index, default=None):
+        """Parse field index of the captured line as int, default if missing or empty."""
+        if not self._field(index) or self._fs == self._fe:
+            return default
+        buf = self._resp
+        i = self._fs
+        sign = 1
+        if buf[i] == 45:  # "-"
+            sign = -1
+            i += 1
+        value = 0
+        while i < self._fe and 48 <= buf[i] <= 57:
+            value = value * 10 + buf[i] - 48
+            i += 1
+        return sign * value
+
+    def field(self, index, default=None):
+        """Return field index of the captured line as str, default if missing or empty."""
+        if not self._field(index) or self._fs == self._fe:
+            return default
+        return bytes(self._resp[self._fs:self._fe]).decode("utf-8", "ignore")
+
+    def response_line(self):
+        """Return the line kept by run() as str, None if nothing was captured."""
+        if not self._resp_n:
+            return None
+        return bytes(self._resp[:self._resp_n]).decode("utf-8", "ignore")
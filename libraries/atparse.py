@@ -0,0 +1,302 @@
+#  * @file      atparse.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Typed parsers for the responses the examples poll most often:
+#  *            +CSQ, +CBC, +CPSI, +CGNSSINFO (A76XX / SIM767X), +CGNSINF (SIM70XX)
+#  *            and +CMGL. Each parser walks its line once, converts every field as it
+#  *            passes it and returns a namedtuple record. Empty fields are None, so
+#  *            callers test "fix.lat is not None" instead of comparing strings.
+#  *            The parsers take the response text returned by send_at_command() /
+#  *            ATModem.command() and return None when the line is not in it.
+try:
+    from ucollections import namedtuple
+except ImportError:
+    from collections import namedtuple
+
+# Signal quality, rssi / ber as reported (None for 99 = unknown), dbm derived from rssi
+CSQ = namedtuple("CSQ", ("rssi", "ber", "dbm"))
+
+# Battery, A76XX only reports the voltage: charging / percent are None there
+CBC = namedtuple("CBC", ("charging", "percent", "mv"))
+
+# Serving cell. band, earfcn, rsrq, rsrp, rssi and snr are LTE / CAT-M / NB-IoT only and
+# reported as the modem prints them (A76XX: rsrq / rsrp / rssi in tenths of dB)
+CPSI = namedtuple("CPSI", ("system", "operation", "mcc", "mnc", "lac", "cell_id",
+                           "band", "earfcn", "rsrq", "rsrp", "rssi", "snr"))
+
+# Position fix shared by +CGNSSINFO and +CGNSINF. lat / lon are signed decimal degrees,
+# date and time are UTC. Fields a dialect does not report are None:
+#   +CGNSSINFO: sats_gps / sats_beidou / sats_glonass / sats_galileo, speed in knots
+#   +CGNSINF:   sats_view / sats_used / sats_glonass (GLONASS used), speed in km/h
+GNSS = namedtuple("GNSS", ("fix", "mode", "lat", "lon", "alt", "speed", "course",
+                           "year", "month", "day", "hour", "minute", "second",
+                           "sats_gps", "sats_beidou", "sats_glonass", "sats_galileo",
+                           "sats_view", "sats_used", "pdop", "hdop", "vdop"))
+
+# One message of +CMGL in text mode (AT+CMGF=1)
+SMS = namedtuple("SMS", ("index", "status", "sender", "timestamp", "text"))
+
+
+class _Fields:
+    # Cursor over the comma separated fields of one response line
+    __slots__ = ("line", "pos", "end")
+
+    def __init__(self, line, pos, end):
+        self.line = line
+        self.pos = pos
+        self.end = end
+
+    def _span(self):
+        # Return (start, stop) of the next field and move past it, quotes are honoured
+        line = self.line
+        start = self.pos
+        end = self.end
+        if start > end:
+            return start, start
+        while start < end and line[start] == " ":
+            start += 1
+        if start < end and line[start] == '"':
+            stop = line.find('"', start + 1)
+            if stop < 0 or stop > end:
+                stop = end
+            comma = line.find(",", stop)
+            self.pos = end + 1 if comma < 0 or comma > end else comma + 1
+            return start + 1, stop
+        stop = line.find(",", start)
+        if stop < 0 or stop > end:
+            stop = end
+        self.pos = stop + 1
+        return start, stop
+
+    def skip(self, count=1):
+        for _ in range(count):
+            self._span()
+
+    def text(self):
+        start, stop = self._span()
+        return self.line[start:stop] if stop > start else None
+
+    def int(self, base=10):
+        start, stop = self._span()
+        if stop <= start:
+            return None
+        try:
+            return int(self.line[start:stop], base)
+        except ValueError:
+            return None
+
+    def float(self):
+        start, stop = self._span()
+        if stop <= start:
+            return None
+        try:
+            return float(self.line[start:stop])
+        except ValueError:
+            return None
+
+    def digits(self, start, count):
+        # int of count digits at start within the next field, None if out of range
+        value = 0
+        line = self.line
+        for i in range(start, start + count):
+            if i >= self.end:
+                return None
+            c = ord(line[i]) - 48
+            if c < 0 or c > 9:
+                return None
+            value = value * 10 + c
+        return value
+
+
+def _find(response, prefix, start=0):
+    # Cursor over the line starting with prefix, None if the response does not contain it
+    i = response.find(prefix, start)
+    if i < 0:
+        return None
+    end = response.find("\r", i)
+    if end < 0:
+        end = response.find("\n", i)
+    if end < 0:
+        end = len(response)
+    return _Fields(response, i + len(prefix), end)
+
+
+def parse_csq(response):
+    """+CSQ: <rssi>,<ber> -> CSQ, dbm is -113 + 2 * rssi."""
+    f = _find(response, "+CSQ:")
+    if f is None:
+        return None
+    rssi = f.int()
+    ber = f.int()
+    if rssi == 99:
+        rssi = None
+    if ber == 99:
+        ber = None
+    return CSQ(rssi, ber, None if rssi is None else -113 + 2 * rssi)
+
+
+def parse_cbc(response):
+    """+CBC: <bcs>,<bcl>,<voltage mV> (SIM70XX) or +CBC: <voltage>V (A76XX) -> CBC."""
+    f = _find(response, "+CBC:")
+    if f is None:
+        return None
+    first = f.text()
+    if first is None:
+        return None
+    if first[-1:] == "V":
+        try:
+            return CBC(None, None, int(float(first[:-1]) * 1000 + 0.5))
+        except ValueError:
+            return None
+    percent = f.int()
+    mv = f.int()
+    return CBC(first != "0", percent, mv)
+
+
+def parse_cpsi(response):
+    """
+    +CPSI: <system mode>,<operation mode>,<MCC>-<MNC>,<LAC/TAC>,<cell id>,... -> CPSI.
+    "NO SERVICE" leaves everything but system and operation None.
+    """
+    f = _find(response, "+CPSI:")
+    if f is None:
+        return None
+    system = f.text()
+    operation = f.text()
+    mcc = mnc = None
+    start, stop = f._span()
+    dash = f.line.find("-", start)
+    if 0 <= dash < stop:
+        try:
+            mcc = int(f.line[start:dash])
+            mnc = int(f.line[dash + 1:stop])
+        except ValueError:
+            pass
+    lac = f.int(16)
+    cell_id = f.int()
+    band = earfcn = rsrq = rsrp = rssi = snr = None
+    if system is not None and (system.startswith("LTE") or system.startswith("CAT") or system.startswith("NB")):
+        f.skip()  # Physical cell id
+        band = f.text()
+        earfcn = f.int()
+        f.skip(2)  # Downlink / uplink bandwidth
+        rsrq = f.int()
+        rsrp = f.int()
+        rssi = f.int()
+        snr = f.int()
+    return CPSI(system, operation, mcc, mnc, lac, cell_id, band, earfcn, rsrq, rsrp, rssi, snr)
+
+
+def parse_cgnssinfo(response):
+    """
+    +CGNSSINFO: <mode>,<GPS-SVs>,<BEIDOU-SVs>,<GLONASS-SVs>,<GALILEO-SVs>,<lat>,<N/S>,
+    <lon>,<E/W>,<date ddmmyy>,<time hhmmss.s>,<alt>,<speed>,<course>,<PDOP>,<HDOP>,<VDOP>
+    -> GNSS, fix is False while the modem has no position ("+CGNSSINFO: ,,,,,,,,").
+    """
+    f = _find(response, "+CGNSSINFO:")
+    if f is None:
+        return None
+    mode = f.int()
+    gps = f.int()
+    beidou = f.int()
+    glonass = f.int()
+    galileo = f.int()
+    lat = f.float()
+    if f.text() == "S" and lat is not None:
+        lat = -lat
+    lon = f.float()
+    if f.text() == "W" and lon is not None:
+        lon = -lon
+    year = month = day = hour = minute = second = None
+    start, stop = f._span()
+    if stop - start >= 6:
+        day = f.digits(start, 2)
+        month = f.digits(start + 2, 2)
+        year = f.digits(start + 4, 2)
+        if year is not None:
+            year += 2000
+    start, stop = f._span()
+    if stop - start >= 6:
+        hour = f.digits(start, 2)
+        minute = f.digits(start + 2, 2)
+        second = f.digits(start + 4, 2)
+    alt = f.float()
+    speed = f.float()
+    course = f.float()
+    pdop = f.float()
+    hdop = f.float()
+    vdop = f.float()
+    return GNSS(lat is not None and lon is not None, mode, lat, lon, alt, speed, course,
+                year, month, day, hour, minute, second,
+                gps, beidou, glonass, galileo, None, None, pdop, hdop, vdop)
+
+
+def parse_cgnsinf(response):
+    """
+    +CGNSINF: <run>,<fix>,<yyyyMMddhhmmss.sss>,<lat>,<lon>,<alt>,<speed>,<course>,
+    <fix mode>,,<HDOP>,<PDOP>,<VDOP>,,<sats in view>,<sats used>,<GLONASS used>,...
+    -> GNSS, fix is the fix status the modem reports.
+    """
+    f = _find(response, "+CGNSINF:")
+    if f is None:
+        return None
+    f.skip()  # GNSS run status
+    fix = f.int() == 1
+    year = month = day = hour = minute = second = None
+    start, stop = f._span()
+    if stop - start >= 14:
+        year = f.digits(start, 4)
+        month = f.digits(start + 4, 2)
+        day = f.digits(start + 6, 2)
+        hour = f.digits(start + 8, 2)
+        minute = f.digits(start + 10, 2)
+        second = f.digits(start + 12, 2)
+    lat = f.float()
+    lon = f.float()
+    alt = f.float()
+    speed = f.float()
+    course = f.float()
+    mode = f.int()
+    f.skip()  # Reserved
+    hdop = f.float()
+    pdop = f.float()
+    vdop = f.float()
+    f.skip()  # Reserved
+    view = f.int()
+    used = f.int()
+    glonass = f.int()
+    return GNSS(fix and lat is not None, mode, lat, lon, alt, speed, course,
+                year, month, day, hour, minute, second,
+                None, None, glonass, None, view, used, pdop, hdop, vdop)
+
+
+def parse_cmgl(response):
+    """
+    +CMGL: <index>,<stat>,<oa>,[<alpha>],[<scts>] followed by the text, per message
+    -> list of SMS. Requires text mode (AT+CMGF=1), multi line texts are kept.
+    """
+    messages = []
+    pos = 0
+    while True:
+        f = _find(response, "+CMGL:", pos)
+        if f is None:
+            return messages
+        index = f.int()
+        status = f.text()
+        sender = f.text()
+        f.skip()  # Phone book entry
+        timestamp = f.text()
+        # The text runs up to the next message or the final result code
+        start = f.end
+        while start < len(response) and response[start] in "\r\n":
+            start += 1
+        stop = response.find("+CMGL:", start)
+        if stop < 0:
+            stop = response.find("\r\nOK", start)
+        if stop < 0:
+            stop = len(response)
+        pos = stop
+        while stop > start and response[stop - 1] in "\r\n":
+            stop -= 1
+        messages.append(SMS(index, status, sender, timestamp, response[start:stop]))
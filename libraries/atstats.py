@@ -0,0 +1,123 @@
+#  * @file      atstats.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Per command latency and throughput statistics for atmodem.py / amodem.py.
+#  *            Assign an instance to modem.stats and every command is recorded under
+#  *            its prefix ("AT+CSQ", "AT+CMQTTPUB" ...): call count, min / avg / max /
+#  *            p95 latency, timeouts and UART bytes out / in. as_dict() returns the
+#  *            numbers, dump() a compact table and publish() hands them to any
+#  *            publish(topic, message) function, e.g. the MQTT helper of an example.
+#  *            Nothing is recorded while modem.stats is None (the default).
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+from array import array
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+AT_TIMEOUT = const(4)  # Same value as atmodem.AT_TIMEOUT
+
+# Indexes into the per command record
+_COUNT = const(0)
+_TOTAL = const(1)
+_MIN = const(2)
+_MAX = const(3)
+_TIMEOUTS = const(4)
+_OUT = const(5)
+_IN = const(6)
+_NEXT = const(7)  # Next slot of the latency ring
+
+
+class CommandStats:
+    def __init__(self, samples=32):
+        self.samples = samples  # Latencies kept per command for the p95
+        self._stats = {}  # key -> [record, latency ring]
+
+    def reset(self):
+        self._stats = {}
+
+    def record(self, key, latency, status, bytes_out=0, bytes_in=0):
+        """
+        Record one command.
+
+        Args:
+            key (str): Command prefix, e.g. "AT+CSQ"
+            latency (int): Milliseconds from sending the command to its final result
+            status (int): atmodem status, AT_TIMEOUT is counted as timeout
+            bytes_out (int): Bytes written to the UART, payloads included
+            bytes_in (int): Bytes read from the UART while the command was running
+        """
+        entry = self._stats.get(key)
+        if entry is None:
+            entry = [[0, 0, latency, latency, 0, 0, 0, 0], array("I", [0] * self.samples)]
+            self._stats[key] = entry
+        stat, ring = entry
+        stat[_COUNT] += 1
+        stat[_TOTAL] += latency
+        if latency < stat[_MIN]:
+            stat[_MIN] = latency
+        if latency > stat[_MAX]:
+            stat[_MAX] = latency
+        if status == AT_TIMEOUT:
+            stat[_TIMEOUTS] += 1
+        stat[_OUT] += bytes_out
+        stat[_IN] += bytes_in
+        ring[stat[_NEXT]] = latency
+        stat[_NEXT] = (stat[_NEXT] + 1) % len(ring)
+
+    def _p95(self, stat, ring):
+        # Nearest rank over the latencies still in the ring
+        n = min(stat[_COUNT], len(ring))
+        values = sorted(ring[:n])
+        return values[(95 * n + 99) // 100 - 1]
+
+    def as_dict(self):
+        """Return {key: {"count", "min", "avg", "max", "p95", "timeouts", "out", "in"}}."""
+        result = {}
+        for key, (stat, ring) in self._stats.items():
+            result[key] = {
+                "count": stat[_COUNT],
+                "min": stat[_MIN],
+                "avg": stat[_TOTAL] // stat[_COUNT],
+                "max": stat[_MAX],
+                "p95": self._p95(stat, ring),
+                "timeouts": stat[_TIMEOUTS],
+                "out": stat[_OUT],
+                "in": stat[_IN],
+            }
+        return result
+
+    def dump(self, sort="total"):
+        """
+        Return a compact text table, one line per command, latencies in milliseconds.
+        Sorted by total time spent (the commands dominating the duty cycle first),
+        or by "count" / "max" / "p95" / "key".
+        """
+        stats = self.as_dict()
+        if sort == "key":
+            keys = sorted(stats)
+        elif sort == "total":
+            keys = sorted(stats, key=lambda k: stats[k]["count"] * stats[k]["avg"], reverse=True)
+        else:
+            keys = sorted(stats, key=lambda k: stats[k][sort], reverse=True)
+        lines = ["{:<18s}{:>6s}{:>7s}{:>7s}{:>7s}{:>7s}{:>5s}{:>8s}{:>8s}".format(
+            "command", "count", "min", "avg", "p95", "max", "t/o", "out", "in")]
+        for key in keys:
+            s = stats[key]
+            lines.append("{:<18s}{:>6d}{:>7d}{:>7d}{:>7d}{:>7d}{:>5d}{:>8d}{:>8d}".format(
+                key[:18], s["count"], s["min"], s["avg"], s["p95"], s["max"], s["timeouts"], s["out"], s["in"]))
+        return "\n".join(lines)
+
+    def publish(self, publish, topic):
+        """
+        Send the statistics as JSON through publish(topic, message), e.g.
+        stats.publish(lambda t, m: mqtt_publish(0, t, m), "device/stats").
+        Returns whatever publish() returns.
+        """
+        return publish(topic, json.dumps(self.as_dict()))
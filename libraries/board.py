@@ -0,0 +1,187 @@
+#  * @file      board.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      The board of utilities.CURRENT_PLATFORM as one object, built once from
+#  *            utilities.CONFIG. Pins, the modem UART, ADCs and the SD card are created
+#  *            on first use and kept, features the board lacks are None / False instead
+#  *            of a NameError to catch:
+#  *
+#  *                hw = board.get()
+#  *                hw.power_on()                    # Supply, DTR low, PWRKEY pulse
+#  *                uart = hw.uart()
+#  *                if hw.has("gps_enable"):
+#  *                    hw.gps_enable()
+#  *                if hw.sim70xx:                   # Instead of comparing CURRENT_PLATFORM
+#  *                    ...
+#  *
+#  *            On a host (utilities.EMULATOR) there are no pins, uart() returns a
+#  *            modemsim emulator and power_on() / reset() boot it.
+try:
+    from machine import Pin, UART, ADC
+except ImportError:
+    Pin = UART = ADC = None  # CPython host
+
+import utilities
+from atmodem import sleep_ms
+
+A76XX = "A76XX"
+SIM70XX = "SIM70XX"
+
+# Feature -> CONFIG key of the pin that provides it
+FEATURES = {
+    "power": "BOARD_POWERON_PIN",
+    "pwrkey": "BOARD_PWRKEY_PIN",
+    "reset": "MODEM_RESET_PIN",
+    "dtr": "MODEM_DTR_PIN",
+    "ring": "MODEM_RING_PIN",
+    "gps_enable": "MODEM_GPS_ENABLE_GPIO",
+    "gps_uart": "MODEM_GPS_RX_PIN",
+    "flow_control": "MODEM_RTS_PIN",
+    "battery": "BOARD_BAT_ADC_PIN",
+    "solar": "BOARD_SOLAR_ADC_PIN",
+    "sd": "BOARD_SD_CS_PIN",
+    "led": "BOARD_LED_PIN",
+    "camera": "CAMERA_XCLK_PIN",
+    "i2c": "BOARD_SDA_PIN",
+}
+
+# PWRKEY low time in milliseconds: A76XX / SIM7600 need 50 ms, SIM7000G / SIM7080G 1 s
+PWRKEY_MS = 100
+PWRKEY_MS_SIM70XX = 1000
+RESET_MS = 2600
+
+
+class Board:
+    def __init__(self):
+        self.platform = utilities.CURRENT_PLATFORM
+        self.config = utilities.CONFIG
+        self.emulator = utilities.EMULATOR
+        self.sim70xx = self.platform in utilities.SIM70XX_PLATFORMS
+        self.dialect = SIM70XX if self.sim70xx else A76XX
+        self._pins = {}
+        self._adcs = {}
+        self._uart = None
+        self._sd = None
+
+    def has(self, feature):
+        """True if the board has feature, see FEATURES."""
+        value = self.config.get(FEATURES[feature])
+        return value is not None and value >= 0
+
+    def pin(self, name, mode=None, pull=None):
+        """
+        machine.Pin for the CONFIG key name (e.g. "BOARD_PWRKEY_PIN"), created once.
+        mode defaults to Pin.OUT. None if the board has no such pin or on a host.
+        """
+        number = self.config.get(name)
+        if Pin is None or number is None or number < 0:
+            return None
+        if mode is None:
+            mode = Pin.OUT
+        key = (name, mode)
+        pin = self._pins.get(key)
+        if pin is None:
+            pin = Pin(number, mode) if pull is None else Pin(number, mode, pull)
+            self._pins[key] = pin
+        return pin
+
+    def uart(self, id=1, **kwargs):
+        """The modem UART at MODEM_BAUDRATE (a modemsim emulator on a host), created once."""
+        if self._uart is None:
+            if self.emulator:
+                import modemsim
+                self._uart = modemsim.open_uart(**kwargs)
+            else:
+                self._uart = UART(id, baudrate=self.config["MODEM_BAUDRATE"], tx=self.config["MODEM_TX_PIN"],
+                                  rx=self.config["MODEM_RX_PIN"], **kwargs)
+        return self._uart
+
+    def adc(self, name="BOARD_BAT_ADC_PIN"):
+        """ADC for the full 0 - 3.3 V range on the CONFIG pin name, None if missing."""
+        adc = self._adcs.get(name)
+        if adc is None and ADC is not None and name in self.config:
+            adc = ADC(Pin(self.config[name]))
+            adc.atten(ADC.ATTN_11DB)
+            self._adcs[name] = adc
+        return adc
+
+    def sdcard(self, freq=20000000):
+        """machine.SDCard on the SD socket (SPI, slot 2), None if the board has none."""
+        if self._sd is None and Pin is not None and self.has("sd"):
+            from machine import SDCard
+            config = self.config
+            self._sd = SDCard(slot=2, width=1, sck=Pin(config["BOARD_SCK_PIN"]), miso=Pin(config["BOARD_MISO_PIN"]),
+                              mosi=Pin(config["BOARD_MOSI_PIN"]), cs=Pin(config["BOARD_SD_CS_PIN"]), freq=freq)
+        return self._sd
+
+    def power_key(self, ms=None):
+        """Pulse PWRKEY, which switches the modem on (or off when it is running)."""
+        if self.emulator:
+            self.uart().boot()
+            return
+        pin = self.pin("BOARD_PWRKEY_PIN")
+        if pin is None:
+            return
+        if ms is None:
+            ms = PWRKEY_MS_SIM70XX if self.sim70xx else PWRKEY_MS
+        pin.value(0)
+        sleep_ms(10)
+        pin.value(1)
+        sleep_ms(ms)
+        pin.value(0)
+
+    def supply(self, on=True):
+        """Switch BOARD_POWERON_PIN (modem DC boost), DTR low keeps the modem awake."""
+        for name, value in (("BOARD_POWERON_PIN", on), ("MODEM_DTR_PIN", 0)):
+            pin = self.pin(name)
+            if pin is not None:
+                pin.value(value)
+
+    def power_on(self):
+        """Supply on and a PWRKEY pulse. Use modemboot.boot() to wait for the modem."""
+        self.supply(True)
+        self.power_key()
+
+    def reset(self, ms=RESET_MS):
+        """Hold MODEM_RESET_PIN for ms milliseconds, False if the board has no reset pin."""
+        if self.emulator:
+            self.uart().boot()
+            return True
+        pin = self.pin("MODEM_RESET_PIN")
+        if pin is None:
+            return False
+        level = self.config.get("MODEM_RESET_LEVEL", 0)
+        pin.value(not level)
+        sleep_ms(10)
+        pin.value(level)
+        sleep_ms(ms)
+        pin.value(not level)
+        return True
+
+    def gps_enable(self, on=True):
+        """Drive MODEM_GPS_ENABLE_GPIO to its active level (or away from it), False if missing."""
+        pin = self.pin("MODEM_GPS_ENABLE_GPIO")
+        if pin is None:
+            return False
+        level = self.config.get("MODEM_GPS_ENABLE_LEVEL", 1)
+        pin.value(level if on else not level)
+        return True
+
+    def led(self, on=True):
+        """Switch BOARD_LED_PIN, LED_ON is its active level."""
+        pin = self.pin("BOARD_LED_PIN")
+        if pin is not None:
+            level = self.config.get("LED_ON", 1)
+            pin.value(level if on else not level)
+
+
+_board = None
+
+
+def get():
+    """The Board of utilities.CURRENT_PLATFORM, built on the first call."""
+    global _board
+    if _board is None or _board.platform != utilities.CURRENT_PLATFORM:
+        _board = Board()
+    return _board
@@ -0,0 +1,358 @@
+#  * @file      cmux.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      GSM 07.10 multiplexer (AT+CMUX=0, basic option) over the modem UART,
+#  *            see datasheet/SIM767X/SIM767XX Series_CMUX_USER_GUIDE_V1.00.pdf.
+#  *            Each DLC becomes a Channel with the UART interface ATModem uses, so
+#  *            AT control, a data session and NMEA output run at the same time:
+#  *
+#  *                mux = cmux.CMux(uart, channels=(1, 2, 3))
+#  *                mux.start(ATModem(uart))         # Sends AT+CMUX=0, opens the DLCs
+#  *                control = ATModem(mux.channel(1))
+#  *                data = ATModem(mux.channel(2))   # Sockets / MQTT
+#  *                nmea = mux.channel(3)
+#  *                ATModem(nmea).command("AT+CGNSSTST=1")  # NMEA follows on this DLC
+#  *                line = nmea.readline()
+#  *
+#  *            Frames are assembled in fixed buffers: header bytes are parsed one by
+#  *            one, the information field is copied in one slice into the ring buffer
+#  *            of its channel, and nothing is allocated per byte. Any channel read polls
+#  *            the UART for all of them; call mux.poll() in idle loops so a channel
+#  *            nobody reads does not hold back the others until its ring is full.
+from atmodem import AT_OK, ticks_ms, ticks_diff, sleep_ms
+
+try:
+    from micropython import const
+except ImportError:
+    const = lambda x: x
+
+_FLAG = const(0xF9)
+_SABM = const(0x2F)
+_UA = const(0x63)
+_DM = const(0x0F)
+_DISC = const(0x43)
+_UIH = const(0xEF)
+_PF = const(0x10)
+_MSC = const(0xE0)  # Modem status command, type byte | C/R (0x02) | EA (0x01)
+_CLD = const(0xC0)  # Multiplexer close down
+_V24 = const(0x8D)  # MSC signals: EA, RTC, RTR, DV
+
+N1 = 127  # Default largest information field of the SIMCom modems
+
+
+def _crc_table():
+    table = bytearray(256)
+    for i in range(256):
+        crc = i
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xE0 if crc & 1 else crc >> 1
+        table[i] = crc
+    return bytes(table)
+
+
+_CRC = _crc_table()
+
+
+def _fcs(buf, start, end):
+    # 07.10 frame check sequence over buf[start:end]: reflected CRC-8, polynomial 0x07
+    fcs = 0xFF
+    for i in range(start, end):
+        fcs = _CRC[fcs ^ buf[i]]
+    return 0xFF - fcs
+
+
+class Channel:
+    def __init__(self, mux, dlci, size):
+        """One DLC with write() / any() / read() / readinto() / readline() like machine.UART."""
+        self.mux = mux
+        self.dlci = dlci
+        self.open = False
+        self.overruns = 0  # Bytes dropped because the ring buffer was full
+        self._buf = bytearray(size)
+        self._head = 0  # Oldest byte
+        self._len = 0
+
+    def _put(self, src, start, n):
+        # Append src[start:start + n] to the ring, src is a memoryview
+        buf = self._buf
+        size = len(buf)
+        free = size - self._len
+        if n > free:
+            self.overruns += n - free
+            n = free
+        tail = self._head + self._len
+        if tail >= size:
+            tail -= size
+        first = size - tail
+        if first > n:
+            first = n
+        buf[tail:tail + first] = src[start:start + first]
+        if n > first:
+            buf[0:n - first] = src[start + first:start + n]
+        self._len += n
+
+    def any(self):
+        self.mux.poll()
+        return self._len
+
+    def readinto(self, buf, n=None):
+        self.mux.poll()
+        if n is None or n > len(buf):
+            n = len(buf)
+        if n > self._len:
+            n = self._len
+        if not n:
+            return None
+        ring = self._buf
+        size = len(ring)
+        head = self._head
+        first = size - head
+        if first > n:
+            first = n
+        buf[0:first] = ring[head:head + first]  # buf is a bytearray, ATModem._rx
+        if n > first:
+            buf[first:n] = ring[0:n - first]
+        head += n
+        self._head = head - size if head >= size else head
+        self._len -= n
+        return n
+
+    def read(self, n=None):
+        self.mux.poll()
+        if n is None or n > self._len:
+            n = self._len
+        if not n:
+            return None
+        buf = bytearray(n)
+        self.readinto(buf, n)
+        return bytes(buf)
+
+    def readline(self):
+        """A complete line including "\\n", None while there is none."""
+        self.mux.poll()
+        ring = self._buf
+        size = len(ring)
+        pos = self._head
+        for i in range(self._len):
+            if ring[pos] == 10:
+                return self.read(i + 1)
+            pos += 1
+            if pos == size:
+                pos = 0
+        return None
+
+    def write(self, data):
+        return self.mux.write(self.dlci, data)
+
+
+class CMux:
+    def __init__(self, uart, channels=(1, 2, 3), frame_size=N1, rxbuf=1024):
+        """
+        Args:
+            uart: machine.UART of the modem (or modemsim.ModemEmulator)
+            channels (tuple): DLCs to open, 1 to 4 on the SIMCom modems
+            frame_size (int): Largest information field (N1), as set with AT+CMUX
+            rxbuf (int): Ring buffer per channel in bytes
+        """
+        self.uart = uart
+        self.n1 = frame_size
+        self.active = False
+        self.errors = 0  # Frames dropped for a bad FCS or length
+        self.channels = {}
+        for dlci in channels:
+            self.channels[dlci] = Channel(self, dlci, rxbuf)
+        self._rx = bytearray(256)
+        self._rxv = memoryview(self._rx)
+        # Frame being received without its flags: address, control, length (1-2),
+        # information, FCS. _n bytes so far, _need once the length is known.
+        self._frame = bytearray(frame_size + 5)
+        self._fv = memoryview(self._frame)
+        self._n = 0
+        self._need = 0
+        self._sync = False  # A flag was seen, the next byte starts a frame
+        self._tx = bytearray(frame_size + 7)
+        self._txv = memoryview(self._tx)
+        self._acks = {}  # dlci -> UA / DM received for the last SABM / DISC
+        self._reply = None  # Type of the last control channel response
+
+    def channel(self, dlci):
+        return self.channels[dlci]
+
+    # ------------------------------------------------------------------
+    # Receive path
+    # ------------------------------------------------------------------
+    def poll(self):
+        """Read everything the UART has and route it to the channels."""
+        rx = self._rx
+        while self.uart.any():
+            n = self.uart.readinto(rx)
+            if not n:
+                return
+            self._parse(n)
+
+    def _parse(self, n):
+        rx = self._rx
+        frame = self._frame
+        size = len(frame)
+        i = 0
+        while i < n:
+            k = self._n
+            if k == 0:
+                c = rx[i]
+                i += 1
+                if c == _FLAG:
+                    self._sync = True
+                elif self._sync:
+                    frame[0] = c
+                    self._n = 1
+                    self._sync = False
+                continue
+            need = self._need
+            if need == 0:
+                c = rx[i]
+                i += 1
+                frame[k] = c
+                k += 1
+                self._n = k
+                if k == 3 and c & 1:
+                    need = 4 + (c >> 1)
+                elif k == 4:
+                    need = 5 + ((frame[2] >> 1) | (c << 7))
+                if need > size:
+                    self.errors += 1  # Longer than N1: not a frame of ours
+                    self._n = 0
+                    need = 0
+                self._need = need
+                continue
+            # Information field and FCS in one slice
+            m = need - k
+            if m > n - i:
+                m = n - i
+            frame[k:k + m] = self._rxv[i:i + m]
+            i += m
+            k += m
+            self._n = k
+            if k == need:
+                self._frame_done(k)
+                self._n = 0
+                self._need = 0
+
+    def _frame_done(self, k):
+        frame = self._frame
+        head = 3 if frame[2] & 1 else 4
+        if _fcs(frame, 0, head) != frame[k - 1]:
+            self.errors += 1
+            return
+        dlci = frame[0] >> 2
+        control = frame[1] & ~_PF
+        if control == _UIH:
+            if dlci == 0:
+                self._on_control(head, k - 1)
+            else:
+                channel = self.channels.get(dlci)
+                if channel is not None:
+                    channel._put(self._fv, head, k - 1 - head)
+        elif control == _UA or control == _DM:
+            self._acks[dlci] = control
+
+    def _on_control(self, start, end):
+        # Control channel message: the modem's MSC commands are answered, responses recorded
+        frame = self._frame
+        if start >= end:
+            return
+        kind = frame[start]
+        if kind & 0x02:
+            if kind & ~0x03 == _MSC:
+                frame[start] = kind & ~0x02
+                self._send(0, _UIH, self._fv[start:end])
+        else:
+            self._reply = kind & ~0x03
+
+    # ------------------------------------------------------------------
+    # Transmit path
+    # ------------------------------------------------------------------
+    def _send(self, dlci, control, info=None):
+        tx = self._tx
+        n = 0 if info is None else len(info)
+        tx[0] = _FLAG
+        tx[1] = dlci << 2 | 0x03  # EA, C/R: we are the initiator
+        tx[2] = control
+        if n < 128:
+            tx[3] = n << 1 | 1
+            head = 4
+        else:
+            tx[3] = (n & 0x7F) << 1
+            tx[4] = n >> 7
+            head = 5
+        if n:
+            tx[head:head + n] = info
+        end = head + n
+        tx[end] = _fcs(tx, 1, head)
+        tx[end + 1] = _FLAG
+        self.uart.write(self._txv[:end + 2])
+
+    def write(self, dlci, data):
+        """Send data on dlci in frames of at most N1 bytes, returns the count."""
+        if isinstance(data, str):
+            data = data.encode()
+        mv = memoryview(data)
+        total = len(mv)
+        pos = 0
+        while pos < total:
+            n = total - pos
+            if n > self.n1:
+                n = self.n1
+            self._send(dlci, _UIH, mv[pos:pos + n])
+            pos += n
+        return total
+
+    # ------------------------------------------------------------------
+    # Start / stop
+    # ------------------------------------------------------------------
+    def _wait(self, done, timeout):
+        start = ticks_ms()
+        while not done():
+            if ticks_diff(ticks_ms(), start) >= timeout:
+                return False
+            self.poll()
+            sleep_ms(1)
+        return True
+
+    def _open(self, dlci, timeout):
+        self._acks.pop(dlci, None)
+        self._send(dlci, _SABM | _PF)
+        if not self._wait(lambda: dlci in self._acks, timeout) or self._acks[dlci] != _UA:
+            return False
+        if dlci:
+            # Modem status: the DTE is ready, without it some firmwares hold the data back
+            self._send(0, _UIH, bytes((_MSC | 0x03, 0x05, dlci << 2 | 0x03, _V24)))
+            self.channels[dlci].open = True
+        return True
+
+    def start(self, modem=None, timeout=1000):
+        """
+        Enter multiplexer mode and open DLC 0 and the channels, True on success.
+
+        Args:
+            modem (ATModem): Engine on the same UART, used to send AT+CMUX=0. Leave it
+                out when the modem is already in CMUX mode (e.g. after a wake).
+            timeout (int): Milliseconds per DLC for the UA answer
+        """
+        if modem is not None and modem.run(b"AT+CMUX=0", timeout) != AT_OK:
+            return False
+        self.active = True
+        for dlci in (0,) + tuple(self.channels):
+            if not self._open(dlci, timeout):
+                return False
+        return True
+
+    def close(self, timeout=1000):
+        """Close down the multiplexer (CLD), the UART carries plain AT commands again."""
+        self._reply = None
+        self._send(0, _UIH, bytes((_CLD | 0x03, 0x01)))
+        done = self._wait(lambda: self._reply == _CLD, timeout)
+        self.active = False
+        for channel in self.channels.values():
+            channel.open = False
+        return done
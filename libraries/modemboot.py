@@ -0,0 +1,156 @@
+#  * @file      modemboot.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Event driven modem start for the examples.
+#  *            boot() drives BOARD_POWERON_PIN / MODEM_DTR_PIN / BOARD_PWRKEY_PIN of
+#  *            utilities.CONFIG, then listens to the UART: the start up URCs
+#  *            (*ATREADY, RDY, +CPIN: READY, SMS DONE, PB DONE ...) are timestamped as
+#  *            they arrive and "AT" is sent every 200 ms and right after each of
+#  *            them, so the function returns as soon as the modem is usable instead
+#  *            of after fixed delays.
+#  *            A modem that still runs (ESP32 reset, wake from deep sleep) answers the
+#  *            first AT and is not power cycled. PWRKEY is only pulsed again, or
+#  *            MODEM_RESET_PIN used, when the modem stayed completely silent.
+#  *
+#  *                boot = modemboot.boot(modem, wait=("+CPIN: READY", "SMS DONE"))
+#  *                print("Modem ready in %d ms" % boot.ms, boot.events)
+#  *
+#  *            A rate negotiated with modemuart is restored first, a modem that does
+#  *            not answer at it gets MODEM_BAUDRATE again before PWRKEY is pulsed.
+#  *
+#  *            With utilities.EMULATOR the PWRKEY pulse powers on the modemsim emulator.
+try:
+    from ucollections import namedtuple
+except ImportError:
+    from collections import namedtuple
+
+import board
+import utilities
+import modemuart
+from atmodem import AT_OK, ticks_ms, ticks_diff
+
+# Unsolicited lines printed while the modem starts. They are recorded under these
+# names, +CPIN: and +CFUN: lines with their value (e.g. "+CPIN: SIM PIN").
+BOOT_URCS = ("*ATREADY", "RDY", "+CFUN:", "+CPIN:", "SMS DONE", "SMS Ready", "PB DONE")
+
+# Result of boot()
+#   ready:   every event of wait arrived
+#   ms:      milliseconds from the call to ready (or to giving up)
+#   powered: True if boot() pulsed PWRKEY, False if the modem was already running
+#   pulses:  PWRKEY pulses / resets needed
+#   events:  {event: milliseconds since the call}, "AT" is the first answered AT
+Boot = namedtuple("Boot", ("ready", "ms", "powered", "pulses", "events"))
+
+ANSWER_MS = 50  # A running modem answers AT within a few milliseconds
+PROBES = 3  # ATs before PWRKEY is pulsed, a modem woken by DTR may drop the first one
+
+
+def power_key(uart=None, ms=None):
+    """Pulse PWRKEY, which switches the modem on (or off when it is running)."""
+    if utilities.EMULATOR:
+        uart.boot()  # The emulator of the modem engine, not necessarily board.uart()
+        return
+    board.get().power_key(ms)
+
+
+def reset(uart=None, ms=board.RESET_MS):
+    """Hold MODEM_RESET_PIN for ms milliseconds, False if the board has no reset pin."""
+    if utilities.EMULATOR:
+        uart.boot()
+        return True
+    return board.get().reset(ms)
+
+
+def boot(modem, wait=("+CPIN: READY",), timeout=30000, poll=200, retry=15000):
+    """
+    Power the modem on if needed and wait until it is ready.
+
+    Args:
+        modem (ATModem): Engine on the modem UART. The BOOT_URCS callbacks are only
+            registered while boot() runs.
+        wait (tuple): Events to wait for besides the first answered AT, e.g.
+            ("+CPIN: READY", "SMS DONE") before reading SMS, () to return on AT.
+            A modem that was already running only has +CPIN: READY checked.
+        timeout (int): Upper bound in milliseconds
+        poll (int): AT polling interval in milliseconds
+        retry (int): Milliseconds without a single byte from the modem before it is
+            pulsed again, alternating MODEM_RESET_PIN (where available) and PWRKEY
+
+    Returns:
+        Boot: see Boot above, ready is False when timeout expired first
+    """
+    start = ticks_ms()
+    events = {}
+
+    def record(line):
+        key = "*ATREADY" if line.startswith("*ATREADY") else line.strip()
+        if key not in events:
+            events[key] = ticks_diff(ticks_ms(), start)
+
+    for prefix in BOOT_URCS:
+        modem.on_urc(prefix, record)
+
+    # Power supply on and the modem awake (DTR low) before the first AT
+    board.get().supply(True)
+
+    pulses = 0
+    powered = True
+    restored = modemuart.restore(modem)
+    for attempt in range(2 if restored else 1):
+        if attempt:
+            modemuart.forget(modem)  # Power cycled, the modem is back at MODEM_BAUDRATE
+        for _ in range(PROBES):
+            if modem.run(b"AT", ANSWER_MS) == AT_OK:
+                powered = False
+                break
+        if not powered:
+            break
+    if powered:
+        power_key(modem.uart)
+        pulses = 1
+    else:
+        record("AT")
+    # A running modem printed its start up URCs long ago, only the SIM is checked
+    needed = wait if powered else tuple(event for event in wait if event == "+CPIN: READY")
+    ready = False
+    asked = None  # Last AT+CPIN? query
+    last = ticks_ms()  # Last pulse or last byte from the modem
+    received = modem.bytes_in
+    try:
+        while True:
+            if "AT" in events:
+                if "+CPIN: READY" in needed and "+CPIN: READY" not in events \
+                        and (asked is None or ticks_diff(ticks_ms(), asked) >= 1000):
+                    # The SIM may have been ready before anybody listened
+                    asked = ticks_ms()
+                    if modem.run(b"AT+CPIN?", 1000, None, b"+CPIN:") == AT_OK:
+                        record(modem.response_line())
+                ready = all(event in events for event in needed)
+                if ready:
+                    break
+            now = ticks_ms()
+            if ticks_diff(now, start) >= timeout:
+                break
+            if modem.bytes_in != received:
+                received = modem.bytes_in
+                last = now
+            elif ticks_diff(now, last) >= retry:
+                # Not a single byte: the modem is off, or a pulse switched it off again.
+                # Retries alternate between MODEM_RESET_PIN (where available) and PWRKEY.
+                if pulses % 2 == 0 or not reset(modem.uart):
+                    power_key(modem.uart)
+                pulses += 1
+                last = ticks_ms()
+            if "AT" not in events and modem.run(b"AT", ANSWER_MS) == AT_OK:
+                record("AT")
+                continue
+            # Listen until the next poll, a start up URC ends the wait early
+            count = len(events)
+            t = ticks_ms()
+            while len(events) == count and ticks_diff(ticks_ms(), t) < poll:
+                modem.poll(10)
+    finally:
+        for prefix in BOOT_URCS:
+            modem.remove_urc(prefix)
+    return Boot(ready, ticks_diff(ticks_ms(), start), powered, pulses, events)
@@ -0,0 +1,109 @@
+#  * @file      modemdns.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Cached host name lookups with AT+CDNSGIP.
+#  *            A lookup over cellular takes hundreds of milliseconds, sometimes
+#  *            seconds. Resolver keeps the answers for ttl seconds in RAM and in RTC
+#  *            memory (rtcmem key "dns"), so a report after deep sleep connects to the
+#  *            cached address without asking the network again:
+#  *
+#  *                dns = modemdns.Resolver(modem, ttl=3600)
+#  *                print(dns.resolve("httpbin.org"))          # "54.204.25.12"
+#  *                sock = modemsock.ModemSocket(modem, ssl=True, resolver=dns)
+#  *                sock.connect(("httpbin.org", 443))         # By address, SNI httpbin.org
+#  *                pool = modemhttp.Pool(modem, resolver=dns)
+#  *
+#  *            AT+CDNSGIP does not report the record's TTL, ttl is the cache lifetime.
+#  *            A connect that fails on a cached address drops it and looks up again.
+#  *            Expiry uses time.time(), whose RTC keeps counting through deep sleep.
+import time
+
+import rtcmem
+from atmodem import AT_MATCH, ticks_ms, ticks_diff
+
+KEY = "dns"  # rtcmem key
+
+
+def is_address(host):
+    """True for an IPv4 literal such as "93.184.216.34"."""
+    parts = host.split(".")
+    return len(parts) == 4 and all(part.isdigit() for part in parts)
+
+
+class Resolver:
+    def __init__(self, modem, ttl=3600, size=8, persist=True, timeout=10000):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART, the PDP context must be open
+            ttl (int): Seconds an answer is used
+            size (int): Names kept at most, the one expiring first makes room
+            persist (bool): Keep the cache in RTC memory through deep sleep
+            timeout (int): Upper bound in milliseconds for one lookup
+        """
+        self.modem = modem
+        self.ttl = ttl
+        self.size = size
+        self.persist = persist
+        self.timeout = timeout
+        self.cache = {}  # host -> [address, expiry in time.time() seconds]
+        if persist:
+            self.cache = rtcmem.load(KEY) or {}
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self.lookup_ms = 0  # Duration of the last network lookup
+
+    def _save(self):
+        if self.persist:
+            try:
+                rtcmem.save(KEY, self.cache)
+            except ValueError:
+                pass  # RTC memory full: the RAM cache still works
+
+    def lookup(self, host):
+        """Ask the network with AT+CDNSGIP, bypassing the cache. None if it fails."""
+        modem = self.modem
+        start = ticks_ms()
+        # +CDNSGIP: 1,"<host>","<address>"[,"<address>"] or +CDNSGIP: 0,<error>
+        status = modem.run(('AT+CDNSGIP="%s"' % host).encode(), self.timeout, terminator=b"+CDNSGIP:")
+        self.lookup_ms = ticks_diff(ticks_ms(), start)
+        if status != AT_MATCH or modem.field_int(0) != 1:
+            self.failures += 1
+            return None
+        return modem.field(2)
+
+    def resolve(self, host):
+        """Address of host, from the cache while it is fresh. IP literals are returned as they are."""
+        if is_address(host):
+            return host
+        now = int(time.time())
+        entry = self.cache.get(host)
+        if entry is not None and entry[1] > now:
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        address = self.lookup(host)
+        if address is None:
+            return None
+        cache = self.cache
+        for name in [name for name in cache if cache[name][1] <= now]:
+            del cache[name]
+        if host not in cache and len(cache) >= self.size:
+            del cache[min(cache, key=lambda name: cache[name][1])]
+        cache[host] = [address, now + self.ttl]
+        self._save()
+        return address
+
+    def invalidate(self, host=None):
+        """Forget host (everything when None), e.g. after a connect to its address failed."""
+        if host is None:
+            self.cache = {}
+        elif self.cache.pop(host, None) is None:
+            return
+        self._save()
+
+    def metrics(self):
+        return {"entries": len(self.cache), "hits": self.hits, "misses": self.misses,
+                "failures": self.failures, "lookup_ms": self.lookup_ms}
@@ -0,0 +1,433 @@
+#  * @file      modemhttp.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      HTTP/1.1 client with a keep-alive connection pool on modemsock sockets.
+#  *            The built-in HTTP(S) service (AT+HTTPINIT / AT+SHCONN) sets up TCP and TLS
+#  *            for every request. Pool keeps one connection per host:port open between
+#  *            requests, so a device posting to the same endpoint every minute pays the
+#  *            handshake once; connections idle for longer than idle_ms (or the server's
+#  *            Keep-Alive timeout) are closed instead of reused:
+#  *
+#  *                pool = modemhttp.Pool(modem, max_connections=2, idle_ms=60000)
+#  *                r = pool.request("POST", "https://example.com/api", json={"t": 21.5})
+#  *                print(r.status, r.text())
+#  *                for r in pool.pipeline([("GET", url1), ("GET", url2)]):
+#  *                    print(r.status, len(r.content))     # One link, requests back to back
+#  *                pool.close()
+#  *
+#  *            A response keeps its connection until the body was read (read(),
+#  *            text(), json(), close()); requests in between open a second connection.
+#  *            https URLs use TLS in the modem, see modemsock.ModemSocket(ssl=True).
+#  *            Pool(modem, resolver=modemdns.Resolver(modem)) connects to cached addresses.
+#  *            A request that fails on a reused connection the server may have closed is
+#  *            sent again on a new one only for idempotent methods (IDEMPOTENT); a POST
+#  *            or PATCH raises OSError instead, as the server may have acted on it.
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+import modemsock
+from atmodem import ticks_ms, ticks_diff
+
+IDEMPOTENT = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE")  # Methods safe to send again
+
+
+def split_url(url):
+    """(ssl, host, port, path) of an http:// or https:// URL."""
+    ssl = url.startswith("https://")
+    if not ssl and not url.startswith("http://"):
+        raise ValueError("unsupported URL " + url)
+    rest = url[8 if ssl else 7:]
+    i = rest.find("/")
+    host, path = (rest, "/") if i < 0 else (rest[:i], rest[i:])
+    port = 443 if ssl else 80
+    i = host.rfind(":")
+    if i >= 0:
+        port = int(host[i + 1:])
+        host = host[:i]
+    return ssl, host, port, path
+
+
+def _replayable(requests):
+    # Requests that may go to the server twice
+    return all(item[0] in IDEMPOTENT for item in requests)
+
+
+class _Connection:
+    """A pooled socket with a small read buffer for status line and headers."""
+
+    def __init__(self, key, sock, buffer):
+        self.key = key
+        self.sock = sock
+        self.buf = bytearray(buffer)
+        self.pos = 0
+        self.len = 0
+        self.busy = False
+        self.last = ticks_ms()
+        self.keep_ms = None  # Keep-Alive timeout announced by the server
+        self.requests = 0
+
+    def alive(self):
+        sock = self.sock
+        return sock.state == modemsock.CONNECTED and not sock.peer_closed
+
+    def _fill(self):
+        self.pos = 0
+        self.len = self.sock.recv_into(self.buf)
+        return self.len
+
+    def readline(self):
+        """One line without CR/LF as bytes, None if the connection closed first."""
+        line = b""
+        while True:
+            if self.pos >= self.len and not self._fill():
+                return None
+            buf = self.buf
+            end = self.len
+            i = self.pos
+            while i < end and buf[i] != 10:
+                i += 1
+            line += bytes(buf[self.pos:i])
+            if i < end:
+                self.pos = i + 1
+                return line[:-1] if line.endswith(b"\r") else line
+            self.pos = end
+
+    def readinto(self, view):
+        """Read up to len(view) bytes, buffered ones first. 0 when the connection closed."""
+        n = self.len - self.pos
+        if n:
+            if n > len(view):
+                n = len(view)
+            view[:n] = self.buf[self.pos:self.pos + n]
+            self.pos += n
+            return n
+        return self.sock.recv_into(view)
+
+    def close(self):
+        self.sock.close()
+
+
+class Response:
+    def __init__(self, pool, conn, method):
+        self._pool = pool
+        self._conn = conn
+        self.status = 0
+        self.reason = ""
+        self.headers = {}  # Lower case names
+        self._left = None  # Body bytes left, None until the end of the connection
+        self._chunked = False
+        self._chunk = 0  # Bytes left of the current chunk
+        self._keep = False
+        self._content = None
+        self._head(method)
+
+    def _head(self, method):
+        conn = self._conn
+        headers = self.headers
+        while True:
+            line = conn.readline()
+            if not line or not line.startswith(b"HTTP/"):
+                raise OSError("no response")
+            parts = line.decode().split(" ", 2)
+            self.status = int(parts[1])
+            self.reason = parts[2] if len(parts) > 2 else ""
+            headers.clear()
+            while True:
+                line = conn.readline()
+                if line is None:
+                    raise OSError("truncated response")
+                if not line:
+                    break
+                i = line.find(b":")
+                if i > 0:
+                    headers[line[:i].decode().lower()] = line[i + 1:].decode().strip()
+            if not 100 <= self.status < 200 or self.status == 101:
+                break
+            # Interim response (100 Continue, 103 Early Hints), the final one follows
+        connection = headers.get("connection", "").lower()
+        self._keep = connection != "close" and (parts[0] == "HTTP/1.1" or connection == "keep-alive")
+        alive = headers.get("keep-alive", "")
+        i = alive.find("timeout=")
+        if i >= 0:
+            try:
+                conn.keep_ms = (int(alive[i + 8:].split(",")[0]) - 1) * 1000  # Reuse before the server drops it
+            except ValueError:
+                conn.keep_ms = None  # Malformed, keep the pool's idle limit
+        if method == "HEAD" or self.status in (204, 304, 101):
+            self._left = 0
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            self._chunked = True
+        elif "content-length" in headers:
+            self._left = int(headers["content-length"])
+        else:
+            self._keep = False  # The body ends with the connection
+        self._check_done()
+
+    def _check_done(self):
+        if self._conn is not None and self._left == 0 and not self._chunked:
+            self._pool._release(self._conn, self._keep)
+            self._conn = None
+
+    def _next_chunk(self):
+        # Size line of the next chunk, 0 and the trailer end the body
+        conn = self._conn
+        line = conn.readline()
+        if line == b"":
+            line = conn.readline()  # CRLF after the previous chunk
+        if line is None:
+            raise OSError("truncated response")
+        size = int(line.split(b";")[0], 16)
+        if size == 0:
+            while conn.readline():
+                pass
+            self._chunked = False
+            self._left = 0
+        self._chunk = size
+
+    def readinto(self, buf):
+        """Read body bytes into buf, returns the count, 0 at the end of the body."""
+        conn = self._conn
+        if conn is None:
+            return 0
+        view = memoryview(buf)
+        if self._chunked:
+            if not self._chunk:
+                self._next_chunk()
+                if not self._chunked:
+                    self._check_done()
+                    return 0
+            if len(view) > self._chunk:
+                view = view[:self._chunk]
+        elif self._left is not None and len(view) > self._left:
+            view = view[:self._left]
+        n = conn.readinto(view)
+        if not n:
+            self._left = 0
+            self._keep = False
+            self._chunked = False
+        elif self._chunked:
+            self._chunk -= n
+        elif self._left is not None:
+            self._left -= n
+        self._check_done()
+        return n
+
+    def read(self, size=-1):
+        """Up to size body bytes, the rest of the body when size is negative."""
+        if self._content is not None:
+            data, self._content = self._content, b""
+            return data
+        out = bytearray()
+        buf = bytearray(min(size, 1024) if size > 0 else 1024)
+        view = memoryview(buf)
+        while size < 0 or len(out) < size:
+            want = len(buf) if size < 0 else min(len(buf), size - len(out))
+            n = self.readinto(view[:want])
+            if not n:
+                break
+            out += buf[:n]
+        return bytes(out)
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self.read()
+        return self._content
+
+    def text(self):
+        return self.content.decode("utf-8", "ignore")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        """Give the connection back; one closed before the end of the body cannot be reused."""
+        if self._conn is not None:
+            self._pool._release(self._conn, False)
+            self._conn = None
+
+
+class Pool:
+    def __init__(self, modem, max_connections=2, idle_ms=30000, timeout=30, headers=None, buffer=512,
+                 resolver=None):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART, the PDP context must be open
+            max_connections (int): Connections kept open at most, the least recently used
+                idle one is closed for a new host. A76XX runs two TLS sessions.
+            idle_ms (int): Idle connections older than this are closed instead of reused
+            timeout (int): Seconds to wait for connect and response data
+            headers (dict): Sent with every request, e.g. {"Authorization": "Bearer ..."}
+            buffer (int): Read buffer per connection for status line and headers
+            resolver (modemdns.Resolver): Host name cache for new connections
+        """
+        self.modem = modem
+        self.max_connections = max_connections
+        self.idle_ms = idle_ms
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.buffer = buffer
+        self.resolver = resolver
+        self.connections = []
+        # Counters
+        self.opened = 0
+        self.reused = 0
+        self.requests = 0
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+    def _expired(self, conn):
+        idle = self.idle_ms if conn.keep_ms is None else min(self.idle_ms, conn.keep_ms)
+        return ticks_diff(ticks_ms(), conn.last) >= idle or not conn.alive()
+
+    def _drop(self, conn):
+        conn.close()
+        if conn in self.connections:
+            self.connections.remove(conn)
+
+    def _get(self, key, fresh=False):
+        self.modem.poll()  # Pending +IPCLOSE / +CCH_PEER_CLOSED URCs
+        for conn in list(self.connections):
+            if conn.busy:
+                continue
+            if self._expired(conn):
+                self._drop(conn)
+            elif conn.key == key and not fresh:
+                conn.busy = True
+                self.reused += 1
+                return conn, True
+        while len(self.connections) >= self.max_connections:
+            idle = [conn for conn in self.connections if not conn.busy]
+            if not idle:
+                raise OSError("all connections busy")
+            self._drop(min(idle, key=lambda conn: conn.last))
+        ssl, host, port = key
+        sock = modemsock.ModemSocket(self.modem, ssl=ssl, resolver=self.resolver)
+        sock.settimeout(self.timeout)
+        sock.connect((host, port))
+        conn = _Connection(key, sock, self.buffer)
+        conn.busy = True
+        self.connections.append(conn)
+        self.opened += 1
+        return conn, False
+
+    def _release(self, conn, keep):
+        conn.busy = False
+        conn.last = ticks_ms()
+        if not keep or not conn.alive():
+            self._drop(conn)
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _encode(self, method, host, path, body, headers, json_data):
+        if json_data is not None:
+            body = json.dumps(json_data)
+            headers = dict(headers or {})
+            headers.setdefault("Content-Type", "application/json")
+        if isinstance(body, str):
+            body = body.encode()
+        lines = ["%s %s HTTP/1.1\r\nHost: %s\r\n" % (method, path, host)]
+        for source in (self.headers, headers or {}):
+            for name in source:
+                lines.append("%s: %s\r\n" % (name, source[name]))
+        if body is not None or method in ("POST", "PUT", "PATCH"):
+            lines.append("Content-Length: %d\r\n" % (len(body) if body else 0))
+        lines.append("\r\n")
+        head = "".join(lines).encode()
+        return head + body if body else head
+
+    def request(self, method, url, body=None, headers=None, json=None):
+        """
+        Send a request and read the status line and headers. Returns a Response, read
+        its body before the connection can carry the next request. A reused connection
+        the server closed in the meantime is replaced for IDEMPOTENT methods, other
+        methods raise OSError.
+        """
+        ssl, host, port, path = split_url(url)
+        data = self._encode(method, host, path, body, headers, json)
+        key = (ssl, host, port)
+        conn, reused = self._get(key)
+        while True:
+            try:
+                conn.sock.sendall(data)
+                response = Response(self, conn, method)
+                break
+            except OSError:
+                self._drop(conn)
+                if not reused or method not in IDEMPOTENT:
+                    raise
+                conn, reused = self._get(key, fresh=True)
+        conn.requests += 1
+        self.requests += 1
+        return response
+
+    def pipeline(self, requests):
+        """
+        Send requests to one host back to back on one connection and read the
+        responses in order. requests holds (method, url[, body[, headers]]) tuples.
+        Returns the responses with their bodies read. Requests the server did not
+        answer before closing the connection are sent again on a new one if all of
+        them are IDEMPOTENT, otherwise OSError is raised.
+        """
+        responses = []
+        pending = list(requests)
+        while pending:
+            encoded = []
+            key = None
+            for item in pending:
+                ssl, host, port, path = split_url(item[1])
+                if key is not None and key != (ssl, host, port):
+                    raise ValueError("pipeline needs one host")
+                key = (ssl, host, port)
+                body = item[2] if len(item) > 2 else None
+                encoded.append(self._encode(item[0], host, path, body, item[3] if len(item) > 3 else None, None))
+            conn, reused = self._get(key, fresh=bool(responses))
+            try:
+                for data in encoded:
+                    conn.sock.sendall(data)
+            except OSError:
+                self._drop(conn)
+                if not reused or not _replayable(pending):
+                    raise
+                continue
+            answered = 0
+            while pending:
+                try:
+                    conn.busy = True  # Released by the previous body, still ours
+                    response = Response(self, conn, pending[0][0])
+                except OSError:
+                    self._drop(conn)
+                    if not answered and not reused or not _replayable(pending):
+                        raise
+                    break  # Closed early: the rest goes out on a new connection
+                response.content
+                conn.requests += 1
+                self.requests += 1
+                responses.append(response)
+                answered += 1
+                pending.pop(0)
+                if conn not in self.connections:
+                    break
+            if pending and conn in self.connections:
+                self._drop(conn)
+        return responses
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Close all connections."""
+        for conn in list(self.connections):
+            self._drop(conn)
+
+    def metrics(self):
+        return {"open": len(self.connections), "opened": self.opened, "reused": self.reused,
+                "requests": self.requests}
@@ -0,0 +1,156 @@
+#  * @file      modeminfo.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Modem identity and capabilities, probed once and kept across deep sleep.
+#  *            identify() returns model, firmware revision, IMEI, ICCID, dialect and
+#  *            the GNSS modes the model supports. The record is stored in RTC memory
+#  *            (see rtcmem.py) and optionally in a flash file; on the next wake only
+#  *            IMEI and ICCID are read to check that modem and SIM are still the same,
+#  *            instead of running AT+CGMM / AT+CGMR / model checks again.
+#  *
+#  *                info = modeminfo.identify(modem)
+#  *                if not info.gnss_modes:
+#  *                    print(info.model, "has no GNSS")
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+try:
+    from ucollections import namedtuple
+except ImportError:
+    from collections import namedtuple
+
+import rtcmem
+from atmodem import AT_OK
+
+A76XX = "A76XX"
+SIM70XX = "SIM70XX"
+
+# cached is True when the record came from RTC memory / flash and was only verified
+Identity = namedtuple("Identity", ("model", "revision", "imei", "iccid", "dialect", "gnss_modes", "cached"))
+
+# GNSS modes per model prefix, first match wins. A76XX: AT+CGNSSMODE=<mode>,
+# SIM767X: AT+CGNSSMODE=<mode>, SIM70XX: index into the AT+CGNSMOD examples.
+# Models without built-in GNSS (A7670G, use examples/GPSShield) have none.
+GNSS_MODES = (
+    ("A7670G", ()),
+    ("A767", (1, 2, 3, 4)),
+    ("SIMCOM_SIM7080", (0, 1, 2)),
+    ("SIM7080", (0, 1, 2)),
+    ("SIM7070", (0, 1, 2)),
+    ("SIM7000", (0, 1, 2)),
+    ("", (1, 3, 5, 9, 13, 15)),  # SIM7670G, A7608, SIM7600
+)
+
+# Fields kept in RTC memory, all but cached (ucollections.namedtuple has no _fields)
+_FIELDS = ("model", "revision", "imei", "iccid", "dialect", "gnss_modes")
+
+
+def gnss_modes(model):
+    for prefix, modes in GNSS_MODES:
+        if model.startswith(prefix):
+            return modes
+    return ()
+
+
+def dialect(model):
+    return SIM70XX if "SIM70" in model else A76XX
+
+
+def _line(response, prefix=""):
+    # First response line starting with prefix, the prefix removed. With an empty
+    # prefix, the first line that is not the echo or a result code.
+    for line in response.split("\r\n"):
+        if not line or line == "OK" or line.startswith("AT"):
+            continue
+        if prefix:
+            if line.startswith(prefix):
+                return line[len(prefix):].strip()
+        elif line[0].isalnum():
+            return line.strip()
+    return None
+
+
+def _imei(modem):
+    status, response = modem.command("AT+CGSN")
+    return _line(response) if status == AT_OK else None
+
+
+def _iccid(modem, kind):
+    # AT+CICCID answers "+ICCID: <iccid>", AT+CCID (SIM70XX) a bare line.
+    # None while the SIM is not ready.
+    if kind == SIM70XX:
+        status, response = modem.command("AT+CCID")
+        return _line(response) if status == AT_OK else None
+    status, response = modem.command("AT+CICCID")
+    return _line(response, "+ICCID:") if status == AT_OK else None
+
+
+def _load_file(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def probe(modem):
+    """Query everything from the modem, nothing is cached."""
+    model = _line(modem.command("AT+CGMM")[1]) or ""
+    revision = _line(modem.command("AT+CGMR")[1], "+CGMR:") or ""
+    kind = dialect(model)
+    return Identity(model, revision, _imei(modem), _iccid(modem, kind), kind, gnss_modes(model), False)
+
+
+def identify(modem, path=None, refresh=False):
+    """
+    Return the Identity of the modem, from the cache when IMEI and ICCID still match.
+
+    Args:
+        modem (ATModem): Engine on the modem UART, the modem must be running
+        path (str): Optional flash file also holding the record, e.g. "/modem.json",
+            used when RTC memory was lost (power cycle). Written only on changes.
+        refresh (bool): Ignore the cache and probe the modem
+
+    The ICCID is only compared when the SIM answers, so call it once the SIM is
+    ready (modemboot.boot() waits for +CPIN: READY).
+    """
+    record = None if refresh else rtcmem.load("modem")
+    if record is None and path is not None and not refresh:
+        record = _load_file(path)
+    if record is not None:
+        try:
+            values = [record[name] for name in _FIELDS]
+            values[-1] = tuple(values[-1])  # gnss_modes, a list in JSON
+            cached = Identity(*values, True)
+        except (KeyError, TypeError):
+            cached = None
+        if cached is not None and _imei(modem) == cached.imei:
+            iccid = _iccid(modem, cached.dialect)
+            if iccid is None or iccid == cached.iccid:
+                if rtcmem.load("modem") is None:
+                    rtcmem.save("modem", record)  # Restored from flash
+                return cached
+    info = probe(modem)
+    record = {}
+    for name in _FIELDS:
+        record[name] = getattr(info, name)
+    record["gnss_modes"] = list(info.gnss_modes)
+    rtcmem.save("modem", record)
+    if path is not None:
+        with open(path, "w") as f:
+            json.dump(record, f)
+    return info
+
+
+def forget(path=None):
+    """Drop the cached record, e.g. after a modem firmware update."""
+    rtcmem.clear("modem")
+    if path is not None:
+        try:
+            import os
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,390 @@
+#  * @file      modemnet.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Non-blocking network registration and PDP attach.
+#  *            Registration follows the +CREG / +CEREG / +CGREG URCs (with a slow query
+#  *            as a safety net), the PDP context is opened as soon as the modem reports
+#  *            home or roaming registration (AT+NETOPEN on A76XX, AT+CNACT on SIM70XX)
+#  *            and its result is taken from the +NETOPEN / +APP PDP URC.
+#  *            Denied registration, failed attaches and searches without service back off
+#  *            exponentially with random jitter; after a search timeout the radio is
+#  *            switched off (AT+CFUN=0) for the backoff period to bound the energy spent
+#  *            in bad coverage.
+#  *
+#  *                net = modemnet.Registration(modem, apn=APN)
+#  *                net.start()
+#  *                while True:
+#  *                    if net.update() == modemnet.ATTACHED:
+#  *                        ...
+#  *                    modem.poll(100)
+#  *
+#  *            update() sends at most a few short commands and never waits for the
+#  *            network, wait() is the blocking form for simple examples.
+#  *
+#  *            sleep() / wake() keep the registration and the PDP context through ESP32
+#  *            deep sleep: the modem stays registered in AT+CSCLK=1 sleep with DTR held
+#  *            high, and after the wake a single query confirms the context instead of
+#  *            a new registration and attach.
+#  *
+#  *                if net.wake() == modemnet.ATTACHED:  # After machine.deepsleep()
+#  *                    ...
+#  *                net.sleep()
+#  *                machine.deepsleep(60000)
+try:
+    from random import getrandbits
+except ImportError:
+    getrandbits = None
+
+try:
+    from machine import Pin
+except ImportError:
+    Pin = None  # CPython host
+
+try:
+    import esp32
+except ImportError:
+    esp32 = None
+
+import board
+import rtcmem
+import modemboot
+from atmodem import AT_OK, ticks_ms, ticks_diff
+
+# States
+IDLE = "idle"  # start() not called yet, or stop()
+SEARCHING = "searching"  # Waiting for home / roaming registration
+ATTACHING = "attaching"  # PDP context requested, waiting for its URC
+ATTACHED = "attached"  # Registered with an active PDP context
+BACKOFF = "backoff"  # Waiting before the next attempt, radio possibly off
+
+A76XX = "A76XX"
+SIM70XX = "SIM70XX"
+
+# <stat> of +CREG / +CEREG / +CGREG
+REG_HOME = 1
+REG_DENIED = 3
+REG_ROAMING = 5
+
+_REG = (b"+CREG:", b"+CEREG:", b"+CGREG:")
+
+
+def _hold(name, value, hold):
+    # Drive a pin of utilities.CONFIG and latch it through deep sleep (or release it)
+    pin = board.get().pin(name)
+    if pin is None:
+        return
+    try:
+        pin.init(Pin.OUT, value=value, hold=hold)
+    except (TypeError, ValueError):
+        pin.init(Pin.OUT, value=value)  # Pin without hold
+
+
+def _stat(line):
+    # "+CREG: 1" (URC, n=1), "+CREG: 1,"5A1D",..." (URC, n=2) or "+CREG: 1,5" (query)
+    fields = line[line.find(":") + 1:].split(",")
+    try:
+        if len(fields) > 1 and fields[1].strip().isdigit():
+            return int(fields[1])
+        return int(fields[0])
+    except ValueError:
+        return None
+
+
+class Registration:
+    def __init__(self, modem, apn="", dialect=None, search_ms=180000, attach_ms=30000,
+                 backoff_ms=5000, backoff_max=600000, jitter=50, query_ms=15000, radio_off=True):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART
+            apn (str): APN of the operator, "" lets the network choose
+            dialect (str): A76XX or SIM70XX, by default taken from utilities.CURRENT_PLATFORM
+            search_ms (int): Time to find service before backing off
+            attach_ms (int): Time for the PDP context URC before backing off
+            backoff_ms (int): First backoff, doubled on every further failure
+            backoff_max (int): Upper bound of the backoff
+            jitter (int): Percentage randomly taken off each backoff, so that a fleet
+                losing the same cell does not retry in lock step
+            query_ms (int): Interval of the registration query while searching,
+                in case a URC was lost
+            radio_off (bool): Switch the radio off while backing off after a search timeout
+        """
+        if dialect is None:
+            dialect = board.get().dialect
+        self.modem = modem
+        self.apn = apn
+        self.dialect = dialect
+        self.search_ms = search_ms
+        self.attach_ms = attach_ms
+        self.backoff_ms = backoff_ms
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.query_ms = query_ms
+        self.radio_off = radio_off
+        self.state = IDLE
+        self.reason = None  # Why the last backoff started
+        self.reg = {}  # "+CREG" / "+CEREG" / "+CGREG" -> last <stat>
+        # Metrics
+        self.attempts = 0  # PDP attach attempts
+        self.rejects = 0  # Registrations denied by the network
+        self.failures = 0  # Failures since the last attach, sets the backoff
+        self.backoffs = 0
+        self.attaches = 0
+        self.resumes = 0  # Wakes that found the PDP context still active
+        self.register_ms = None  # Time to registration of the last cycle
+        self.attach_ms_last = None  # Time to attach of the last cycle
+        self._attach_total = 0
+        self._pdp = None  # True / False from the PDP URCs, None while unknown
+        self._since = 0  # Start of the current cycle (start() or loss of the context)
+        self._entered = 0  # Entry into the current state
+        self._queried = 0
+        self.delay = 0  # Length of the current backoff
+        self._off = False  # Radio switched off by the backoff
+
+    # ------------------------------------------------------------------
+    # URCs, only recorded here: callbacks must not send commands
+    # ------------------------------------------------------------------
+    def _on_reg(self, line):
+        stat = _stat(line)
+        if stat is not None:
+            self.reg[line[:line.find(":")]] = stat
+
+    def _on_pdp(self, line):
+        if line.startswith("+NETOPEN:"):
+            self._pdp = _stat(line) == 0
+        elif line.startswith("+APP PDP: 0,"):
+            self._pdp = line.endswith("ACTIVE") and not line.endswith("DEACTIVE")
+        else:
+            self._pdp = False  # +CIPEVENT: NETWORK CLOSED UNEXPECTEDLY, +NETCLOSE
+
+    def _pdp_urcs(self):
+        if self.dialect == SIM70XX:
+            return (b"+APP PDP: 0,",)
+        return (b"+NETOPEN:", b"+NETCLOSE:", b"+CIPEVENT:")
+
+    # ------------------------------------------------------------------
+    # State helpers
+    # ------------------------------------------------------------------
+    def registered(self):
+        for stat in self.reg.values():
+            if stat == REG_HOME or stat == REG_ROAMING:
+                return True
+        return False
+
+    def _denied(self):
+        for stat in self.reg.values():
+            if stat == REG_DENIED:
+                return True
+        return False
+
+    def _set(self, state):
+        self.state = state
+        self._entered = ticks_ms()
+
+    def _query(self):
+        # One query per registration type, also picks up a state reported before start()
+        self._queried = ticks_ms()
+        for prefix in _REG:
+            if self.modem.run(b"AT" + prefix[:-1] + b"?", 1000, None, prefix) == AT_OK:
+                stat = self.modem.field_int(1)
+                if stat is not None:
+                    self.reg[prefix[:-1].decode()] = stat
+
+    def pdp_active(self):
+        """Ask the modem whether the PDP context is active (one short query)."""
+        if self.dialect == SIM70XX:
+            if self.modem.run(b"AT+CNACT?", 1000, None, b"+CNACT: 0,") != AT_OK:
+                return False
+            return self.modem.field_int(1) == 1
+        if self.modem.run(b"AT+NETOPEN?", 1000, None, b"+NETOPEN:") != AT_OK:
+            return False
+        return self.modem.field_int(0) == 1
+
+    def _search(self):
+        if self._off:
+            self.modem.run(b"AT+CFUN=1", 10000)
+            self._off = False
+            self.reg = {}
+        self._set(SEARCHING)
+        self._query()
+
+    def _attach(self):
+        self.attempts += 1
+        if self.register_ms is None:
+            self.register_ms = ticks_diff(ticks_ms(), self._since)
+        if self.pdp_active():
+            self._attached()
+            return
+        self._pdp = None
+        command = b"AT+CNACT=0,1" if self.dialect == SIM70XX else b"AT+NETOPEN"
+        if self.modem.run(command, 5000) == AT_OK:
+            self._set(ATTACHING)
+        else:
+            self._backoff("attach error")
+
+    def _attached(self):
+        self._pdp = True
+        self.failures = 0
+        self.attaches += 1
+        self.attach_ms_last = ticks_diff(ticks_ms(), self._since)
+        self._attach_total += self.attach_ms_last
+        self._set(ATTACHED)
+
+    def _lost(self):
+        # Context or service lost: a new cycle starts
+        self._since = ticks_ms()
+        self.register_ms = None
+        self._pdp = None
+        self._search()
+
+    def _backoff(self, reason, radio_off=False):
+        delay = min(self.backoff_max, self.backoff_ms << min(self.failures, 16))
+        if self.jitter and getrandbits is not None:
+            delay -= delay * self.jitter * getrandbits(10) // 102400
+        self.failures += 1
+        self.backoffs += 1
+        self.reason = reason
+        if radio_off and self.radio_off:
+            self._off = self.modem.run(b"AT+CFUN=0", 10000) == AT_OK
+        self.delay = delay
+        self._set(BACKOFF)
+
+    # ------------------------------------------------------------------
+    # Public interface
+    # ------------------------------------------------------------------
+    def _listen(self):
+        for prefix in _REG:
+            self.modem.on_urc(prefix, self._on_reg)
+        for prefix in self._pdp_urcs():
+            self.modem.on_urc(prefix, self._on_pdp)
+
+    def start(self):
+        """Register the URC handlers, enable the registration URCs, set the APN and start searching."""
+        self._listen()
+        for prefix in _REG:
+            self.modem.run(b"AT" + prefix[:-1] + b"=1")
+        if self.dialect == SIM70XX:
+            if self.apn:
+                self.modem.command('AT+CNCFG=0,1,"%s"' % self.apn)
+        else:
+            self.modem.command('AT+CGDCONT=1,"IP","%s"' % self.apn)
+        self.failures = 0
+        self._since = ticks_ms()
+        self.register_ms = None
+        self._search()
+
+    def stop(self):
+        """Remove the URC handlers, the PDP context is left as it is."""
+        for prefix in _REG + self._pdp_urcs():
+            self.modem.remove_urc(prefix)
+        self._set(IDLE)
+
+    def sleep(self):
+        """
+        Prepare for ESP32 deep sleep without giving up the network. The modem enters
+        AT+CSCLK=1 sleep, BOARD_POWERON_PIN and MODEM_DTR_PIN are held high through deep
+        sleep and the registration state is kept in RTC memory for wake().
+        Returns False if the modem refused AT+CSCLK=1.
+        """
+        rtcmem.save("net", {"dialect": self.dialect, "reg": self.reg, "attached": self.state == ATTACHED})
+        ok = self.modem.run(b"AT+CSCLK=1") == AT_OK
+        _hold("BOARD_POWERON_PIN", 1, True)
+        _hold("MODEM_DTR_PIN", 1, True)
+        if esp32 is not None and hasattr(esp32, "gpio_deep_sleep_hold"):
+            esp32.gpio_deep_sleep_hold(True)  # ESP32: keep digital pin holds in deep sleep
+        self.stop()
+        return ok
+
+    def wake(self):
+        """
+        Resume after sleep(), or start from scratch after a cold boot. The pins are
+        released, DTR low wakes the modem and one query checks the PDP context. start()
+        is only needed when the modem was power cycled or the context is gone.
+        Returns the state, ATTACHED when the context survived.
+        """
+        self._since = ticks_ms()
+        record = rtcmem.load("net")
+        _hold("BOARD_POWERON_PIN", 1, False)
+        _hold("MODEM_DTR_PIN", 0, False)
+        boot = modemboot.boot(self.modem, wait=())
+        if record is not None:
+            rtcmem.clear("net")
+            if record.get("attached") and record.get("dialect") == self.dialect \
+                    and boot.ready and not boot.powered:
+                self._listen()
+                self.reg = record.get("reg", {})
+                if self.pdp_active():
+                    self.resumes += 1
+                    self.register_ms = 0
+                    self._attached()
+                    return self.state
+        since = self._since
+        self.start()
+        self._since = since  # Time to attach includes the modem start
+        return self.state
+
+    def update(self):
+        """Advance the state machine, returns the state. Call it regularly from the main loop."""
+        self.modem.poll(0)
+        state = self.state
+        now = ticks_ms()
+        if state == BACKOFF:
+            if ticks_diff(now, self._entered) >= self.delay:
+                self._search()
+        elif state == SEARCHING:
+            if self.registered():
+                self._attach()
+            elif self._denied():
+                self.rejects += 1
+                self.reg = {}
+                self._backoff("registration denied")
+            elif ticks_diff(now, self._entered) >= self.search_ms:
+                self._backoff("no service", True)
+            elif ticks_diff(now, self._queried) >= self.query_ms:
+                self._query()
+        elif state == ATTACHING:
+            if self._pdp:
+                self._attached()
+            elif self._pdp is False:
+                self._backoff("attach rejected")
+            elif not self.registered():
+                self._set(SEARCHING)
+            elif ticks_diff(now, self._entered) >= self.attach_ms:
+                if self.pdp_active():
+                    self._attached()
+                else:
+                    self._backoff("attach timeout")
+        elif state == ATTACHED:
+            if self._pdp is False or not self.registered():
+                self._lost()
+        return self.state
+
+    def wait(self, timeout=None, poll=100):
+        """Run update() until attached, True on success, False after timeout milliseconds."""
+        start = ticks_ms()
+        if self.state == IDLE:
+            self.start()
+        while self.update() != ATTACHED:
+            if timeout is not None and ticks_diff(ticks_ms(), start) >= timeout:
+                return False
+            wait = poll
+            if self.state == BACKOFF:
+                wait = max(1, min(1000, self.delay - ticks_diff(ticks_ms(), self._entered)))
+            self.modem.poll(wait)
+        return True
+
+    def metrics(self):
+        """State and counters, e.g. for a status report."""
+        return {
+            "state": self.state,
+            "reason": self.reason,
+            "reg": dict(self.reg),
+            "attempts": self.attempts,
+            "attaches": self.attaches,
+            "resumes": self.resumes,
+            "rejects": self.rejects,
+            "backoffs": self.backoffs,
+            "register_ms": self.register_ms,
+            "attach_ms": self.attach_ms_last,
+            "attach_avg_ms": self._attach_total // self.attaches if self.attaches else None,
+        }
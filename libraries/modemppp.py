@@ -0,0 +1,190 @@
+#  * @file      modemppp.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      PPP: the cellular link as a regular lwIP network interface.
+#  *            dial() enters data mode with ATD*99# and connect() hands the UART to
+#  *            MicroPython's network.PPP, so socket, ssl, urequests and umqtt run over
+#  *            the modem without an AT round trip per send:
+#  *
+#  *                link = modemppp.PPP(modem, apn="internet")
+#  *                if link.connect():
+#  *                    print(link.ifconfig())
+#  *                    print(urequests.get("http://httpbin.org/get").text)
+#  *                link.pause()                 # Command mode, the PDP context stays up
+#  *                print(modem.command("AT+CSQ"))
+#  *                link.resume()                # ATO, PPP negotiates again
+#  *                link.disconnect()
+#  *
+#  *            pause() drops to command mode with a DTR pulse (AT&D1) where the board
+#  *            wires MODEM_DTR_PIN, otherwise with "+++" between two guard times. Do not
+#  *            call modem commands while the link is ONLINE, the UART belongs to PPP then.
+#  *            Needs a firmware built with network.PPP (ESP32 ports have it).
+try:
+    import network
+except ImportError:
+    network = None  # CPython host
+
+import board
+from atmodem import AT_OK, AT_MATCH, ticks_ms, ticks_diff, sleep_ms
+
+# States
+COMMAND = "COMMAND"  # No data session
+ONLINE = "ONLINE"  # The UART carries PPP
+PAUSED = "PAUSED"  # Command mode, the data session is kept for resume()
+
+GUARD_MS = 1000  # Silence around "+++", the modem default (ATS12=50)
+DTR_MS = 100  # DTR high pulse leaving data mode
+
+
+def escape(modem, dtr=None):
+    """Ask the modem to leave online data mode: a DTR pulse (AT&D1) or "+++" between guard times."""
+    if dtr is not None:
+        dtr.value(1)
+        sleep_ms(DTR_MS)
+        dtr.value(0)
+    else:
+        sleep_ms(GUARD_MS)
+        modem.write(b"+++")
+        sleep_ms(GUARD_MS)
+
+
+class PPP:
+    def __init__(self, modem, apn="", cid=1, dtr=None, username="", password=""):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART, the modem must be registered
+            apn (str): APN written with AT+CGDCONT before dialing, "" keeps the modem's
+            cid (int): PDP context to dial, ATD*99# for 1, ATD*99***<cid># otherwise
+            dtr: Pin driving the modem DTR, by default MODEM_DTR_PIN of the board.
+                Without one pause() uses "+++".
+            username (str): PAP user name if the operator wants one
+            password (str): PAP password
+        """
+        self.modem = modem
+        self.apn = apn
+        self.cid = cid
+        if dtr is None:
+            dtr = board.get().pin("MODEM_DTR_PIN")
+            if dtr is not None:
+                dtr.value(0)
+        self.dtr = dtr
+        self.username = username
+        self.password = password
+        self.nic = None  # network.PPP, created by the first connect()
+        self.state = COMMAND
+        self.dials = 0
+        self.pauses = 0
+
+    def dial(self, timeout=30000):
+        """
+        Enter data mode, True once the modem answered CONNECT. A paused session is
+        resumed with ATO, otherwise the PDP context is dialed.
+        """
+        modem = self.modem
+        if self.state == ONLINE:
+            return True
+        if self.state == PAUSED:
+            if modem.run(b"ATO", timeout, terminator=b"CONNECT") == AT_MATCH:
+                self.state = ONLINE
+                return True
+            self.state = COMMAND  # NO CARRIER: the session is gone, dial again
+        if self.apn:
+            modem.run(('AT+CGDCONT=%d,"IP","%s"' % (self.cid, self.apn)).encode())
+        if self.dtr is not None:
+            self.dtr.value(0)
+            modem.run(b"AT&D1")  # DTR high: command mode, the session stays
+        number = b"ATD*99#" if self.cid == 1 else ("ATD*99***%d#" % self.cid).encode()
+        if modem.run(number, timeout, terminator=b"CONNECT") != AT_MATCH:
+            return False
+        # Bytes the modem sent right after CONNECT may be left in modem's buffer,
+        # PPP repeats its first configure request anyway.
+        self.dials += 1
+        self.state = ONLINE
+        return True
+
+    def _up(self, timeout):
+        # Start network.PPP on the UART and wait for the IP address
+        if self.nic is None:
+            self.nic = network.PPP(self.modem.uart)
+        nic = self.nic
+        nic.active(True)
+        if self.username:
+            nic.connect(authmode=nic.AUTH_PAP, username=self.username, password=self.password)
+        else:
+            nic.connect()
+        start = ticks_ms()
+        while not nic.isconnected():
+            if ticks_diff(ticks_ms(), start) >= timeout:
+                return False
+            sleep_ms(100)
+        return True
+
+    def connect(self, timeout=30000):
+        """
+        Dial (or resume a paused session) and bring network.PPP up, True once the
+        interface has an IP address. Raises OSError if the firmware has no network.PPP.
+        """
+        if network is None or not hasattr(network, "PPP"):
+            raise OSError("network.PPP is not available")
+        return self.dial(timeout) and self._up(timeout)
+
+    def pause(self, timeout=2000):
+        """
+        Return to command mode keeping the data session, True when the modem answers AT.
+        The PPP interface goes down, resume() dials it up again with ATO.
+        """
+        if self.state != ONLINE:
+            return self.state == PAUSED
+        escape(self.modem, self.dtr)
+        if self.nic is not None:
+            self.nic.active(False)
+        if not self._command_mode(timeout):
+            return False
+        self.pauses += 1
+        self.state = PAUSED
+        return True
+
+    def _command_mode(self, timeout):
+        # Clear PPP bytes the modem took as a command line, then check command mode
+        modem = self.modem
+        modem.write(b"\r")
+        sleep_ms(50)
+        modem.flush_input()
+        start = ticks_ms()
+        while modem.run(b"AT", 300) != AT_OK:
+            if ticks_diff(ticks_ms(), start) >= timeout:
+                return False
+        return True
+
+    def resume(self, timeout=30000):
+        """Go back online after pause(): ATO and PPP negotiation, True with an IP address."""
+        if self.state == ONLINE:
+            return self.isconnected()
+        return self.connect(timeout)
+
+    def disconnect(self, timeout=2000):
+        """
+        End the data session (ATH), True once the modem answered in command mode.
+        When neither the DTR pulse nor "+++" gets the modem out of data mode the
+        state stays ONLINE and False is returned, reset the modem then.
+        """
+        if self.state == ONLINE and not self.pause(timeout):
+            if self.dtr is None:
+                return False
+            # DTR was not taken (AT&D0 after a modem reset?), try "+++"
+            escape(self.modem)
+            if not self._command_mode(timeout):
+                return False
+            self.state = PAUSED
+        if self.state == PAUSED:
+            self.modem.run(b"ATH", 5000)
+        self.state = COMMAND
+        return True
+
+    def isconnected(self):
+        return self.state == ONLINE and self.nic is not None and self.nic.isconnected()
+
+    def ifconfig(self):
+        """(ip, netmask, gateway, dns) of the PPP interface, None while it is down."""
+        return self.nic.ifconfig() if self.isconnected() else None
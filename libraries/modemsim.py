@@ -0,0 +1,1573 @@
+#  * @file      modemsim.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Modem emulator for running the libraries on a Linux / macOS host (CPython).
+#  *            ModemEmulator behaves like a machine.UART connected to a SIMCom modem:
+#  *            write() takes AT commands, any() / read() / readinto() return the
+#  *            responses once their latency has passed. It speaks the two dialects
+#  *            used by the examples:
+#  *              A76XX   (A7670X / A7608X / SIM7670G / SIM7600): NETOPEN, CIPOPEN,
+#  *                      CMQTT*, HTTP*, CCERTDOWN, CGNSSINFO
+#  *              SIM70XX (SIM7000G / SIM7080G): CNACT, CAOPEN, SM*, SH*, CFSWFILE, CGNSINF
+#  *            and the common commands (CPIN, CSQ, CREG, CPSI, CBC, CMGS, CMGL ...).
+#  *            The remote side is simulated too: TCP / UDP servers echo, MQTT publishes
+#  *            to a subscribed topic come back, HTTP requests return http_body.
+#  *
+#  *            open_uart() picks the dialect from utilities.CURRENT_PLATFORM, so the
+#  *            platform string given to utilities.set_platform() selects the modem:
+#  *
+#  *                import utilities, modemsim
+#  *                utilities.set_platform("LILYGO_T_SIM7000G")
+#  *                uart = modemsim.open_uart(speed=0.1)
+#  *                modem = ATModem(uart)
+#  *
+#  *            Latency is set per command (latency / speed), URCs are injected with
+#  *            inject() / receive_sms() / set_registration(), failures with fail(),
+#  *            noise() and hang(). init(baudrate=...) changes the host side rate like
+#  *            UART.init(): while it differs from the modem rate (AT+IPR) both directions
+#  *            only carry garbage, above max_baudrate line_errors of the bytes are
+#  *            corrupted.
+#  *            AT+CMUX=0 switches to GSM 07.10 frames (basic option): every DLC opened
+#  *            with SABM is an AT port of its own, AT+CGNSSTST=1 / AT+CGNSTST=1 streams
+#  *            NMEA sentences once per second to the port that sent it.
+#  *            ATD*99# answers CONNECT and enters online data mode: the bytes written
+#  *            are collected in ppp_data (answers are queued with noise()), "+++" between
+#  *            two guard times or DTR high (dtr_pin, AT&D1) return to command mode and
+#  *            ATO resumes the session. open_pty() exposes the emulator on a pseudo
+#  *            terminal for tools that want a serial device.
+import heapq
+import os
+import random
+import time
+from collections import deque
+
+# Dialects
+A76XX = "A76XX"
+SIM70XX = "SIM70XX"
+
+# Response latency per command in milliseconds, measured on real modems on a
+# good LTE cell. Network operations report their result later with a URC, see
+# the *_URC entries.
+LATENCY = {
+    "default": 15,
+    "CPIN": 40,
+    "CSQ": 25,
+    "CPSI": 40,
+    "COPS": 200,
+    "CGATT": 200,
+    "NETOPEN_URC": 1200,
+    "CNACT_URC": 1200,
+    "CIPOPEN_URC": 700,
+    "CAOPEN": 700,
+    "CIPSEND_URC": 150,
+    "TLS": 900,  # Handshake on top of the TCP connect (CCHOPEN, CAOPEN with CASSLCFG)
+    "REMOTE": 120,  # Round trip of the simulated servers
+    "CMQTTCONNECT_URC": 1500,
+    "SMCONN": 1500,
+    "CMQTTSUB_URC": 200,
+    "CMQTTPUB_URC": 200,
+    "SMPUB": 200,
+    "SMSUB": 200,
+    "HTTPACTION_URC": 1200,
+    "SHCONN": 1200,
+    "SHREQ_URC": 900,
+    "CCERTDOWN": 100,
+    "CFSWFILE": 150,
+    "CGNSSPWR_URC": 800,
+    "CMGS": 2500,
+    "CDNSGIP_URC": 400,
+    "CFUN": 1500,
+    "CONNECT": 300,  # ATD*99# / ATO until CONNECT
+    "GUARD": 1000,  # Escape guard time around "+++" (S12)
+    "BOOT": 9000,  # Power key to RDY
+}
+
+# Boot URCs per dialect, emitted by boot()
+BOOT_URCS = {
+    A76XX: ("*ATREADY: 1", "RDY", "+CPIN: READY", "SMS DONE", "PB DONE"),
+    SIM70XX: ("RDY", "+CFUN: 1", "+CPIN: READY", "SMS Ready"),
+}
+
+MODEL = {A76XX: "A7670E-FASE", SIM70XX: "SIM7080G"}
+REVISION = {A76XX: "A7670M7_V1.11.1", SIM70XX: "1951B16SIM7080"}
+
+_ERROR = "ERROR"
+_PENDING = object()  # Handler result: the final result code follows later
+
+# GSM 07.10 basic option, see libraries/cmux.py for the host side
+_FLAG = 0xF9
+_SABM = 0x2F
+_UA = 0x63
+_DM = 0x0F
+_DISC = 0x43
+_UIH = 0xEF
+_PF = 0x10
+_MSC = 0xE0  # Modem status command type, | 0x02 (C/R) | 0x01 (EA)
+_CLD = 0xC0  # Multiplexer close down
+_N1 = 127  # Largest information field
+
+
+def _fcs(data):
+    fcs = 0xFF
+    for c in data:
+        fcs ^= c
+        for _ in range(8):
+            fcs = (fcs >> 1) ^ 0xE0 if fcs & 1 else fcs >> 1
+    return 0xFF - fcs
+
+
+def _mux_frames(dlci, control, data):
+    # data in frames of at most _N1 bytes, control frames without data get one frame
+    out = bytearray()
+    pos = 0
+    while True:
+        info = data[pos:pos + _N1]
+        head = bytes((dlci << 2 | 0x03, control, len(info) << 1 | 1))
+        out += bytes((_FLAG,)) + head + info + bytes((_fcs(head), _FLAG))
+        pos += _N1
+        if pos >= len(data):
+            return bytes(out)
+
+
+def _split(text, sep):
+    # Split text at sep outside double quotes
+    parts = []
+    quoted = False
+    start = 0
+    for i, c in enumerate(text):
+        if c == '"':
+            quoted = not quoted
+        elif c == sep and not quoted:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _args(text):
+    # Parameters of a set command with quotes removed
+    if not text:
+        return []
+    return [a.strip().strip('"') for a in _split(text, ",")]
+
+
+class ModemEmulator:
+    def __init__(self, dialect=A76XX, latency=None, speed=1.0, baudrate=115200, echo=True, booted=True):
+        """
+        Args:
+            dialect (str): A76XX or SIM70XX
+            latency (dict): Overrides for LATENCY, per command name without "AT+"
+            speed (float): Factor applied to every latency, 0 answers immediately
+            baudrate (int): Simulated UART speed, responses take 10 bits per byte
+            echo (bool): Initial ATE setting, like a modem after power on
+            booted (bool): False to start powered off, see boot()
+        """
+        self.dialect = dialect
+        self.latency = dict(LATENCY)
+        if latency:
+            self.latency.update(latency)
+        self.speed = speed
+        self.baudrate = baudrate  # Modem side, changed by AT+IPR
+        self.host_baudrate = baudrate  # Host side, changed by init()
+        self.max_baudrate = None  # Fastest rate the wiring carries without errors
+        self.line_errors = 0.02  # Fraction of bytes corrupted above max_baudrate
+        self._random = random.Random(1)
+        self.echo = echo
+        self.ready = booted
+        # Traffic counters, seen from the host side
+        self.commands = 0  # AT command lines received
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.log = None  # Set to a list to record every command line
+        # Output: (time, sequence, bytes) events move to the wire when their time has come,
+        # the wire releases them at the baud rate
+        self._queue = []
+        self._seq = 0
+        self._results = []  # (line, delay) queued by _result() for after the final result code
+        self._wire = deque()
+        self._wire_time = 0.0
+        self._ready_at = 0.0 if booted else float("inf")
+        self._rx = bytearray()
+        self._line = bytearray()
+        self._after_cr = False
+        self._data = None  # [remaining, payload, callback, ctrl_z] while in data mode
+        self._faults = []  # [prefix, response, count]
+        # Configurable remote side
+        self.http_status = 200
+        self.http_body = b"<html><body>LilyGo modem emulator</body></html>\r\n"
+        self.dns = {}  # host -> address, anything else resolves to 93.184.216.34
+        self.position = (22.543096, 114.057865, 45.0)  # lat, lon, alt of the simulated fix
+        self.fix_after = 2000  # Milliseconds after GNSS power on until the first fix
+        # Modem state
+        self.sim_ready = True
+        self.rssi = 21
+        self.reg_stat = 1  # 1 registered home, 5 roaming, 2 searching
+        self.imei = "862205059999990"
+        self.iccid = "89860012345678901234"
+        self.ip = "10.64.12.34"
+        self._reg_urc = {"CREG": 0, "CEREG": 0, "CGREG": 0}
+        self._settings = {}
+        self._attached = True
+        self._net_open = False
+        self._sockets = {}  # link -> {"type", "host", "port", "rx": bytearray}
+        self._rxget = False  # AT+CIPRXGET=1, data is buffered until read
+        self._cipmode = 0  # A76XX AT+CIPMODE, 1: AT+CIPOPEN on link 0 is transparent
+        self._stream = None  # Link of the transparent mode session
+        self._cch = {}  # session -> {"host", "port", "rx": bytearray} of the A76XX SSL client
+        self._tls = set()  # SIM70XX links with AT+CASSLCFG=<link>,"SSL",1
+        self._mqtt = {}  # client -> {"topic", "payload", "subs", "connected"}
+        self._sm = {"connected": False, "subs": set()}
+        self._http = None  # HTTPDATA / SHBOD body, HTTPACTION result
+        self._files = {}
+        self._sms = {}  # index -> [status, sender, text]
+        self._sms_format = 0
+        self._gnss_on = None  # time.monotonic() of GNSS power on
+        self._nmea = None  # [port, next time] while NMEA output is on
+        self._mux = None  # dlci -> [line, data, after_cr] in CMUX mode
+        self._mux_in = bytearray()
+        self._dlc = 0  # DLC responses go to in CMUX mode
+        self._online = None  # Callback taking the bytes written in online data mode
+        self._session = None  # Callback of the data session kept in command mode, ATO resumes it
+        self._plus = 0  # "+" received after a guard time, a possible escape
+        self._escape = None  # Time of the third "+", command mode once the guard time passed
+        self._quiet = 0.0  # Time of the last byte written in online data mode
+        self._dtr = 0
+        self._dtr_mode = 1  # AT&D
+        self.dtr_pin = _DTRPin(self)
+        self.ppp_data = bytearray()  # Everything written in PPP data mode
+        self._hung = False  # Firmware hang, see hang()
+
+    # ------------------------------------------------------------------
+    # UART interface
+    # ------------------------------------------------------------------
+    def _now(self):
+        return time.monotonic()
+
+    def _pump(self):
+        now = self._now()
+        if self._escape is not None and now - self._escape >= self._delay("GUARD") / 1000:
+            self._escape = None
+            self._plus = 0
+            self._offline("OK")
+        if self._nmea is not None and now >= self._nmea[1]:
+            self._nmea[1] = now + max(self.speed, 0.01)  # Once per second at speed 1.0
+            dlc = self._dlc
+            self._dlc = self._nmea[0]
+            self._emit(self._nmea_sentences())
+            self._dlc = dlc
+        queue = self._queue
+        wire = self._wire
+        while queue and queue[0][0] <= now:
+            start, _, data = heapq.heappop(queue)
+            wire.append([start, data])
+        while wire:
+            start, data = wire[0]
+            if start < self._wire_time:
+                start = self._wire_time  # The previous transmission is still on the wire
+            if not self.baudrate or not self.speed:
+                n = len(data)
+            else:
+                n = int((now - start) * self.baudrate / 10)
+                if n <= 0:
+                    break
+            partial = n < len(data)
+            if partial:
+                self._rx += data[:n]
+                wire[0] = [start, data[n:]]
+            else:
+                n = len(data)
+                self._rx += data
+                wire.popleft()
+            if self.baudrate and self.speed:
+                self._wire_time = start + n * 10 / self.baudrate
+            if partial:
+                break
+
+    def init(self, baudrate=None, **kwargs):
+        """machine.UART.init(), only the baud rate has an effect."""
+        if baudrate is not None:
+            self.host_baudrate = baudrate
+
+    def _errors(self):
+        # Fraction of bytes corrupted on the line
+        if self.host_baudrate != self.baudrate:
+            return 1.0
+        if self.max_baudrate is not None and self.baudrate > self.max_baudrate:
+            return self.line_errors
+        return 0.0
+
+    def _corrupt(self, data):
+        errors = self._errors()
+        if not errors:
+            return data
+        rand = self._random.random
+        return bytes(0x80 | (c ^ 0x55) if rand() < errors else c for c in data)
+
+    def any(self):
+        self._pump()
+        return len(self._rx)
+
+    def read(self, n=None):
+        self._pump()
+        if not self._rx:
+            return None
+        if n is None or n > len(self._rx):
+            n = len(self._rx)
+        data = bytes(self._rx[:n])
+        del self._rx[:n]
+        self.bytes_read += n
+        return data
+
+    def readinto(self, buf, n=None):
+        self._pump()
+        if n is None or n > len(buf):
+            n = len(buf)
+        if n > len(self._rx):
+            n = len(self._rx)
+        if not n:
+            return None
+        buf[:n] = self._rx[:n]
+        del self._rx[:n]
+        self.bytes_read += n
+        return n
+
+    def readline(self):
+        self._pump()
+        i = self._rx.find(b"\n")
+        return self.read(i + 1) if i >= 0 else None
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        data = bytes(data)
+        self.bytes_written += len(data)
+        data = self._corrupt(data)
+        if self._escape is not None:
+            self._pump()  # The guard time after "+++" may have passed
+        if self._online is not None:
+            self._online_write(data)
+        elif self._mux is not None:
+            self._mux_write(data)
+        else:
+            self._feed(data)
+        return len(data)
+
+    def _feed(self, data):
+        # Bytes of one AT port: command lines, or payload in data mode
+        for c in data:
+            if self._data is not None:
+                if c == 10 and self._after_cr:
+                    self._after_cr = False  # LF of the command line, not payload
+                    continue
+                self._after_cr = False
+                self._data_byte(c)
+            elif c == 13:
+                self._after_cr = True
+                line = bytes(self._line).decode("utf-8", "ignore").strip()
+                self._line = bytearray()
+                if line:
+                    self._command(line)
+            elif c != 10:
+                self._after_cr = False
+                self._line.append(c)
+
+    def flush(self):
+        pass
+
+    # ------------------------------------------------------------------
+    # Emitting responses
+    # ------------------------------------------------------------------
+    def _delay(self, name):
+        return self.latency.get(name, self.latency["default"]) * self.speed
+
+    def _emit(self, data, delay=0):
+        # Queue raw bytes to be sent after delay milliseconds
+        if isinstance(data, str):
+            data = data.encode()
+        if self._mux is not None and self._dlc:
+            data = _mux_frames(self._dlc, _UIH, data)
+        data = self._corrupt(data)
+        self._seq += 1
+        heapq.heappush(self._queue, (self._now() + delay / 1000, self._seq, data))
+
+    def _urc(self, line, delay=0):
+        self._emit(b"\r\n" + (line.encode() if isinstance(line, str) else line) + b"\r\n", delay)
+
+    def _result(self, line, delay=0):
+        # URC with the outcome of the running command, sent after its final result code
+        self._results.append((line, delay))
+
+    def _flush(self, delay):
+        results = self._results
+        self._results = []
+        for line, at in results:
+            self._urc(line, max(at, delay))
+
+    def inject(self, line, delay=0):
+        """Queue an unsolicited line, e.g. inject("RING") or inject("+CMTI: \\"SM\\",3", 500)."""
+        self._urc(line, delay)
+
+    def noise(self, data, delay=0):
+        """Queue raw bytes without line framing, e.g. line noise or a half line."""
+        self._emit(data, delay)
+
+    def fail(self, prefix, response=_ERROR, count=1):
+        """
+        Let the next count commands starting with prefix (e.g. "AT+NETOPEN") fail.
+        response replaces the whole answer, None sends nothing (the command times out).
+        """
+        self._faults.append([prefix.upper(), response, count])
+
+    def hang(self):
+        """Stop answering anything until the modem is powered on again with boot()."""
+        self._hung = True
+
+    def boot(self, delay=None):
+        """Power the modem on: commands are ignored until the boot URCs have been sent."""
+        self.ready = False
+        self._hung = False
+        self._queue = []
+        self._wire.clear()
+        self._line = bytearray()
+        self._data = None
+        self._mux = None
+        self._dlc = 0
+        self._nmea = None
+        self._online = None
+        self._session = None
+        self._escape = None
+        self._plus = 0
+        self.echo = True
+        self._net_open = False
+        self._sockets = {}
+        self._cipmode = 0
+        self._mqtt = {}
+        self._sm = {"connected": False, "subs": set()}
+        boot = self._delay("BOOT") if delay is None else delay
+        urcs = BOOT_URCS[self.dialect]
+        for i, line in enumerate(urcs):
+            if line == "+CPIN: READY" and not self.sim_ready:
+                line = "+CPIN: SIM PIN"
+            self._urc(line, boot + i * 300 * self.speed)
+        self._ready_at = self._now() + boot / 1000
+
+    # ------------------------------------------------------------------
+    # Command line processing
+    # ------------------------------------------------------------------
+    def _command(self, line):
+        if self._hung:
+            return
+        if not self.ready:
+            if self._now() < self._ready_at:
+                return  # Still booting, the UART is not listening yet
+            self.ready = True
+        self.commands += 1
+        if self.log is not None:
+            self.log.append(line)
+        if self.echo:
+            self._emit(line + "\r")
+        upper = line.upper()
+        for fault in self._faults:
+            if upper.startswith(fault[0]):
+                fault[2] -= 1
+                if fault[2] <= 0:
+                    self._faults.remove(fault)
+                if fault[1] is not None:
+                    self._urc(fault[1], self._delay("default"))
+                return
+        if not upper.startswith("AT"):
+            self._urc(_ERROR, self._delay("default"))
+            return
+        body = line[2:]
+        lines = []
+        delay = 0
+        for part in _split(body, ";"):
+            part = part.strip()
+            if not part:
+                continue
+            name, op, args = self._parse(part)
+            delay = max(delay, self._delay(name))
+            try:
+                result = self._dispatch(name, op, args)
+            except (ValueError, IndexError, KeyError):
+                result = _ERROR
+            if result is _PENDING:
+                for text in lines:
+                    self._urc(text, delay)
+                self._flush(delay)
+                return
+            if result == _ERROR or (isinstance(result, str) and result.startswith("+CME ERROR")):
+                self._urc(result, delay)
+                self._flush(delay)
+                return
+            if isinstance(result, str):
+                lines.append(result)
+            elif result:
+                lines.extend(result)
+        for text in lines:
+            self._urc(text, delay)
+        self._urc("OK", delay)
+        self._flush(delay)  # +CIPCLOSE: 0,0, +NETOPEN: 0 ... follow the OK like on the modem
+
+    def _parse(self, part):
+        # "+CREG?" -> ("CREG", "?", []), "E0" -> ("E", "=", ["0"]), "+X=1,2" -> ("X", "=", ["1", "2"])
+        if part[0] in "+*$":
+            part = part[1:]
+            for i, c in enumerate(part):
+                if c in "=?":
+                    name = part[:i].upper()
+                    rest = part[i:]
+                    if rest == "?":
+                        return name, "?", []
+                    if rest == "=?":
+                        return name, "=?", []
+                    return name, "=", _args(rest[1:])
+            return part.upper(), "", []
+        if part[0] == "&":
+            return part[:2].upper(), "=", _args(part[2:])
+        name = part[0].upper()
+        if name == "D":
+            return "D", "=", [part[1:]]
+        return name, "=" if len(part) > 1 else "", _args(part[1:])
+
+    def _dispatch(self, name, op, args):
+        handler = getattr(self, "_at_" + name.lower().replace("&", "and_"), None)
+        if handler is None:
+            handler = getattr(self, "_%s_%s" % (self.dialect.lower(), name.lower()), None)
+        if handler is None:
+            if op == "=" or op == "=?" or op == "":
+                # Configuration commands the emulator does not model answer OK once set
+                if name in _ACCEPTED:
+                    if args:
+                        self._settings[name] = args
+                    return None
+            if op == "?" and name in self._settings:
+                return "+%s: %s" % (name, ",".join(self._settings[name]))
+            return _ERROR
+        return handler(op, args)
+
+    # ------------------------------------------------------------------
+    # CMUX
+    # ------------------------------------------------------------------
+    def _at_cmux(self, op, args):
+        if op == "?":
+            return "+CMUX: 0"
+        self._urc("OK", self._delay("default"))  # Still a plain line
+        self._mux = {}
+        self._mux_in = bytearray()
+        self._dlc = 0
+        return _PENDING
+
+    def _mux_reply(self, dlci, control, info=b""):
+        dlc = self._dlc
+        self._dlc = 0
+        self._emit(_mux_frames(dlci, control, info), self._delay("default"))
+        self._dlc = dlc
+
+    def _mux_write(self, data):
+        buf = self._mux_in
+        buf += data
+        while True:
+            start = buf.find(bytes((_FLAG,)))
+            if start < 0:
+                del buf[:]
+                return
+            del buf[:start]
+            while len(buf) > 1 and buf[1] == _FLAG:
+                del buf[0]  # Closing flag of the previous frame
+            if len(buf) < 4:
+                return
+            head = 2
+            length = buf[3] >> 1
+            if not buf[3] & 1:
+                if len(buf) < 5:
+                    return
+                length |= buf[4] << 7
+                head = 3
+            end = 2 + head + length  # Index of the FCS
+            if len(buf) < end + 1:
+                return
+            if _fcs(bytes(buf[1:2 + head])) != buf[end]:
+                del buf[0]  # Corrupted, resynchronise on the next flag
+                continue
+            self._mux_frame(buf[1] >> 2, buf[2] & ~_PF, bytes(buf[2 + head:end]))
+            del buf[:end + 1]
+            if self._mux is None:
+                return
+
+    def _mux_frame(self, dlci, control, info):
+        mux = self._mux
+        if control == _SABM:
+            if dlci:
+                mux[dlci] = [bytearray(), None, False]
+            self._mux_reply(dlci, _UA | _PF)
+        elif control == _DISC:
+            self._mux_reply(dlci, _UA | _PF)
+            mux.pop(dlci, None)
+            if dlci == 0:
+                self._mux = None
+        elif control != _UIH:
+            pass
+        elif dlci == 0:
+            kind = info[0] & ~0x03 if info else 0
+            if kind == _MSC and info[0] & 0x02:
+                self._mux_reply(0, _UIH, bytes((_MSC | 0x01,)) + info[1:])  # Response
+            elif kind == _CLD:
+                self._mux_reply(0, _UIH, bytes((_CLD | 0x01, 0x01)))
+                self._mux = None
+                self._dlc = 0
+        elif dlci in mux:
+            state = mux[dlci]
+            self._line, self._data, self._after_cr = state
+            self._dlc = dlci
+            self._feed(info)
+            if self._mux is not None and dlci in self._mux:
+                state[:] = [self._line, self._data, self._after_cr]
+            self._line, self._data, self._after_cr = bytearray(), None, False
+        else:
+            self._mux_reply(dlci, _DM | _PF)
+
+    # ------------------------------------------------------------------
+    # Online data mode (ATD*99#, ATO, +++, DTR)
+    # ------------------------------------------------------------------
+    def _connect(self, callback):
+        self._online = callback
+        self._session = None
+        self._plus = 0
+        self._quiet = self._now()
+        self._urc("CONNECT %d" % self.baudrate, self._delay("CONNECT"))
+        return _PENDING
+
+    def _offline(self, result):
+        # Back to command mode, the session is kept for ATO
+        if self._online is not None:
+            self._session = self._online
+            self._online = None
+            self._urc(result, self._delay("default"))
+
+    def _online_write(self, data):
+        now = self._now()
+        plus = self._plus + len(data)
+        if not data.strip(b"+") and plus <= 3 and (self._plus or now - self._quiet >= self._delay("GUARD") / 1000):
+            self._plus = plus
+            if plus == 3:
+                self._escape = now
+            return
+        if self._plus:
+            data = b"+" * self._plus + data  # No escape, the "+" were data
+            self._plus = 0
+            self._escape = None
+        self._quiet = now
+        self._online(data)
+
+    def _ppp(self, data):
+        self.ppp_data += data
+
+    def _at_d(self, op, args):
+        if not args[0].startswith("*99"):
+            return _ERROR  # Voice calls are not simulated
+        if not self._attached or self.reg_stat not in (1, 5):
+            self._urc("NO CARRIER", self._delay("CONNECT"))
+            return _PENDING
+        return self._connect(self._ppp)
+
+    def _at_o(self, op, args):
+        if self._session is None:
+            self._urc("NO CARRIER", self._delay("default"))
+            return _PENDING
+        return self._connect(self._session)
+
+    def _at_h(self, op, args):
+        self._session = None
+
+    def _at_and_d(self, op, args):
+        self._dtr_mode = int(args[0]) if args and args[0] else 0
+
+    def dtr(self, level):
+        """
+        Drive the DTR input. With AT&D1 a high level (DTR off) leaves online data mode
+        and keeps the session, with AT&D2 it ends the session.
+        """
+        if level and not self._dtr and self._online is not None:
+            if self._dtr_mode == 1:
+                self._offline("OK")
+            elif self._dtr_mode == 2:
+                self._online = None
+                self._urc("NO CARRIER", self._delay("default"))
+        self._dtr = level
+
+    # ------------------------------------------------------------------
+    # NMEA output (AT+CGNSSTST / AT+CGNSTST)
+    # ------------------------------------------------------------------
+    def _at_cgnsstst(self, op, args):
+        if op == "?":
+            return "+CGNSSTST: %d" % (self._nmea is not None)
+        self._nmea = [self._dlc, self._now() + max(self.speed, 0.01)] if args[0] == "1" else None
+
+    def _at_cgnstst(self, op, args):
+        result = self._at_cgnsstst(op, args)
+        return result.replace("CGNSSTST", "CGNSTST") if result else result
+
+    def _nmea_sentences(self):
+        t = time.gmtime()
+        stamp = "%02d%02d%02d.00" % (t.tm_hour, t.tm_min, t.tm_sec)
+        if self._gnss_fixed():
+            lat, lon, alt = self.position
+            la = "%02d%08.5f,%s" % (int(abs(lat)), (abs(lat) % 1) * 60, "N" if lat >= 0 else "S")
+            lo = "%03d%08.5f,%s" % (int(abs(lon)), (abs(lon) % 1) * 60, "E" if lon >= 0 else "W")
+            bodies = ("GPGGA,%s,%s,%s,1,09,0.9,%.1f,M,0.0,M,," % (stamp, la, lo, alt),
+                      "GPRMC,%s,A,%s,%s,0.0,0.0,%02d%02d%02d,,,A" % (stamp, la, lo, t.tm_mday, t.tm_mon, t.tm_year % 100))
+        else:
+            bodies = ("GPGGA,%s,,,,,0,00,99.9,,,,,," % stamp,
+                      "GPRMC,%s,V,,,,,,,%02d%02d%02d,,,N" % (stamp, t.tm_mday, t.tm_mon, t.tm_year % 100))
+        out = ""
+        for body in bodies:
+            check = 0
+            for c in body:
+                check ^= ord(c)
+            out += "$%s*%02X\r\n" % (body, check)
+        return out
+
+    # ------------------------------------------------------------------
+    # Data mode
+    # ------------------------------------------------------------------
+    def _expect(self, length, callback, prompt=">", ctrl_z=False):
+        # Switch to data mode: length bytes (or up to Ctrl+Z) are passed to callback(payload)
+        self._data = [length, bytearray(), callback, ctrl_z]
+        if prompt == ">":
+            self._emit(b"\r\n> ", self._delay("default"))
+        else:
+            self._urc(prompt, self._delay("default"))
+        return _PENDING
+
+    def _data_byte(self, c):
+        data = self._data
+        if data[3]:
+            if c == 0x1A:
+                self._finish_data()
+                return
+            if c == 0x1B:  # ESC aborts
+                self._data = None
+                self._urc("OK", self._delay("default"))
+                return
+        data[1].append(c)
+        if not data[3] and len(data[1]) >= data[0]:
+            self._finish_data()
+
+    def _finish_data(self):
+        _, payload, callback, _ = self._data
+        self._data = None
+        result = callback(bytes(payload))
+        delay = self._delay("default")
+        if result is _PENDING:
+            self._flush(delay)
+            return
+        if result == _ERROR:
+            self._urc(_ERROR, delay)
+            self._flush(delay)
+            return
+        if isinstance(result, str):
+            result = [result]
+        for text in result or ():
+            self._urc(text, delay)
+        self._urc("OK", delay)
+        self._flush(delay)
+
+    # ------------------------------------------------------------------
+    # Basic and common commands
+    # ------------------------------------------------------------------
+    def _at_e(self, op, args):
+        self.echo = bool(args) and args[0] == "1"
+
+    def _at_i(self, op, args):
+        return ["Manufacturer: SIMCOM INCORPORATED", "Model: " + MODEL[self.dialect],
+                "Revision: " + REVISION[self.dialect], "IMEI: " + self.imei]
+
+    def _at_simcomati(self, op, args):
+        return self._at_i(op, args)
+
+    def _at_cgmm(self, op, args):
+        return MODEL[self.dialect]
+
+    def _at_cgmr(self, op, args):
+        return "+CGMR: " + REVISION[self.dialect]
+
+    def _at_cgsn(self, op, args):
+        return self.imei
+
+    def _at_gsn(self, op, args):
+        return self.imei
+
+    def _at_ciccid(self, op, args):
+        return "+ICCID: " + self.iccid
+
+    def _at_ccid(self, op, args):
+        return self.iccid
+
+    def _at_cpin(self, op, args):
+        return "+CPIN: READY" if self.sim_ready else "+CME ERROR: 10"
+
+    def _at_csq(self, op, args):
+        return "+CSQ: %d,99" % self.rssi
+
+    def _registration(self, name, op, args):
+        if op == "=":
+            self._reg_urc[name] = int(args[0])
+            return None
+        return "+%s: %d,%d" % (name, self._reg_urc[name], self.reg_stat)
+
+    def _at_creg(self, op, args):
+        return self._registration("CREG", op, args)
+
+    def _at_cereg(self, op, args):
+        return self._registration("CEREG", op, args)
+
+    def _at_cgreg(self, op, args):
+        return self._registration("CGREG", op, args)
+
+    def set_registration(self, stat, delay=0):
+        """Change the registration state, with URCs for every +CxREG enabled by AT+CxREG=n."""
+        self.reg_stat = stat
+        for name, n in self._reg_urc.items():
+            if n:
+                self._urc("+%s: %d" % (name, stat), delay)
+
+    def _at_cops(self, op, args):
+        if op == "?":
+            return '+COPS: 0,0,"CHINA MOBILE",7'
+        return None
+
+    def _at_cpsi(self, op, args):
+        if self.reg_stat not in (1, 5):
+            return "+CPSI: NO SERVICE,Online"
+        system = "LTE CAT-M1" if self.dialect == SIM70XX else "LTE"
+        return "+CPSI: %s,Online,460-00,0x5A1D,154897425,188,EUTRAN-BAND3,1825,5,5,-94,-1010,-724,14" % system
+
+    def _at_cbc(self, op, args):
+        if self.dialect == SIM70XX:
+            return "+CBC: 0,85,4123"
+        return "+CBC: 4.123V"
+
+    def _at_cfun(self, op, args):
+        if op == "?":
+            return "+CFUN: 1"
+        if len(args) > 1 and args[1] == "1":
+            self.boot(self._delay("CFUN"))
+        return None
+
+    def _at_cgatt(self, op, args):
+        if op == "?":
+            return "+CGATT: %d" % self._attached
+        self._attached = args[0] == "1"
+        return None
+
+    def _at_cgpaddr(self, op, args):
+        return "+CGPADDR: 1,%s" % self.ip
+
+    def _at_ipr(self, op, args):
+        if op == "?":
+            return "+IPR: %d" % self.baudrate
+        rate = int(args[0])
+        # The response still goes out at the old rate, then the UART switches
+        self._urc("OK", self._delay("default"))
+        self.baudrate = rate
+        return _PENDING
+
+    def _at_cpowd(self, op, args):
+        self.ready = False
+        self._ready_at = float("inf")
+        self._urc("NORMAL POWER DOWN", self._delay("default"))
+        return _PENDING
+
+    def _at_cdnsgip(self, op, args):
+        host = args[0]
+        address = self.dns.get(host, "93.184.216.34")
+        self._urc('+CDNSGIP: 1,"%s","%s"' % (host, address), self._delay("CDNSGIP_URC"))
+        return None
+
+    # ------------------------------------------------------------------
+    # SMS
+    # ------------------------------------------------------------------
+    def _at_cmgf(self, op, args):
+        if op == "?":
+            return "+CMGF: %d" % self._sms_format
+        self._sms_format = int(args[0])
+
+    def receive_sms(self, sender, text, delay=0):
+        """Store an incoming message and send +CMTI for it."""
+        index = max(self._sms) + 1 if self._sms else 0
+        self._sms[index] = ["REC UNREAD", sender, text]
+        self._urc('+CMTI: "SM",%d' % index, delay)
+        return index
+
+    def _at_cmgs(self, op, args):
+        def sent(payload):
+            self._mr = getattr(self, "_mr", 0) + 1
+            self._urc("+CMGS: %d" % self._mr, self._delay("CMGS"))
+            self._urc("OK", self._delay("CMGS"))
+            return _PENDING
+        return self._expect(0, sent, ctrl_z=True)
+
+    def _sms_header(self, index, entry, listing):
+        status, sender, _ = entry
+        stamp = '"24/10/18,12:00:00+32"'
+        if listing:
+            return '+CMGL: %d,"%s","%s","",%s' % (index, status, sender, stamp)
+        return '+CMGR: "%s","%s","",%s' % (status, sender, stamp)
+
+    def _at_cmgl(self, op, args):
+        want = args[0] if args else "REC UNREAD"
+        lines = []
+        for index in sorted(self._sms):
+            entry = self._sms[index]
+            if want in ("ALL", "4") or want == entry[0]:
+                lines.append(self._sms_header(index, entry, True))
+                lines.append(entry[2])
+                if entry[0] == "REC UNREAD":
+                    entry[0] = "REC READ"
+        return lines
+
+    def _at_cmgr(self, op, args):
+        entry = self._sms.get(int(args[0]))
+        if entry is None:
+            return "+CMS ERROR: 321"
+        lines = [self._sms_header(int(args[0]), entry, False), entry[2]]
+        entry[0] = "REC READ"
+        return lines
+
+    def _at_cmgd(self, op, args):
+        if len(args) > 1 and args[1] == "4":
+            self._sms = {}
+        else:
+            self._sms.pop(int(args[0]), None)
+
+    # ------------------------------------------------------------------
+    # Remote side
+    # ------------------------------------------------------------------
+    def remote(self, host, port, data):
+        """Answer of the simulated server, override to model another protocol. Echoes by default."""
+        return data
+
+    # ------------------------------------------------------------------
+    # A76XX: network and sockets
+    # ------------------------------------------------------------------
+    def _a76xx_netopen(self, op, args):
+        if op == "?":
+            return "+NETOPEN: %d" % self._net_open
+        if self._net_open:
+            self._urc("+IP ERROR: Network is already opened", self._delay("default"))
+            return _ERROR
+        self._net_open = True
+        self._result("+NETOPEN: 0", self._delay("NETOPEN_URC"))
+        return None
+
+    def _a76xx_netclose(self, op, args):
+        self._net_open = False
+        self._sockets = {}
+        self._cipmode = 0
+        self._result("+NETCLOSE: 0", self._delay("default"))
+        return None
+
+    def _a76xx_ipaddr(self, op, args):
+        return "+IPADDR: " + self.ip if self._net_open else _ERROR
+
+    def _a76xx_cipopen(self, op, args):
+        if op == "?":
+            sockets = self._sockets
+            return ['+CIPOPEN: %d,"%s","%s",%d,-1' % (link, sockets[link]["type"], sockets[link]["host"],
+                                                      sockets[link]["port"]) if link in sockets
+                    else "+CIPOPEN: %d" % link for link in range(10)]
+        link = int(args[0])
+        if link in self._sockets or not self._net_open:
+            self._result("+CIPOPEN: %d,4" % link, self._delay("default"))
+            return None
+        port = int(args[3]) if len(args) > 3 and args[3] else 0  # UDP: "UDP",,,<local port>
+        self._sockets[link] = {"type": args[1], "host": args[2], "port": port, "rx": bytearray(), "datagrams": []}
+        if self._cipmode:
+            if link != 0:
+                del self._sockets[link]
+                return _ERROR
+            self._stream = link
+            return self._connect(lambda data: self._transparent(link, data))
+        self._result("+CIPOPEN: %d,0" % link, self._delay("CIPOPEN_URC"))
+        return None
+
+    def _transparent(self, link, data):
+        # Transparent mode: the server's answer goes to the UART as it is
+        sock = self._sockets[link]
+        answer = self.remote(sock["host"], sock["port"], bytes(data))
+        if answer:
+            self._emit(answer, self._delay("REMOTE"))
+
+    def _a76xx_cipsend(self, op, args):
+        link = int(args[0])
+        sock = self._sockets.get(link)
+        if sock is None:
+            return _ERROR
+        length = int(args[1]) if len(args) > 1 and args[1] else 0
+        if sock["type"] == "UDP" and len(args) > 3:
+            sock["host"], sock["port"] = args[2], int(args[3])  # Destination of this datagram
+
+        def sent(payload):
+            self._result("+CIPSEND: %d,%d,%d" % (link, len(payload), len(payload)), self._delay("CIPSEND_URC"))
+            answer = self.remote(sock["host"], sock["port"], payload)
+            if answer:
+                self._deliver(link, answer, self._delay("CIPSEND_URC") + self._delay("REMOTE"))
+            return None
+        return self._expect(length, sent, ctrl_z=length == 0)
+
+    def _deliver(self, link, data, delay):
+        sock = self._sockets[link]
+        if self._rxget:
+            was_empty = not sock["rx"]
+            sock["rx"] += data
+            if sock["type"] == "UDP":
+                sock["datagrams"].append([len(data), "%s:%d" % (sock["host"], sock["port"])])
+            if was_empty:
+                self._urc("+CIPRXGET: 1,%d" % link, delay)
+        elif sock["type"] == "UDP":
+            self._urc(b"+RECEIVE,%d,%d,\"%s\",%d\r\n" % (link, len(data), sock["host"].encode(), sock["port"]) + data, delay)
+        else:
+            self._urc(b"+RECEIVE,%d,%d\r\n" % (link, len(data)) + data, delay)
+
+    def remote_close(self, link, delay=0):
+        """The server closes link (or CCH session), received data stays readable."""
+        if link == self._stream and (self._online is not None or self._session is not None):
+            # Transparent mode ends with CLOSED, the modem is in command mode then
+            del self._sockets[link]
+            self._stream = self._online = self._session = None
+            self._urc("CLOSED", delay)
+        elif link in self._sockets:
+            self._urc("+CASTATE: %d,0" % link if self.dialect == SIM70XX else "+IPCLOSE: %d,1" % link, delay)
+        elif link in self._cch:
+            self._urc("+CCH_PEER_CLOSED: %d" % link, delay)
+
+    def _a76xx_ciprxget(self, op, args):
+        if op == "?":
+            return "+CIPRXGET: %d" % self._rxget
+        mode = int(args[0])
+        if mode in (0, 1):
+            self._rxget = mode == 1
+            return None
+        sock = self._sockets.get(int(args[1]))
+        if sock is None:
+            return _ERROR
+        rx = sock["rx"]
+        if mode == 4:
+            return "+CIPRXGET: 4,%s,%d" % (args[1], len(rx))
+        n = min(int(args[2]) if len(args) > 2 else 1500, len(rx))
+        source = b""
+        if sock["type"] == "UDP" and sock["datagrams"]:
+            # One datagram per read, the rest of a longer one is dropped
+            length, address = sock["datagrams"].pop(0)
+            n = min(n, length)
+            del rx[n:length]
+            source = b"," + address.encode()
+        data = bytes(rx[:n])
+        del rx[:n]
+        if mode == 3:
+            data = data.hex().upper().encode()
+        # The data follows its header line without framing, OK comes after it
+        self._emit(b"\r\n+CIPRXGET: %d,%s,%d,%d%s\r\n" % (mode, args[1].encode(), n, len(rx), source) + data,
+                   self._delay("default"))
+        return None
+
+    def _a76xx_cipclose(self, op, args):
+        if op == "?":
+            return "+CIPCLOSE: " + ",".join("1" if link in self._sockets else "0" for link in range(10))
+        link = int(args[0])
+        if self._sockets.pop(link, None) is None:
+            return _ERROR
+        if self._cipmode:
+            self._session = None
+        self._result("+CIPCLOSE: %d,0" % link, self._delay("default"))
+        return None
+
+    def _a76xx_cipmode(self, op, args):
+        if op == "?":
+            return "+CIPMODE: %d" % self._cipmode
+        if self._net_open:
+            return _ERROR  # Only before AT+NETOPEN
+        self._cipmode = int(args[0])
+
+    # ------------------------------------------------------------------
+    # A76XX: SSL client (CCH*), manual receive with AT+CCHSET=1,1
+    # ------------------------------------------------------------------
+    def _a76xx_cchstart(self, op, args):
+        self._result("+CCHSTART: 0", self._delay("default"))
+
+    def _a76xx_cchstop(self, op, args):
+        self._cch = {}
+        self._result("+CCHSTOP: 0", self._delay("default"))
+
+    def _a76xx_cchopen(self, op, args):
+        session = int(args[0])
+        if session not in (0, 1) or session in self._cch or not self._net_open:
+            self._result("+CCHOPEN: %d,4" % session, self._delay("default"))
+            return None
+        self._cch[session] = {"host": args[1], "port": int(args[2]), "rx": bytearray()}
+        self._result("+CCHOPEN: %d,0" % session, self._delay("CIPOPEN_URC") + self._delay("TLS"))
+        return None
+
+    def _a76xx_cchsend(self, op, args):
+        session = int(args[0])
+        sock = self._cch.get(session)
+        if sock is None:
+            return _ERROR
+
+        def sent(payload):
+            self._result("+CCHSEND: %d,0" % session, self._delay("CIPSEND_URC"))
+            answer = self.remote(sock["host"], sock["port"], payload)
+            if answer:
+                was_empty = not sock["rx"]
+                sock["rx"] += answer
+                if was_empty:
+                    self._urc("+CCHEVENT: %d,RECV EVENT" % session, self._delay("CIPSEND_URC") + self._delay("REMOTE"))
+            return None
+        return self._expect(int(args[1]), sent)
+
+    def _a76xx_cchrecv(self, op, args):
+        if op == "?":
+            return "+CCHRECV: LEN,%d,%d" % tuple(len(self._cch[s]["rx"]) if s in self._cch else 0 for s in (0, 1))
+        session = int(args[0])
+        sock = self._cch.get(session)
+        if sock is None:
+            return _ERROR
+        rx = sock["rx"]
+        n = min(int(args[1]) if len(args) > 1 else 1024, len(rx))
+        data = bytes(rx[:n])
+        del rx[:n]
+        # OK first, then the data block and the end of the read
+        delay = self._delay("default")
+        self._urc("OK", delay)
+        if n:
+            self._emit(b"\r\n+CCHRECV: DATA,%d,%d\r\n" % (session, n) + data, delay)
+        self._urc("+CCHRECV: %d,0" % session, delay)
+        return _PENDING
+
+    def _a76xx_cchclose(self, op, args):
+        session = int(args[0])
+        if self._cch.pop(session, None) is None:
+            return _ERROR
+        self._result("+CCHCLOSE: %d,0" % session, self._delay("default"))
+        return None
+
+    # ------------------------------------------------------------------
+    # A76XX: MQTT
+    # ------------------------------------------------------------------
+    def _client(self, index):
+        return self._mqtt.setdefault(int(index), {"topic": b"", "payload": b"", "subs": set(), "connected": False})
+
+    def _a76xx_cmqttstart(self, op, args):
+        self._result("+CMQTTSTART: 0", self._delay("default"))
+
+    def _a76xx_cmqttstop(self, op, args):
+        self._mqtt = {}
+        self._result("+CMQTTSTOP: 0", self._delay("default"))
+
+    def _a76xx_cmqttaccq(self, op, args):
+        self._client(args[0])
+
+    def _a76xx_cmqttrel(self, op, args):
+        self._mqtt.pop(int(args[0]), None)
+
+    def _a76xx_cmqttconnect(self, op, args):
+        if op == "?":
+            return ['+CMQTTCONNECT: %d,"tcp://broker",60,1' % index
+                    for index, client in sorted(self._mqtt.items()) if client["connected"]]
+        self._client(args[0])["connected"] = True
+        self._result("+CMQTTCONNECT: %s,0" % args[0], self._delay("CMQTTCONNECT_URC"))
+
+    def _a76xx_cmqttdisc(self, op, args):
+        if op == "?":
+            return ["+CMQTTDISC: %d,%d" % (i, not self._mqtt.get(i, {}).get("connected")) for i in range(2)]
+        self._client(args[0])["connected"] = False
+        self._result("+CMQTTDISC: %s,0" % args[0], self._delay("default"))
+
+    def _a76xx_cmqttsub(self, op, args):
+        client = self._client(args[0])
+        index = args[0]
+
+        def topic(payload):
+            client["subs"].add(payload)
+            self._result("+CMQTTSUB: %s,0" % index, self._delay("CMQTTSUB_URC"))
+            return None
+        if len(args) >= 3:
+            return self._expect(int(args[1]), topic)
+        # AT+CMQTTSUB=<index> subscribes the topics given with AT+CMQTTSUBTOPIC
+        self._result("+CMQTTSUB: %s,0" % index, self._delay("CMQTTSUB_URC"))
+        return None
+
+    def _a76xx_cmqttsubtopic(self, op, args):
+        client = self._client(args[0])
+
+        def topic(payload):
+            client["subs"].add(payload)
+            return None
+        return self._expect(int(args[1]), topic)
+
+    def _a76xx_cmqtttopic(self, op, args):
+        client = self._client(args[0])
+
+        def topic(payload):
+            client["topic"] = payload
+            return None
+        return self._expect(int(args[1]), topic)
+
+    def _a76xx_cmqttpayload(self, op, args):
+        client = self._client(args[0])
+
+        def payload(data):
+            client["payload"] = data
+            return None
+        return self._expect(int(args[1]), payload)
+
+    def _a76xx_cmqttpub(self, op, args):
+        index = int(args[0])
+        client = self._client(index)
+        if not client["connected"]:
+            return _ERROR
+        delay = self._delay("CMQTTPUB_URC")
+        self._result("+CMQTTPUB: %d,0" % index, delay)
+        topic, payload = client["topic"], client["payload"]
+        if topic in client["subs"]:
+            delay += self._delay("REMOTE")
+            self.mqtt_message(topic, payload, delay, index)
+
+    def mqtt_message(self, topic, payload, delay=0, client=0):
+        """Deliver a message from the broker to a subscribed client."""
+        if isinstance(topic, str):
+            topic = topic.encode()
+        if isinstance(payload, str):
+            payload = payload.encode()
+        if self.dialect == SIM70XX:
+            self._urc(b'+SMSUB: "%s","%s"' % (topic, payload), delay)
+            return
+        self._urc("+CMQTTRXSTART: %d,%d,%d" % (client, len(topic), len(payload)), delay)
+        self._urc(b"+CMQTTRXTOPIC: %d,%d\r\n" % (client, len(topic)) + topic, delay)
+        self._urc(b"+CMQTTRXPAYLOAD: %d,%d\r\n" % (client, len(payload)) + payload, delay)
+        self._urc("+CMQTTRXEND: %d" % client, delay)
+
+    def _a76xx_ccertdown(self, op, args):
+        name = args[0]
+
+        def cert(payload):
+            self._files[name] = payload
+            return None
+        return self._expect(int(args[1]), cert)
+
+    # ------------------------------------------------------------------
+    # A76XX: HTTP(S)
+    # ------------------------------------------------------------------
+    def _a76xx_httpinit(self, op, args):
+        if self._http is not None:
+            return _ERROR
+        self._http = {"body": b"", "length": 0, "read": 0}
+
+    def _a76xx_httpterm(self, op, args):
+        if self._http is None:
+            return _ERROR
+        self._http = None
+
+    def _a76xx_httppara(self, op, args):
+        if self._http is None:
+            return _ERROR
+        self._http[args[0]] = args[1] if len(args) > 1 else ""
+
+    def _a76xx_httpdata(self, op, args):
+        if self._http is None:
+            return _ERROR
+
+        def body(payload):
+            self._http["body"] = payload
+            return None
+        return self._expect(int(args[0]), body, prompt="DOWNLOAD")
+
+    def _a76xx_httpaction(self, op, args):
+        if self._http is None or not self._net_open and not self._attached:
+            return _ERROR
+        method = int(args[0])
+        self._http["length"] = len(self.http_body)
+        self._http["read"] = 0
+        self._urc("+HTTPACTION: %d,%d,%d" % (method, self.http_status, len(self.http_body)),
+                  self._delay("HTTPACTION_URC"))
+
+    def _a76xx_httphead(self, op, args):
+        head = "HTTP/1.1 %d OK\r\nContent-Length: %d\r\n" % (self.http_status, len(self.http_body))
+        return ["+HTTPHEAD: %d" % len(head), head.rstrip("\r\n")]
+
+    def _a76xx_httpread(self, op, args):
+        if self._http is None:
+            return _ERROR
+        if op == "?":
+            return "+HTTPREAD: LEN,%d" % (self._http["length"] - self._http["read"])
+        start = int(args[0]) if args else self._http["read"]
+        size = int(args[1]) if len(args) > 1 else len(self.http_body)
+        data = self.http_body[start:start + size]
+        self._http["read"] = start + len(data)
+        delay = self._delay("default")
+        self._urc("OK", delay)
+        self._emit(b"\r\n+HTTPREAD: %d\r\n" % len(data) + data + b"\r\n+HTTPREAD: 0\r\n", delay)
+        return _PENDING
+
+    # ------------------------------------------------------------------
+    # A76XX: GNSS
+    # ------------------------------------------------------------------
+    def _gnss_fixed(self):
+        return self._gnss_on is not None and (self._now() - self._gnss_on) * 1000 >= self.fix_after * self.speed
+
+    def _a76xx_cgnsspwr(self, op, args):
+        if op == "?":
+            return "+CGNSSPWR: %d" % (self._gnss_on is not None)
+        if args[0] == "1":
+            self._gnss_on = self._now()
+            self._result("+CGNSSPWR: READY!", self._delay("CGNSSPWR_URC"))
+        else:
+            self._gnss_on = None
+
+    def _a76xx_cgnssinfo(self, op, args):
+        if not self._gnss_fixed():
+            return "+CGNSSINFO: ,,,,,,,,"
+        lat, lon, alt = self.position
+        t = time.gmtime()
+        return "+CGNSSINFO: 3,09,05,02,04,%.6f,%s,%.6f,%s,%02d%02d%02d,%02d%02d%02d.00,%.1f,0.0,,1.4,0.9,1.1,20" % (
+            abs(lat), "N" if lat >= 0 else "S", abs(lon), "E" if lon >= 0 else "W",
+            t.tm_mday, t.tm_mon, t.tm_year % 100, t.tm_hour, t.tm_min, t.tm_sec, alt)
+
+    # ------------------------------------------------------------------
+    # SIM70XX: network, sockets, DNS
+    # ------------------------------------------------------------------
+    def _sim70xx_cnact(self, op, args):
+        if op == "?":
+            return ['+CNACT: 0,%d,"%s"' % (self._net_open, self.ip if self._net_open else "0.0.0.0"),
+                    '+CNACT: 1,0,"0.0.0.0"']
+        active = args[1] == "1"
+        if active and not self._net_open:
+            self._result("+APP PDP: %s,ACTIVE" % args[0], self._delay("CNACT_URC"))
+        elif not active and self._net_open:
+            self._result("+APP PDP: %s,DEACTIVE" % args[0], self._delay("default"))
+        self._net_open = active
+
+    def _sim70xx_casslcfg(self, op, args):
+        if args[1].upper() == "SSL":
+            if args[2] == "1":
+                self._tls.add(int(args[0]))
+            else:
+                self._tls.discard(int(args[0]))
+
+    def _sim70xx_caopen(self, op, args):
+        link = int(args[0])
+        if link in self._sockets or not self._net_open:
+            return ["+CAOPEN: %d,1" % link]
+        self._sockets[link] = {"type": args[2], "host": args[3], "port": int(args[4]), "rx": bytearray()}
+        if link in self._tls:
+            delay = self._delay("CAOPEN") + self._delay("TLS")
+            self._urc("+CAOPEN: %d,0" % link, delay)
+            self._urc("OK", delay)
+            return _PENDING
+        return "+CAOPEN: %d,0" % link
+
+    def _sim70xx_casend(self, op, args):
+        link = int(args[0])
+        sock = self._sockets.get(link)
+        if sock is None:
+            return _ERROR
+
+        def sent(payload):
+            answer = self.remote(sock["host"], sock["port"], payload)
+            if answer:
+                was_empty = not sock["rx"]
+                sock["rx"] += answer
+                if was_empty:
+                    self._urc("+CADATAIND: %d" % link, self._delay("REMOTE"))
+            return None
+        return self._expect(int(args[1]), sent)
+
+    def _sim70xx_carecv(self, op, args):
+        sock = self._sockets.get(int(args[0]))
+        if sock is None:
+            return _ERROR
+        rx = sock["rx"]
+        n = min(int(args[1]), len(rx))
+        data = bytes(rx[:n])
+        del rx[:n]
+        self._emit(b"\r\n+CARECV: %d," % n + data + b"\r\n", self._delay("default"))
+        return None
+
+    def _sim70xx_caclose(self, op, args):
+        if self._sockets.pop(int(args[0]), None) is None:
+            return _ERROR
+        self._session = None
+
+    def _sim70xx_caswitch(self, op, args):
+        link = int(args[0])
+        if link not in self._sockets or args[1] != "1":
+            return _ERROR
+        self._stream = link
+        return self._connect(lambda data: self._transparent(link, data))
+
+    def _sim70xx_castate(self, op, args):
+        return ["+CASTATE: %d,1" % link for link in sorted(self._sockets)]
+
+    # ------------------------------------------------------------------
+    # SIM70XX: MQTT, files, HTTP(S)
+    # ------------------------------------------------------------------
+    def _sim70xx_smconn(self, op, args):
+        if not self._net_open:
+            return _ERROR
+        self._sm["connected"] = True
+
+    def _sim70xx_smdisc(self, op, args):
+        self._sm["connected"] = False
+
+    def _sim70xx_smstate(self, op, args):
+        return "+SMSTATE: %d" % self._sm["connected"]
+
+    def _sim70xx_smsub(self, op, args):
+        if not self._sm["connected"]:
+            return _ERROR
+        self._sm["subs"].add(args[0].encode())
+
+    def _sim70xx_smunsub(self, op, args):
+        self._sm["subs"].discard(args[0].encode())
+
+    def _sim70xx_smpub(self, op, args):
+        if not self._sm["connected"]:
+            return _ERROR
+        topic = args[0].encode()
+
+        def message(payload):
+            if topic in self._sm["subs"]:
+                self.mqtt_message(topic, payload, self._delay("SMPUB") + self._delay("REMOTE"))
+            return None
+        return self._expect(int(args[1]), message)
+
+    def _sim70xx_cfswfile(self, op, args):
+        name = args[1]
+
+        def content(payload):
+            self._files[name] = payload
+            return None
+        return self._expect(int(args[3]), content, prompt="DOWNLOAD")
+
+    def _sim70xx_shconn(self, op, args):
+        if not self._net_open:
+            return _ERROR
+        self._http = {"body": b"", "length": 0, "read": 0}
+
+    def _sim70xx_shdisc(self, op, args):
+        self._http = None
+
+    def _sim70xx_shstate(self, op, args):
+        return "+SHSTATE: %d" % (self._http is not None)
+
+    def _sim70xx_shbod(self, op, args):
+        if self._http is None:
+            return _ERROR
+
+        def body(payload):
+            self._http["body"] = payload
+            return None
+        return self._expect(int(args[0]), body)
+
+    def _sim70xx_shreq(self, op, args):
+        if self._http is None:
+            return _ERROR
+        methods = {"1": "GET", "2": "PUT", "3": "POST", "4": "PATCH", "5": "HEAD"}
+        self._http["length"] = len(self.http_body)
+        self._urc('+SHREQ: "%s",%d,%d' % (methods.get(args[1], "GET"), self.http_status, len(self.http_body)),
+                  self._delay("SHREQ_URC"))
+
+    def _sim70xx_shread(self, op, args):
+        if self._http is None:
+            return _ERROR
+        start = int(args[0])
+        data = self.http_body[start:start + int(args[1])]
+        delay = self._delay("default")
+        self._urc("OK", delay)
+        self._emit(b"\r\n+SHREAD: %d\r\n" % len(data) + data + b"\r\n", delay)
+        return _PENDING
+
+    # ------------------------------------------------------------------
+    # SIM70XX: GNSS
+    # ------------------------------------------------------------------
+    def _sim70xx_cgnspwr(self, op, args):
+        if op == "?":
+            return "+CGNSPWR: %d" % (self._gnss_on is not None)
+        self._gnss_on = self._now() if args[0] == "1" else None
+
+    def _sim70xx_cgnsinf(self, op, args):
+        if self._gnss_on is None:
+            return "+CGNSINF: 0,,,,,,,,,,,,,,,,,,,,"
+        if not self._gnss_fixed():
+            return "+CGNSINF: 1,0,,,,,,,,,,,,,,,,,,,"
+        lat, lon, alt = self.position
+        t = time.gmtime()
+        return "+CGNSINF: 1,1,%04d%02d%02d%02d%02d%02d.000,%.6f,%.6f,%.3f,0.00,0.0,1,,0.9,1.4,1.1,,14,9,5,,36,,"% (
+            t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec, lat, lon, alt)
+
+
+# Configuration commands answered with OK (their value is kept for the "?" form)
+_ACCEPTED = {
+    "CGDCONT", "CNMP", "CMNB", "CNMI", "CSCS", "CSCLK", "IFC", "CMEE", "CLIP", "CTZU", "CPMS",
+    "CMQTTCFG", "CMQTTSSLCFG", "CMQTTWILLTOPIC", "CMQTTWILLMSG", "CSSLCFG", "CCERTLIST", "CCERTDELE",
+    "CGNSSMODE", "CVAUXS", "CGPSHOT", "CGNSSIPR", "CGNSSPORTSWITCH", "CGNSSNMEA",
+    "SMCONF", "SMSSL", "CFSINIT", "CFSTERM", "SHCONF", "SHSSL", "SHCHEAD", "SHAHEAD", "SHPARA",
+    "CGPIO", "CGNSMOD", "CGNSCOLD", "CGNSHOT", "CNCFG", "CACID", "CASSLCFG", "CACFG", "CIPCCFG",
+    "CIPTIMEOUT", "CIPHEAD", "CIPSRIP", "CDNSCFG", "CPSMS", "CEDRXS", "CREBOOT", "CTTS", "CTTSPARAM",
+    "CLBS", "CLBSCFG", "CCHSET", "CCHSSLCFG", "W", "V", "Q", "X",
+}
+
+
+class _DTRPin:
+    # machine.Pin stand in wired to the DTR input of the emulator
+    def __init__(self, emulator):
+        self._emulator = emulator
+
+    def value(self, level=None):
+        if level is None:
+            return self._emulator._dtr
+        self._emulator.dtr(1 if level else 0)
+
+
+def open_uart(platform=None, **kwargs):
+    """
+    Return a ModemEmulator speaking the dialect of platform, by default the platform
+    selected with utilities.set_platform(). Keyword arguments go to ModemEmulator.
+    """
+    import utilities
+    if platform is None:
+        platform = utilities.CURRENT_PLATFORM
+    dialect = SIM70XX if platform in utilities.SIM70XX_PLATFORMS else A76XX
+    return ModemEmulator(dialect, **kwargs)
+
+
+def open_pty(emulator, interval=0.001):
+    """
+    Serve emulator on a pseudo terminal (POSIX only) from a background thread and
+    return the device path, e.g. for pyserial or a terminal program.
+    """
+    import threading
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    os.set_blocking(master, False)
+
+    def serve():
+        while True:
+            try:
+                data = os.read(master, 1024)
+            except BlockingIOError:
+                data = b""
+            except OSError:
+                return
+            if data:
+                emulator.write(data)
+            out = emulator.read()
+            if out:
+                os.write(master, out)
+            if not data and not out:
+                time.sleep(interval)
+    threading.Thread(target=serve, daemon=True).start()
+    return os.ttyname(slave)
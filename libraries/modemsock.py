@@ -0,0 +1,545 @@
+#  * @file      modemsock.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Socket-style TCP clients on the modem's own IP stack.
+#  *            Every ModemSocket owns one link id (AT+CIPOPEN on A76XX, AT+CAOPEN on
+#  *            SIM70XX), so up to MAX_LINKS connections carry traffic at the same time.
+#  *            Received data stays in the modem (AT+CIPRXGET=1) until recv() fetches it;
+#  *            the +CIPRXGET: 1 / +CADATAIND URCs mark a socket readable, select() waits
+#  *            on them instead of polling every link:
+#  *
+#  *                socks = []
+#  *                for host in ("example.com", "httpbin.org"):
+#  *                    s = modemsock.ModemSocket(modem)
+#  *                    s.connect((host, 80))
+#  *                    s.sendall(b"GET / HTTP/1.0\r\nHost: %s\r\n\r\n" % host.encode())
+#  *                    socks.append(s)
+#  *                while socks:
+#  *                    readable, _ = modemsock.select(socks, timeout=10000)
+#  *                    for s in readable:
+#  *                        data = s.recv(1024)
+#  *                        if not data:           # Closed by the server
+#  *                            s.close()
+#  *                            socks.remove(s)
+#  *
+#  *            connect_ex() with settimeout(0) only starts the connection, select()
+#  *            reports the socket writable once the modem accepted or refused it.
+#  *            ModemSocket(modem, ssl=True) runs TLS in the modem with SNI: AT+CASSLCFG
+#  *            on the same SIM70XX links, the SSL client (AT+CCHOPEN / CCHSEND / CCHRECV,
+#  *            two sessions) on A76XX.
+#  *            ModemSocket(modem, resolver=modemdns.Resolver(modem)) connects to the cached
+#  *            address of the name, SNI stays the name. The A76XX SSL client takes SNI
+#  *            from the host it connects to, so it keeps connecting by name.
+#  *
+#  *            ModemSocket(modem, "UDP") sends datagrams with sendto() / sendmany() and
+#  *            reads them with recvfrom(), one datagram per call on A76XX:
+#  *
+#  *                udp = modemsock.ModemSocket(modem, "UDP")
+#  *                udp.sendmany([b"t=21.5", b"h=40", b"v=3.9"], ("203.0.113.7", 3336))
+#  *                data, address = udp.recvfrom(512)
+#  *
+#  *            A76XX opens one link for any destination (AT+CIPOPEN=<link>,"UDP",,,<port>)
+#  *            and addresses each AT+CIPSEND, use IP addresses there. SIM70XX binds the
+#  *            link to one destination, sendto() another one reopens it. AT+CARECV
+#  *            keeps no datagram boundaries and +CADATAIND has no length, so a SIM70XX
+#  *            recvfrom() returns all datagrams queued since the last read as one
+#  *            bytes (b"a", b"bb", b"ccc" come back as b"abbccc"); delimit or
+#  *            length-prefix payloads that may arrive back to back.
+#  *            Timeouts are in seconds like socket, select() takes milliseconds like
+#  *            modem.poll(). The PDP context must be open (modemnet.Registration).
+import errno
+
+import board
+from atmodem import AT_OK, AT_MATCH, ticks_ms, ticks_diff
+
+A76XX = board.A76XX
+SIM70XX = board.SIM70XX
+
+MAX_LINKS = {A76XX: 10, SIM70XX: 13}
+MAX_SESSIONS = 2  # A76XX SSL client
+MSS = 1460  # Largest payload of one AT+CIPSEND / AT+CASEND / AT+CIPRXGET=2 / AT+CARECV, largest datagram
+
+# States
+CLOSED = "closed"
+CONNECTING = "connecting"  # AT+CIPOPEN / AT+CCHOPEN accepted, waiting for the URC
+CONNECTED = "connected"
+
+
+def _link(line):
+    # Link id of "+CIPRXGET: 1,<link>", "+CIPOPEN: <link>,<err>", "+CADATAIND: <link>" ...
+    fields = line[line.find(":") + 1:].split(",")
+    try:
+        return int(fields[1] if line.startswith("+CIPRXGET") else fields[0])
+    except (ValueError, IndexError):
+        return None
+
+
+def _result(line):
+    # Second field of "+CIPOPEN: <link>,<err>" / "+CASTATE: <link>,<state>"
+    fields = line[line.find(":") + 1:].split(",")
+    try:
+        return int(fields[1])
+    except (ValueError, IndexError):
+        return None
+
+
+class _Links:
+    """The sockets of one modem by link id, kept up to date by the socket URCs."""
+
+    def __init__(self, modem, dialect):
+        self.modem = modem
+        self.dialect = dialect
+        self.sockets = [None] * MAX_LINKS[dialect]
+        self.sessions = [None] * MAX_SESSIONS  # A76XX SSL client
+        self.rxget = False  # AT+CIPRXGET=1 sent
+        self.cch = False  # A76XX SSL client started
+        self.tls = set()  # SIM70XX links configured for SSL
+        if dialect == SIM70XX:
+            modem.on_urc(b"+CADATAIND:", self._on_data)
+            modem.on_urc(b"+CASTATE:", self._on_state)
+        else:
+            modem.on_urc(b"+CIPRXGET: 1,", self._on_data)
+            modem.on_urc(b"+CIPOPEN:", self._on_open)
+            modem.on_urc(b"+IPCLOSE:", self._on_closed)
+            modem.on_urc(b"+CCHEVENT:", self._on_data)
+            modem.on_urc(b"+CCHOPEN:", self._on_open)
+            modem.on_urc(b"+CCH_PEER_CLOSED:", self._on_closed)
+
+    def _socket(self, line):
+        link = _link(line)
+        table = self.sessions if line.startswith("+CCH") else self.sockets
+        if link is None or not 0 <= link < len(table):
+            return None
+        return table[link]
+
+    # URCs, only recorded here: callbacks must not send commands
+    def _on_data(self, line):
+        sock = self._socket(line)
+        if sock is not None:
+            sock.readable = True
+
+    def _on_open(self, line):
+        sock = self._socket(line)
+        if sock is not None and sock.state == CONNECTING:
+            sock.error = _result(line)
+            sock.state = CONNECTED if sock.error == 0 else CLOSED
+
+    def _on_closed(self, line):
+        sock = self._socket(line)
+        if sock is not None:
+            sock.peer_closed = True
+
+    def _on_state(self, line):
+        if _result(line) == 0:
+            self._on_closed(line)
+
+    def feed(self, response):
+        # Replay result lines the modem sent while a command of the same name ran
+        for line in response.split("\r\n"):
+            if line.startswith("+CIPOPEN:") or line.startswith("+CCHOPEN:"):
+                self._on_open(line)
+
+    def allocate(self, sock):
+        table = self.sessions if sock.cch else self.sockets
+        for link in range(len(table)):
+            if table[link] is None:
+                table[link] = sock
+                return link
+        raise OSError(errno.ENOBUFS)  # All links in use
+
+    def release(self, sock):
+        table = self.sessions if sock.cch else self.sockets
+        if table[sock.link] is sock:
+            table[sock.link] = None
+
+
+_registry = {}
+
+
+def links(modem, dialect=None):
+    """The link table of modem, created on first use."""
+    table = _registry.get(modem)
+    if table is None:
+        table = _Links(modem, dialect or board.get().dialect)
+        _registry[modem] = table
+    return table
+
+
+class ModemSocket:
+    def __init__(self, modem, kind="TCP", dialect=None, ssl=False, resolver=None, server_hostname=None):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART
+            kind (str): "TCP" or "UDP"
+            dialect (str): A76XX or SIM70XX, by default taken from utilities.CURRENT_PLATFORM
+            ssl (bool): TLS in the modem, the host name of connect() is sent as SNI
+            resolver (modemdns.Resolver): Connect to cached addresses instead of names
+            server_hostname (str): SNI when connect() is given an IP address
+        """
+        self.modem = modem
+        self.kind = kind
+        self.ssl = ssl
+        self.resolver = resolver
+        self.server_hostname = server_hostname
+        self.links = links(modem, dialect)
+        self.sim70xx = self.links.dialect == SIM70XX
+        self.cch = ssl and not self.sim70xx  # A76XX SSL client session instead of a link
+        self.link = None  # Link id (session id for cch) while connecting / connected
+        self.state = CLOSED
+        self.error = None  # Result code of the open, 0 on success
+        self.readable = False  # The modem holds received data
+        self.peer_closed = False
+        self.timeout = None  # Milliseconds, None blocks, 0 does not wait
+        self.address = None  # connect() address, the destination of a SIM70XX UDP link
+        self.udp = kind == "UDP"
+        self.port = 0  # Local UDP port on A76XX, see bind()
+
+    def settimeout(self, seconds):
+        """Upper bound for connect() / recv() / send() like socket.settimeout(), None blocks."""
+        self.timeout = None if seconds is None else int(seconds * 1000)
+
+    def setblocking(self, flag):
+        self.settimeout(None if flag else 0)
+
+    def bind(self, address):
+        """Local UDP port of the A76XX link, ("", port); the modem picks one by default."""
+        self.port = address[1]
+
+    def _wait(self, done, timeout):
+        # Poll the modem for URCs until done() or timeout milliseconds (None: no limit)
+        start = ticks_ms()
+        while not done():
+            if timeout is not None and ticks_diff(ticks_ms(), start) >= timeout:
+                return False
+            self.modem.poll(10)
+        return True
+
+    # ------------------------------------------------------------------
+    # Connection
+    # ------------------------------------------------------------------
+    def _resolve(self, host):
+        # The A76XX SSL client takes SNI from the host of AT+CCHOPEN, it keeps the name
+        if self.resolver is None or self.cch:
+            return host
+        return self.resolver.resolve(host) or host
+
+    def _open(self, host, port, name):
+        modem = self.modem
+        table = self.links
+        if self.sim70xx:
+            if self.ssl:
+                modem.run(('AT+CSSLCFG="sni",0,"%s"' % name).encode())
+                modem.run(b'AT+CASSLCFG=%d,"crindex",0' % self.link)
+            if self.ssl or self.link in table.tls:
+                modem.run(b'AT+CASSLCFG=%d,"SSL",%d' % (self.link, self.ssl))
+                if self.ssl:
+                    table.tls.add(self.link)
+                else:
+                    table.tls.discard(self.link)
+            # +CAOPEN: <link>,<result> arrives before the OK
+            command = 'AT+CAOPEN=%d,0,"%s","%s",%d' % (self.link, self.kind, host, port)
+            if modem.run(command.encode(), 30000, capture=b"+CAOPEN:") != AT_OK:
+                return -1
+            self.error = modem.field_int(1, -1)
+            self.state = CONNECTED if self.error == 0 else CLOSED
+            return self.error
+        if self.cch:
+            if not table.cch:
+                # Send results as URCs, received data stays in the modem until AT+CCHRECV
+                modem.run(b"AT+CCHSET=1,1")
+                table.cch = modem.run(b"AT+CCHSTART", 5000, terminator=b"+CCHSTART:") == AT_MATCH
+            modem.run(b'AT+CSSLCFG="enableSNI",0,1')
+            modem.run(b"AT+CCHSSLCFG=%d,0" % self.link)
+            command = 'AT+CCHOPEN=%d,"%s",%d,2' % (self.link, name, port)
+        else:
+            if not table.rxget:
+                table.rxget = modem.run(b"AT+CIPRXGET=1") == AT_OK
+            if self.udp:
+                command = 'AT+CIPOPEN=%d,"UDP",,,%d' % (self.link, self.port)  # Any destination
+            else:
+                command = 'AT+CIPOPEN=%d,"%s","%s",%d' % (self.link, self.kind, host, port)
+        # The result is a URC after the OK. One for another link that arrives while this
+        # command runs is taken as its response, feed() hands it on.
+        self.state = CONNECTING
+        status, response = modem.command(command, 5000)
+        table.feed(response)
+        if status != AT_OK:
+            self.state = CLOSED
+            return -1
+        return 0
+
+    def connect_ex(self, address):
+        """
+        Connect to (host, port), host may be a name. Returns 0 once connected,
+        errno.EINPROGRESS with a timeout of 0 (see select()), otherwise an errno.
+        With a resolver the modem connects to the cached address of the name and
+        drops it again if that fails, the retry lets the modem resolve the name.
+        """
+        if self.state != CLOSED:
+            return errno.EALREADY
+        host, port = address
+        self.address = address
+        name = self.server_hostname or host
+        target = self._resolve(name if self.cch else host)
+        error = self._connect(target, port, name)
+        if error and error != errno.EINPROGRESS and target != host and not self.cch:
+            self.resolver.invalidate(host)  # The cached address may be stale
+            error = self._connect(host, port, name)
+        return error
+
+    def _connect(self, host, port, name):
+        self.link = self.links.allocate(self)
+        self.readable = False
+        self.peer_closed = False
+        self.error = None
+        if self._open(host, port, name) < 0 or self.state == CLOSED:
+            self._release()
+            return errno.ECONNREFUSED
+        if self.state == CONNECTING:
+            if self.timeout == 0:
+                return errno.EINPROGRESS
+            self._wait(lambda: self.state != CONNECTING, 30000 if self.timeout is None else self.timeout)
+        if self.state == CONNECTED:
+            return 0
+        if self.state == CONNECTING:
+            self.close()
+            return errno.ETIMEDOUT
+        self._release()
+        return errno.ECONNREFUSED
+
+    def connect(self, address):
+        """Connect to (host, port), raises OSError on failure."""
+        error = self.connect_ex(address)
+        if error:
+            raise OSError(error)
+
+    def _release(self):
+        self.links.release(self)
+        self.state = CLOSED
+        self.link = None
+
+    def close(self):
+        """Close the link and give its id back, safe to call twice."""
+        if self.link is None:
+            return
+        modem = self.modem
+        if self.sim70xx:
+            modem.run(b"AT+CACLOSE=%d" % self.link, 5000)
+        elif self.cch:
+            if self.state == CONNECTED or self.state == CONNECTING:
+                modem.command("AT+CCHCLOSE=%d" % self.link, 5000, "+CCHCLOSE: %d," % self.link)
+        elif self.state == CONNECTED or self.state == CONNECTING:
+            # ERROR when the peer closed first, the link is free then as well
+            modem.command("AT+CIPCLOSE=%d" % self.link, 5000, "+CIPCLOSE: %d," % self.link)
+        self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    def _command(self, n, address):
+        # Send command for n bytes, A76XX UDP names the destination of every datagram
+        if self.sim70xx:
+            return "AT+CASEND=%d,%d" % (self.link, n)
+        if self.cch:
+            return "AT+CCHSEND=%d,%d" % (self.link, n)
+        if self.udp:
+            return 'AT+CIPSEND=%d,%d,"%s",%d' % (self.link, n, self._resolve(address[0]), address[1])
+        return "AT+CIPSEND=%d,%d" % (self.link, n)
+
+    def send(self, data, address=None):
+        """Send up to MSS bytes of data, returns the number of bytes the modem accepted."""
+        if self.state != CONNECTED or self.peer_closed:
+            raise OSError(errno.ENOTCONN)
+        n = len(data)
+        if n > MSS:
+            if self.udp:
+                raise ValueError("datagram longer than MSS")
+            data = memoryview(data)[:MSS]
+            n = MSS
+        timeout = 10000 if not self.timeout else self.timeout
+        command = self._command(n, address or self.address)
+        if self.sim70xx:
+            status, response = self.modem.send_data(command, data, timeout)
+            if status != AT_OK:
+                raise OSError(errno.EIO)
+            return n
+        if self.cch:
+            # +CCHSEND: <session>,<err>
+            status, response = self.modem.send_data(command, data, timeout, "+CCHSEND: %d," % self.link)
+            if status != AT_MATCH or not response.endswith(",0"):
+                raise OSError(errno.EIO)
+            return n
+        # +CIPSEND: <link>,<requested>,<confirmed>, confirmed is -1 on a broken link
+        status, response = self.modem.send_data(command, data, timeout, "+CIPSEND: %d," % self.link)
+        if status != AT_MATCH:
+            raise OSError(errno.EIO)
+        confirmed = int(response[response.rfind(",") + 1:])
+        if confirmed < 0:
+            self.peer_closed = True
+            raise OSError(errno.ECONNRESET)
+        return confirmed
+
+    def sendall(self, data):
+        view = memoryview(data)
+        pos = 0
+        while pos < len(view):
+            pos += self.send(view[pos:])
+
+    write = sendall
+
+    # ------------------------------------------------------------------
+    # Datagrams
+    # ------------------------------------------------------------------
+    def _target(self, address):
+        # Open the UDP link on first use, a SIM70XX link is reopened for another destination
+        if self.state == CONNECTED and self.sim70xx and address != self.address:
+            self.close()
+        if self.state != CONNECTED:
+            self.connect(address)
+
+    def sendto(self, data, address):
+        """Send one datagram of at most MSS bytes to (host, port), returns its length."""
+        self._target(address)
+        return self.send(data, address)
+
+    def sendmany(self, datagrams, address=None, timeout=10000):
+        """
+        Send several datagrams in one round: each AT+CIPSEND only waits for its OK, the
+        +CIPSEND confirmations are collected at the end instead of one round trip per
+        datagram. Items are bytes for address (default: the connect() address) or
+        (bytes, address) tuples. Returns the number of datagrams the modem confirmed.
+        """
+        address = address or self.address
+        if self.sim70xx:
+            # AT+CASEND answers after the data was taken, nothing to collect
+            count = 0
+            for item in datagrams:
+                data, target = item if isinstance(item, tuple) else (item, address)
+                self.sendto(data, target)
+                count += 1
+            return count
+        self._target(address)
+        modem = self.modem
+        # The prefix names the link, so it stays a URC while the next AT+CIPSEND runs
+        prefix = b"+CIPSEND: %d," % self.link
+        confirmed = [0, 0]  # Answered, accepted
+
+        def record(line):
+            confirmed[0] += 1
+            if not line.endswith(",-1"):
+                confirmed[1] += 1
+
+        modem.on_urc(prefix, record)
+        try:
+            sent = 0
+            for item in datagrams:
+                data, target = item if isinstance(item, tuple) else (item, address)
+                if len(data) > MSS:
+                    raise ValueError("datagram longer than MSS")
+                status, response = modem.send_data(self._command(len(data), target), data, timeout)
+                if status != AT_OK:
+                    break
+                sent += 1
+            start = ticks_ms()
+            while confirmed[0] < sent and ticks_diff(ticks_ms(), start) < timeout:
+                modem.poll(10)
+        finally:
+            modem.remove_urc(prefix)
+        return confirmed[1]
+
+    def recvfrom(self, bufsize):
+        """
+        One datagram of at most bufsize bytes and the (host, port) it came from.
+        SIM70XX: the datagrams queued in the modem, joined, as AT+CARECV has no boundaries.
+        """
+        buf = bytearray(min(bufsize, MSS))
+        count = self.recv_into(buf)
+        return bytes(buf[:count]), self._source()
+
+    def _source(self):
+        # A76XX: +CIPRXGET: 2,<link>,<length>,<left>,<host>:<port> for UDP, if the firmware sends it
+        if not self.sim70xx and self.udp:
+            field = self.modem.field(4)
+            if field and ":" in field:
+                host, port = field.rsplit(":", 1)
+                return host, int(port)
+        return self.address
+
+    def _ready(self):
+        return self.readable or self.peer_closed or self.state != CONNECTED
+
+    def recv_into(self, buf, nbytes=0):
+        """
+        Read up to nbytes (len(buf) when 0) received bytes into buf, returns the count.
+        Waits for data up to the timeout; 0 means the peer closed and nothing is left.
+        """
+        if self.link is None:
+            raise OSError(errno.ENOTCONN)
+        if nbytes <= 0 or nbytes > len(buf):
+            nbytes = len(buf)
+        if nbytes > MSS:
+            nbytes = MSS
+        modem = self.modem
+        view = memoryview(buf)[:nbytes]
+        while True:
+            if not self._ready() and not self._wait(self._ready, self.timeout):
+                raise OSError(errno.ETIMEDOUT if self.timeout else errno.EAGAIN)
+            if not self.readable:
+                return 0
+            if self.sim70xx:
+                count = modem.run_into(b"AT+CARECV=%d,%d" % (self.link, nbytes), b"+CARECV:", view, inline=True)
+                # +CADATAIND only comes for an empty buffer: keep reading while chunks are full
+                self.readable = count == nbytes
+            elif self.cch:
+                # OK, +CCHRECV: DATA,<session>,<length>, the data, +CCHRECV: <session>,<err>
+                count = modem.run_into(b"AT+CCHRECV=%d,%d" % (self.link, nbytes), b"+CCHRECV:", view, field=2,
+                                       end=b"+CCHRECV: %d," % self.link)
+                self.readable = count == nbytes
+            else:
+                # +CIPRXGET: 2,<link>,<length>,<left> then the data
+                count = modem.run_into(b"AT+CIPRXGET=2,%d,%d" % (self.link, nbytes), b"+CIPRXGET: 2,", view,
+                                       field=2)
+                self.readable = count > 0 and modem.field_int(3, 0) > 0
+            if count < 0:
+                raise OSError(errno.EIO)
+            if count or self.peer_closed:
+                return count
+            # Nothing when the data of a URC was read already: wait for the next one
+            if self.timeout == 0:
+                raise OSError(errno.EAGAIN)
+
+    def recv(self, bufsize):
+        """Up to bufsize received bytes, b"" once the peer closed and nothing is left."""
+        buf = bytearray(min(bufsize, MSS))
+        count = self.recv_into(buf)
+        return bytes(buf[:count])
+
+    read = recv
+
+
+def select(rlist, wlist=(), timeout=None):
+    """
+    Wait until sockets of rlist have data (or were closed by the peer) or sockets of
+    wlist finished connecting. Returns (readable, writable), both empty after timeout
+    milliseconds; None waits without limit.
+    """
+    sockets = rlist or wlist
+    if not sockets:
+        return [], []
+    modem = sockets[0].modem
+    start = ticks_ms()
+    while True:
+        readable = [sock for sock in rlist if sock._ready()]
+        writable = [sock for sock in wlist if sock.state != CONNECTING]
+        if readable or writable:
+            return readable, writable
+        if timeout is not None and ticks_diff(ticks_ms(), start) >= timeout:
+            return readable, writable
+        modem.poll(10)
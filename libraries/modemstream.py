@@ -0,0 +1,226 @@
+#  * @file      modemstream.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Transparent TCP: one connection with the UART as its data path.
+#  *            In command mode every chunk costs AT+CIPSEND, a prompt and an OK; in
+#  *            transparent mode (AT+CIPMODE=1 on A76XX, AT+CASWITCH on SIM70XX) the
+#  *            bytes written to the UART go straight to the socket, so uploads run at
+#  *            the UART rate. Stream has write() / readinto() / read() like a file:
+#  *
+#  *                stream = modemstream.Stream(modem)
+#  *                if stream.open("example.com", 8080):
+#  *                    with open("/sd/image.jpg", "rb") as f:
+#  *                        stream.write_data(f)      # Streamed in chunks, paced if needed
+#  *                    reply = stream.read(64)
+#  *                    stream.pause()                # Command mode, the connection stays
+#  *                    print(modem.command("AT+CSQ"))
+#  *                    stream.resume()               # ATO
+#  *                    stream.close()
+#  *
+#  *            pause() uses a DTR pulse (AT&D1) where the board wires MODEM_DTR_PIN,
+#  *            otherwise "+++" between two guard times, see modemppp.escape(). Do not
+#  *            call modem commands while the stream is ONLINE. A76XX only allows
+#  *            transparent mode on link 0 and needs AT+CIPMODE=1 before AT+NETOPEN,
+#  *            open() closes and reopens the network for it when necessary. That
+#  *            drops every other A76XX link, and close() reopens the network with
+#  *            AT+CIPMODE=0 again so that modemsock sockets work afterwards.
+import board
+from atmodem import AT_OK, AT_MATCH, ticks_ms, ticks_diff, sleep_ms
+from modemppp import COMMAND, ONLINE, PAUSED, escape
+
+LINK = 0  # The only link A76XX runs in transparent mode
+ENDS = (b"\r\nCLOSED\r\n", b"\r\nNO CARRIER\r\n")  # Lines ending transparent mode
+
+
+class Stream:
+    def __init__(self, modem, dtr=None, dialect=None, link=LINK):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART, the PDP context must be open
+            dtr: Pin driving the modem DTR, by default MODEM_DTR_PIN of the board.
+                Without one pause() uses "+++".
+            dialect (str): A76XX or SIM70XX, by default taken from utilities.CURRENT_PLATFORM
+            link (int): Link id, SIM70XX only (A76XX uses link 0)
+        """
+        self.modem = modem
+        hw = board.get()
+        if dtr is None:
+            dtr = hw.pin("MODEM_DTR_PIN")
+            if dtr is not None:
+                dtr.value(0)
+        self.dtr = dtr
+        self.sim70xx = (dialect or hw.dialect) == board.SIM70XX
+        self.link = link if self.sim70xx else LINK
+        self.state = COMMAND
+        self.timeout = 5000  # Milliseconds read() / readinto() wait for data
+        self.pauses = 0
+        self.restore = False  # open() switched A76XX to AT+CIPMODE=1, close() switches back
+        self._pending = b""  # Data read while looking for the end of a CLOSED line
+
+    def _cipmode(self, mode, timeout):
+        # A76XX: AT+CIPMODE is only accepted before AT+NETOPEN, the network is reopened for it
+        modem = self.modem
+        if modem.run(b"AT+CIPMODE?", 1000, capture=b"+CIPMODE:") == AT_OK and modem.field_int(0) == mode:
+            return True
+        if modem.run(b"AT+CIPMODE=%d" % mode) != AT_OK:
+            modem.run(b"AT+NETCLOSE", timeout, terminator=b"+NETCLOSE:")
+            if modem.run(b"AT+CIPMODE=%d" % mode) != AT_OK:
+                return False
+        self.restore = mode == 1
+        return modem.run(b"AT+NETOPEN", timeout, terminator=b"+NETOPEN:") == AT_MATCH and modem.field_int(0) == 0
+
+    def _online(self, status):
+        # CONNECT <rate> starts data mode, "CONNECT FAIL" contains the terminator as well
+        line = self.modem.response_line()
+        if status != AT_MATCH or line is None or "FAIL" in line:
+            return False
+        self.state = ONLINE
+        return True
+
+    def open(self, host, port, timeout=30000):
+        """Connect to host:port and enter transparent mode, True once the modem answered CONNECT."""
+        if self.state != COMMAND:
+            return self.state == ONLINE
+        modem = self.modem
+        if self.dtr is not None:
+            self.dtr.value(0)
+            modem.run(b"AT&D1")  # DTR high: command mode, the connection stays
+        if self.sim70xx:
+            command = 'AT+CAOPEN=%d,0,"TCP","%s",%d' % (self.link, host, port)
+            if modem.run(command.encode(), timeout, capture=b"+CAOPEN:") != AT_OK or modem.field_int(1) != 0:
+                return False
+            if self._online(modem.run(b"AT+CASWITCH=%d,1" % self.link, timeout, terminator=b"CONNECT")):
+                return True
+            modem.run(b"AT+CACLOSE=%d" % self.link, 5000)
+            return False
+        if not self._cipmode(1, timeout):
+            return False
+        command = 'AT+CIPOPEN=%d,"TCP","%s",%d' % (LINK, host, port)
+        return self._online(modem.run(command.encode(), timeout, terminator=b"CONNECT"))
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+    def write(self, data):
+        """Send data, returns the number of bytes written."""
+        return self.modem.write(data) if self.state == ONLINE else 0
+
+    def write_data(self, source, length=None, chunk=1024):
+        """Stream source (bytes, a file, a generator, see atmodem.chunks()) to the connection."""
+        return self.modem.write_data(source, length, chunk) if self.state == ONLINE else 0
+
+    def any(self):
+        return self.modem.any() if self.state == ONLINE else 0
+
+    def readinto(self, buf, nbytes=None):
+        """
+        Read received bytes into buf, returns the count once some arrived, 0 when nothing
+        came within self.timeout milliseconds or the connection is gone. The modem prints
+        CLOSED (NO CARRIER) when the server closes the connection: that line is not
+        returned, the stream is back in COMMAND state.
+        """
+        if nbytes is None or nbytes > len(buf):
+            nbytes = len(buf)
+        pending = self._pending
+        if pending:
+            n = min(nbytes, len(pending))
+            buf[:n] = pending[:n]
+            self._pending = pending[n:]
+            return n
+        if self.state != ONLINE:
+            return 0
+        modem = self.modem
+        start = ticks_ms()
+        while not modem.any():
+            if ticks_diff(ticks_ms(), start) >= self.timeout:
+                return 0
+            sleep_ms(1)
+        available = modem.any()
+        if nbytes > available:
+            nbytes = available
+        return self._strip(buf, modem.read_into(buf, nbytes, 0))
+
+    def _strip(self, buf, count):
+        # Cut a CLOSED / NO CARRIER line off the end of the data, it may be split over reads
+        data = bytes(buf[max(0, count - 16):count])
+        size = len(data)  # data[:size] is in buf, bytes read beyond are data or the line
+        i = data.find(b"\r")
+        while i >= 0:
+            line = data[i:]
+            while any(end != line and end.startswith(line) for end in ENDS):
+                byte = self._more()
+                if not byte:
+                    break
+                line += byte
+            data = data[:i] + line
+            if line in ENDS:
+                self.state = COMMAND
+                if i < size:
+                    return count - size + i
+                self._pending = data[size:i]
+                return count
+            i = data.find(b"\r", i + 1)
+        self._pending = data[size:]  # Data after all, returned by the next read
+        return count
+
+    def _more(self):
+        # The next byte if one arrives within a few milliseconds
+        modem = self.modem
+        start = ticks_ms()
+        while not modem.any():
+            if ticks_diff(ticks_ms(), start) >= 20:
+                return b""
+            sleep_ms(1)
+        byte = bytearray(1)
+        return bytes(byte[:modem.read_into(byte, 1, 0)])
+
+    def read(self, n=1024):
+        buf = bytearray(n)
+        count = self.readinto(buf)
+        return bytes(buf[:count])
+
+    # ------------------------------------------------------------------
+    # Command mode
+    # ------------------------------------------------------------------
+    def pause(self, timeout=3000):
+        """Back to command mode keeping the connection, True when the modem answers AT."""
+        if self.state != ONLINE:
+            return self.state == PAUSED
+        modem = self.modem
+        escape(modem, self.dtr)
+        modem.wait_response(1000)  # The OK of the escape, unread data is dropped
+        start = ticks_ms()
+        while modem.run(b"AT", 300) != AT_OK:
+            if ticks_diff(ticks_ms(), start) >= timeout:
+                return False
+        self.pauses += 1
+        self.state = PAUSED
+        return True
+
+    def resume(self, timeout=5000):
+        """Back to transparent mode after pause() with ATO, True on CONNECT."""
+        if self.state != PAUSED:
+            return self.state == ONLINE
+        if self._online(self.modem.run(b"ATO", timeout, terminator=b"CONNECT")):
+            return True
+        self.state = COMMAND  # NO CARRIER: the connection is gone
+        return False
+
+    def close(self, timeout=30000):
+        """Leave transparent mode, close the connection and undo the AT+CIPMODE=1 of open()."""
+        if self.state == ONLINE:
+            self.pause()
+        if self.sim70xx:
+            self.modem.run(b"AT+CACLOSE=%d" % self.link, 5000)
+        else:
+            self.modem.run(b"AT+CIPCLOSE=%d" % LINK, 5000, terminator=b"+CIPCLOSE:")
+            if self.restore:
+                self._cipmode(0, timeout)
+        self.state = COMMAND
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
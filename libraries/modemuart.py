@@ -0,0 +1,181 @@
+#  * @file      modemuart.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Modem UART rate: probing, AT+IPR negotiation and fallback.
+#  *            The boards start at MODEM_BAUDRATE (115200), about 11 KB/s. negotiate()
+#  *            switches modem and machine.UART to a faster rate for bulk transfers
+#  *            (HTTP bodies, camera uploads), checks the link with a few commands and
+#  *            goes back to the previous rate when it shows errors. The rate in use is
+#  *            recorded in RTC memory, so after deep sleep restore() only re-inits the
+#  *            UART instead of negotiating again (modemboot.boot() calls it).
+#  *
+#  *                rate = modemuart.negotiate(modem, 921600)
+#  *                print("UART at", rate)
+#  *
+#  *            AT+IPR is not stored by the modem, a power cycled modem starts at
+#  *            MODEM_BAUDRATE again; boot() then drops the record.
+#  *
+#  *            flow_control() enables RTS / CTS (UART flow= plus AT+IFC=2,2) on boards
+#  *            whose CONFIG has MODEM_RTS_PIN / MODEM_CTS_PIN. Elsewhere payloads written
+#  *            with send_data() / write_data() are paced instead: PACE_BYTES bursts with
+#  *            a PACE_MS gap above MODEM_BAUDRATE, so certificates and bodies are not
+#  *            overrun at high rates.
+try:
+    from machine import UART
+except ImportError:
+    UART = None  # CPython host
+
+import rtcmem
+import utilities
+from atmodem import AT_OK, sleep_ms
+
+# Rates tried by probe(), the modems accept up to 3 Mbit/s (A76XX) / 921600 (SIM70XX)
+RATES = (115200, 921600, 460800, 230400, 3000000)
+
+CHECKS = 3  # Commands that must pass at a new rate
+SETTLE_MS = 20  # Modem UART reconfiguration after the OK of AT+IPR
+
+# Software pacing without RTS / CTS: bursts well below the modem UART receive buffer
+PACE_BYTES = 1024
+PACE_MS = 10
+
+
+def default_rate():
+    return utilities.CONFIG.get("MODEM_BAUDRATE", 115200)
+
+
+def set_rate(uart, rate):
+    """Re-init the host UART at rate, keeping pins and buffers."""
+    uart.init(baudrate=rate)
+
+
+def _answers(modem, tries=2):
+    modem.flush_input()
+    for _ in range(tries):
+        if modem.run(b"AT", 100) == AT_OK:
+            return True
+    return False
+
+
+def check(modem, count=CHECKS):
+    """
+    Check the link at the current rate: count commands with a longer response must
+    pass without a timeout, an ERROR or a line buffer overflow.
+    """
+    overflows = modem.overflows
+    modem.flush_input()
+    for _ in range(count):
+        if modem.run(b"AT+CGMR", 500) != AT_OK:
+            return False
+    return modem.overflows == overflows
+
+
+def probe(modem, rates=RATES):
+    """Find the rate the modem answers at and set the UART to it, None if it stays silent."""
+    recorded = rtcmem.load("uart")
+    if recorded and recorded not in rates:
+        rates = (recorded,) + tuple(rates)
+    for rate in rates:
+        set_rate(modem.uart, rate)
+        if _answers(modem):
+            rtcmem.save("uart", rate)
+            return rate
+    return None
+
+
+def restore(modem):
+    """Set the UART to the recorded rate, returns it (None when nothing was negotiated)."""
+    rate = rtcmem.load("uart")
+    if rate:
+        set_rate(modem.uart, rate)
+    return rate
+
+
+def forget(modem):
+    """Drop the record and go back to MODEM_BAUDRATE, e.g. after the modem was power cycled."""
+    rtcmem.clear("uart")
+    set_rate(modem.uart, default_rate())
+
+
+def pacing(rate):
+    """(bytes, ms) for ATModem.pace without flow control at rate, None when not needed."""
+    if rate is None or rate <= default_rate():
+        return None
+    return (PACE_BYTES, PACE_MS)
+
+
+def flow_control(modem, hardware=True):
+    """
+    Set up flow control for the modem UART, returns True for RTS / CTS.
+
+    Args:
+        modem (ATModem): Engine on the modem UART
+        hardware (bool): Use RTS / CTS where the board has MODEM_RTS_PIN / MODEM_CTS_PIN,
+            False forces the software fallback
+
+    With RTS / CTS the modem is switched with AT+IFC=2,2 and the UART re-initialised
+    with flow control, payloads are written without pauses. Otherwise AT+IFC=0,0 and
+    modem.pace follows the rate, see pacing().
+    """
+    rts = utilities.CONFIG.get("MODEM_RTS_PIN")
+    cts = utilities.CONFIG.get("MODEM_CTS_PIN")
+    if hardware and UART is not None and rts is not None and cts is not None:
+        if modem.run(b"AT+IFC=2,2") == AT_OK:
+            modem.uart.init(rts=rts, cts=cts, flow=UART.RTS | UART.CTS)
+            modem.flow = True
+            modem.pace = None
+            return True
+    modem.run(b"AT+IFC=0,0")
+    modem.flow = False
+    modem.pace = pacing(rtcmem.load("uart") or default_rate())
+    return False
+
+
+def _switch(modem, rate):
+    # AT+IPR is answered at the old rate, the modem switches after its OK
+    if modem.run(("AT+IPR=%d" % rate).encode(), 1000) != AT_OK:
+        return False
+    sleep_ms(SETTLE_MS)
+    set_rate(modem.uart, rate)
+    sleep_ms(SETTLE_MS)
+    if not modem.flow:
+        modem.pace = pacing(rate)  # Software pacing follows the rate
+    return True
+
+
+def negotiate(modem, rate=921600, current=None):
+    """
+    Switch modem and UART to rate, returns the rate in use afterwards.
+
+    Args:
+        modem (ATModem): Engine on the modem UART, the modem must be running
+        rate (int): Wanted rate
+        current (int): Rate the modem runs at now, by default the recorded one
+            or MODEM_BAUDRATE; probe() is used when the modem does not answer at it
+
+    The link is checked with check() at the new rate. If it fails, AT+IPR switches the
+    modem back (when it still understands commands) and the old rate is probed.
+    """
+    if current is None:
+        current = rtcmem.load("uart") or default_rate()
+    set_rate(modem.uart, current)
+    if not _answers(modem):
+        current = probe(modem)
+        if current is None:
+            return None
+    if current == rate:
+        rtcmem.save("uart", rate)
+        return rate
+    if _switch(modem, rate) and check(modem):
+        rtcmem.save("uart", rate)
+        return rate
+    # Errors at the new rate: ask the modem to go back, then make sure it did
+    for _ in range(CHECKS):
+        if _switch(modem, current):
+            break
+    set_rate(modem.uart, current)
+    if _answers(modem):
+        rtcmem.save("uart", current)
+        return current
+    return probe(modem)
@@ -0,0 +1,227 @@
+#  * @file      modemwatch.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Modem health watchdog with bounded recovery.
+#  *            Watchdog observes the result of every command (ATModem.observer) and
+#  *            probes the AT channel when it has been quiet. Commands that time out,
+#  *            a channel that answers with data instead of OK (stuck in data mode) and
+#  *            a run of ERROR / +CME ERROR results start a recovery that escalates:
+#  *
+#  *              ESCAPE  ESC and "+++" between guard times: aborts a waiting prompt,
+#  *                      leaves transparent / PPP data mode
+#  *              RADIO   AT+CFUN=0 / AT+CFUN=1, skipped when the modem stays silent
+#  *              POWER   supply off (BOARD_POWERON_PIN), MODEM_RESET_PIN or a long PWRKEY
+#  *                      press, then modemboot.boot()
+#  *
+#  *            Each level is verified with AT before the next one is tried and the whole
+#  *            recovery ends after budget milliseconds. A recovery that failed is not
+#  *            repeated before a growing delay, so a dead modem does not drain the battery
+#  *            in a retry loop; update() returns False then and the application can
+#  *            deep sleep for watch.delay:
+#  *
+#  *                watch = modemwatch.Watchdog(modem, net=net)
+#  *                while True:
+#  *                    if not watch.update():
+#  *                        machine.deepsleep(watch.delay)
+#  *                    ...
+#  *                print(watch.metrics())
+from atmodem import AT_OK, AT_ERROR, AT_TIMEOUT, ticks_ms, ticks_diff, sleep_ms
+import board
+import modemboot
+import utilities
+
+# Recovery levels in escalation order, NONE when no recovery was needed
+NONE = 0
+ESCAPE = 1
+RADIO = 2
+POWER = 3
+LEVELS = ("none", "escape", "radio", "power")
+
+GUARD_MS = 1000  # Silence around "+++"
+CFUN_MS = 10000  # Upper bound for AT+CFUN=0 / 1
+OFF_MS = 3000  # Supply off time, PWRKEY press that switches a running modem off
+PROBE_MS = 500  # Upper bound for one probe AT
+
+
+class Watchdog:
+    def __init__(self, modem, net=None, interval=60000, timeouts=2, errors=5, probes=3, budget=120000,
+                 delay=60000, delay_max=3600000):
+        """
+        Args:
+            modem (ATModem): Engine on the modem UART, its observer is taken over
+            net (modemnet.Registration): Restarted after a RADIO or POWER recovery
+            interval (int): Milliseconds without a command before update() probes with AT
+            timeouts (int): Consecutive timed out commands that start a recovery
+            errors (int): Consecutive ERROR / +CME ERROR results that start a recovery
+            probes (int): ATs that must all fail before a level counts as failed
+            budget (int): Upper bound in milliseconds for one recovery, all levels
+            delay (int): Milliseconds before a failed recovery is tried again, doubled
+                after every further failure up to delay_max
+        """
+        self.modem = modem
+        self.net = net
+        self.interval = interval
+        self.max_timeouts = timeouts
+        self.max_errors = errors
+        self.probes = probes
+        self.budget = budget
+        self.base_delay = delay
+        self.delay_max = delay_max
+        self.delay = 0  # Milliseconds until the next recovery may run, after a failure
+        self.timeouts = 0  # Consecutive results, reset by the first OK
+        self.errors = 0
+        self.level = NONE  # Level of the last recovery, NONE before any
+        # Counters
+        self.runs = [0, 0, 0, 0]  # Recoveries tried per level
+        self.recovered = [0, 0, 0, 0]  # Recoveries that ended at this level
+        self.failures = 0  # Recoveries where not even POWER helped
+        self.recover_ms = 0  # Duration of the last recovery
+        self.recover_max_ms = 0
+        self._failed_at = None
+        self._last = ticks_ms()  # Last command result
+        self._busy = False
+        modem.observer = self._observe
+
+    def _observe(self, status):
+        if self._busy:
+            return
+        self._last = ticks_ms()
+        if status == AT_TIMEOUT:
+            self.timeouts += 1
+        elif status == AT_ERROR:
+            self.errors += 1
+            self.timeouts = 0
+        else:
+            self.timeouts = 0
+            self.errors = 0
+
+    def failed(self):
+        """True while a failed recovery is waiting for its delay to pass."""
+        return self._failed_at is not None and ticks_diff(ticks_ms(), self._failed_at) < self.delay
+
+    def _alive(self):
+        # (answered, data): answered when AT got OK, data when bytes came back without OK
+        modem = self.modem
+        received = modem.bytes_in
+        for _ in range(self.probes):
+            if modem.run(b"AT", PROBE_MS) == AT_OK:
+                return True, False
+        return False, modem.bytes_in != received
+
+    def check(self):
+        """
+        Probe the AT channel and recover if needed. Returns True when the modem is
+        healthy (again), False if recovery failed or is waiting for its delay.
+        """
+        if self.failed():
+            return False
+        self._busy = True
+        try:
+            answered, data = self._alive()
+        finally:
+            self._busy = False
+        if answered and self.errors < self.max_errors:
+            self.timeouts = 0
+            self._last = ticks_ms()
+            return True
+        # A responsive channel with a run of errors: the escape is pointless
+        return self.recover(RADIO if answered else ESCAPE)
+
+    def update(self):
+        """
+        Call from the main loop. Runs check() when commands timed out or failed too
+        often, or nothing was sent for interval milliseconds. Returns check()'s result,
+        True when nothing was due.
+        """
+        if self.timeouts >= self.max_timeouts or self.errors >= self.max_errors \
+                or ticks_diff(ticks_ms(), self._last) >= self.interval:
+            return self.check()
+        return not self.failed()
+
+    def _escape(self):
+        modem = self.modem
+        modem.write(b"\x1b")  # Abort a payload prompt
+        sleep_ms(GUARD_MS)
+        modem.write(b"+++")
+        sleep_ms(GUARD_MS)
+        modem.write(b"\r")
+        modem.flush_input()
+
+    def _radio(self):
+        modem = self.modem
+        modem.run(b"AT+CFUN=0", CFUN_MS)
+        modem.run(b"AT+CFUN=1", CFUN_MS)
+
+    def _power(self, timeout):
+        modem = self.modem
+        hw = board.get()
+        if not utilities.EMULATOR and hw.has("power"):
+            hw.supply(False)  # DC boost off: a real power cycle
+            sleep_ms(OFF_MS)
+        elif not modemboot.reset(modem.uart):
+            modemboot.power_key(modem.uart, OFF_MS)  # Long press switches a hanging modem off
+            sleep_ms(OFF_MS)
+        return modemboot.boot(modem, timeout=timeout).ready
+
+    def recover(self, level=ESCAPE):
+        """
+        Run the recovery levels from level up to POWER until the modem answers AT,
+        within budget milliseconds. Returns True on success.
+        """
+        start = ticks_ms()
+        self._busy = True
+        try:
+            while level <= POWER:
+                left = self.budget - ticks_diff(ticks_ms(), start)
+                if left <= 0:
+                    break
+                self.runs[level] += 1
+                if level == ESCAPE:
+                    self._escape()
+                elif level == RADIO:
+                    self._radio()
+                elif not self._power(left):
+                    break
+                answered, data = self._alive()
+                if answered:
+                    self._done(level, start)
+                    return True
+                # AT+CFUN needs a modem that still reads commands, a silent one is power cycled
+                level = POWER if level == ESCAPE and not data else level + 1
+        finally:
+            self._busy = False
+        self.failures += 1
+        self.level = level if level <= POWER else POWER
+        self.delay = self.base_delay if self._failed_at is None else min(self.delay * 2, self.delay_max)
+        self._failed_at = ticks_ms()
+        self.recover_ms = ticks_diff(self._failed_at, start)
+        return False
+
+    def _done(self, level, start):
+        self.recovered[level] += 1
+        self.level = level
+        self.timeouts = 0
+        self.errors = 0
+        self.delay = 0
+        self._failed_at = None
+        self._last = ticks_ms()
+        self.recover_ms = ticks_diff(self._last, start)
+        if self.recover_ms > self.recover_max_ms:
+            self.recover_max_ms = self.recover_ms
+        if level >= RADIO and self.net is not None:
+            self.net.start()  # Registration and PDP context are gone after CFUN=0 / a power cycle
+
+    def metrics(self):
+        """Counters as a dict, e.g. for a status report."""
+        return {
+            "level": LEVELS[self.level],
+            "escapes": self.runs[ESCAPE],
+            "radio_cycles": self.runs[RADIO],
+            "power_cycles": self.runs[POWER],
+            "recovered": dict(zip(LEVELS[1:], self.recovered[1:])),
+            "failures": self.failures,
+            "recover_ms": self.recover_ms,
+            "recover_max_ms": self.recover_max_ms,
+            "delay": self.delay,
+        }
@@ -0,0 +1,85 @@
+#  * @file      rtcmem.py
+#  * @license   MIT
+#  * @copyright Copyright (c) 2026  Shenzhen Xin Yuan Electronic Technology Co., Ltd
+#  * @date      2026-10-18
+#  * @note      Small key / value store in the RTC user memory of the ESP32
+#  *            (machine.RTC().memory(), 2 KB), which survives deep sleep but not a
+#  *            power loss. The libraries share it, each under its own key
+#  *            ("modem", "dns" ...), values are anything JSON can encode:
+#  *
+#  *                rtcmem.save("modem", {"imei": "8622..."})
+#  *                info = rtcmem.load("modem")
+#  *
+#  *            Writes rewrite the whole memory, so save only what changed.
+#  *            On a host without machine.RTC the store lives in RAM.
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+try:
+    from machine import RTC
+except ImportError:
+    RTC = None  # CPython host
+
+MAGIC = b"LGM1"  # Marks memory written by this module
+SIZE = 2048  # Bytes of RTC user memory on the ESP32
+
+_data = None  # Decoded store, read once
+_host = b""  # RTC memory stand in for the host
+
+
+def _read():
+    global _data
+    if _data is None:
+        raw = RTC().memory() if RTC is not None else _host
+        _data = {}
+        if raw[:len(MAGIC)] == MAGIC:
+            try:
+                _data = json.loads(raw[len(MAGIC):])
+            except ValueError:
+                pass  # Corrupted, start empty
+    return _data
+
+
+def _write(data):
+    global _host
+    raw = MAGIC + json.dumps(data).encode()
+    if len(raw) > SIZE:
+        raise ValueError("RTC memory full (%d bytes)" % len(raw))
+    if RTC is not None:
+        RTC().memory(raw)
+    else:
+        _host = raw
+
+
+def _copy(value):
+    # Detached copy, in the form the value takes after a reboot (tuples become lists)
+    return json.loads(json.dumps(value))
+
+
+def load(key, default=None):
+    """Return a copy of the value stored under key, default if there is none."""
+    data = _read()
+    if key not in data:
+        return default
+    return _copy(data[key])
+
+
+def save(key, value):
+    """Store a copy of value under key, raises ValueError if the store would exceed SIZE."""
+    data = _read()
+    new = dict(data)
+    new[key] = value
+    _write(new)  # Raises before the store changes
+    data[key] = _copy(value)
+
+
+def clear(key=None):
+    """Remove key, or everything when key is None."""
+    data = _read()
+    if key is None:
+        data.clear()
+    elif data.pop(key, None) is None:
+        return
+    _write(data)
@@ -2,14 +2,29 @@
 #  * @license   MIT
 #  * @copyright Copyright (c) 2025  Shenzhen Xin Yuan Electronic Technology Co., Ltd
 #  * @date      2025-06-10
-import machine
+try:
+    import machine
+except ImportError:
+    machine = None  # CPython host, the modem is emulated by modemsim.py
 
 CURRENT_PLATFORM = None
 CONFIG = {}
+EMULATOR = False
 
-def set_platform(platform_name):
-    global CURRENT_PLATFORM
+# Platforms with a SIM7000G / SIM7080G modem (CNACT / CAOPEN / SM* / SH* command set),
+# the other boards carry an A76XX / SIM7600 / SIM7670G (NETOPEN / CIPOPEN / CMQTT* / HTTP*)
+SIM70XX_PLATFORMS = ("LILYGO_T_SIM7000G", "LILYGO_T_SIM7000G_S3_STAN", "LILYGO_T_SIM7080G_S3_STAN")
+
+# Optional CONFIG keys "MODEM_RTS_PIN" / "MODEM_CTS_PIN": ESP32 GPIOs wired to the modem
+# RTS / CTS lines, enabling hardware flow control (modemuart.flow_control()). Only the
+# T-A7670X-S3-Standard and T-SIM7000G-S3-Standard can route them, through solder pads
+# shared with the GPS pins, see the commented entries of the S3 standard boards.
+
+def set_platform(platform_name, emulator=False):
+    # emulator=True runs against modemsim.ModemEmulator, speaking the dialect of platform_name
+    global CURRENT_PLATFORM, EMULATOR
     CURRENT_PLATFORM = platform_name
+    EMULATOR = emulator or machine is None
     configure_platform()
 
 def configure_platform():
@@ -127,6 +142,12 @@ def configure_platform():
            "MODEM_GPS_TX_PIN": 45,
            "MODEM_GPS_PPS_PIN": 17,
 
+            # T-A7670X-S3-Standard / T-SIM7000G-S3-Standard only: the modem RTS / CTS lines
+            # reach IO48 / IO45 once the solder pads on the back of the board are bridged.
+            # The pads take these GPIOs from the GPS pins above, uncomment to use flow control.
+            # "MODEM_RTS_PIN": 48,
+            # "MODEM_CTS_PIN": 45,
+
             # This IO is only used when using an external GPS module, such as A7670G+L76K GPS
            "GPS_SHIELD_WAKEUP_PIN": 0,
 